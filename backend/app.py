@@ -1,6 +1,9 @@
 from flask import Flask
 from flask_cors import CORS
 from config import Config
+from db.connection import init_app as init_db
+from utils.compression import init_app as init_compression
+from utils.json_provider import FastJSONProvider
 
 # Import blueprints
 from routes.wine_routes import wine_bp
@@ -9,14 +12,26 @@ from routes.user_routes import user_bp
 from routes.review_routes import review_bp
 from routes.pairing_routes import pairing_bp
 from routes.demo_routes import demo_bp
+from routes.search_routes import search_bp
+from routes.autocomplete_routes import autocomplete_bp
+from models.search_model import SearchModel
+from models.review_queue_model import ReviewQueueModel
 
 def create_app():
     app = Flask(__name__)
     app.config.from_object(Config)
+    app.json = FastJSONProvider(app)
     
     # Enable CORS
     CORS(app)
     
+    # gzip/deflate by Accept-Encoding (registered first so it runs after
+    # every other after_request hook)
+    init_compression(app)
+    
+    # One pooled connection and one commit per request
+    init_db(app)
+    
     # Register blueprints
     app.register_blueprint(wine_bp, url_prefix='/api/wines')
     app.register_blueprint(coffee_bp, url_prefix='/api/coffees')
@@ -24,6 +39,25 @@ def create_app():
     app.register_blueprint(review_bp, url_prefix='/api/reviews')
     app.register_blueprint(pairing_bp, url_prefix='/api/pairings')
     app.register_blueprint(demo_bp, url_prefix='/api')
+    app.register_blueprint(search_bp, url_prefix='/api/search')
+    app.register_blueprint(autocomplete_bp, url_prefix='/api/autocomplete')
+    
+    # Load the catalog snapshot and build the search and autocomplete indexes,
+    # and start the write-behind review queue (see ReviewQueueModel), when the
+    # first request arrives rather than here: under a pre-forking server
+    # (gunicorn --preload) every worker must open its own pooled connections,
+    # SQLite queue connection and drain thread, and test apps touch neither
+    # MySQL nor the queue file
+    started = {'pending': True}
+    
+    @app.before_request
+    def start_worker():
+        if started['pending']:
+            started['pending'] = False
+            if not app.testing:
+                if Config.REVIEW_QUEUE_ENABLED:
+                    ReviewQueueModel.start()
+                SearchModel.warm()
     
     @app.route('/')
     def home():
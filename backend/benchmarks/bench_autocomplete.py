@@ -0,0 +1,47 @@
+"""Build-time and query-latency benchmark for the autocomplete index.
+
+Feeds --docs synthetic products (the same generator as bench_bm25.py) into an
+AutocompleteIndex and reports p50/p99 latency for prefixes of different
+lengths, multi-word prefixes and misspelled words.
+
+    python benchmarks/bench_autocomplete.py --docs 100000
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.autocomplete import AutocompleteIndex
+from bench_bm25 import make_products, percentile
+
+QUERIES = ['c', 'ch', 'chab', 'napa v', 'grand cru 1', 'Chabils', 'yirgachefe', 'barosa valley',
+           'domaine reserv', 'zzzzzz']
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--docs', type=int, default=100000)
+    parser.add_argument('--runs', type=int, default=500)
+    args = parser.parse_args()
+
+    index = AutocompleteIndex()
+    start = time.perf_counter()
+    for _, product in make_products(args.docs):
+        index.add('wine', 'name', product['name'])
+        index.add('wine', 'region', product['region'])
+    print(f"Indexed {args.docs} products in {time.perf_counter() - start:.1f} s")
+
+    print(f"{'query':<20}{'p50':>10}{'p99':>10}  top suggestion")
+    for query in QUERIES:
+        index.suggest(query)  # first lookup fills the trie node caches
+        timings = []
+        for _ in range(args.runs):
+            start = time.perf_counter()
+            suggestions, corrected = index.suggest(query)
+            timings.append(time.perf_counter() - start)
+        top = suggestions[0]['text'] if suggestions else '-'
+        print(f"{query:<20}{percentile(timings, 0.5) * 1000:>8.3f}ms{percentile(timings, 0.99) * 1000:>8.3f}ms  {top}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,71 @@
+"""Build-time and query-latency benchmark for the in-process BM25 index.
+
+Indexes --docs synthetic products (names, regions, countries) and reports
+p50/p99 latency for a mix of rare, common and multi-word queries, fetching
+one 51-row page like /api/search does.
+
+    python benchmarks/bench_bm25.py --docs 1000000
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.search_index import InvertedIndex
+
+WORDS = ['Château', 'Domaine', 'Reserve', 'Grand', 'Cru', 'Estate', 'Old', 'Vine', 'Cuvée',
+         'Rouge', 'Blanc', 'Brut', 'Single', 'Origin', 'Espresso', 'Roast', 'Blend', 'Dark',
+         'Classic', 'Select', 'Family', 'Hillside', 'River', 'Valley', 'Sunset', 'Oak']
+REGIONS = ['Bordeaux', 'Burgundy', 'Chablis', 'Tuscany', 'Piedmont', 'Rioja', 'Napa Valley',
+           'Sonoma', 'Barossa Valley', 'Mendoza', 'Mosel', 'Yirgacheffe', 'Huila', 'Antigua',
+           'Kona', 'Sidamo', 'Tarrazu', 'Cerrado', 'Marlborough', 'Douro']
+COUNTRIES = ['France', 'Italy', 'Spain', 'USA', 'Australia', 'Argentina', 'Germany',
+             'Ethiopia', 'Colombia', 'Guatemala', 'Costa Rica', 'Brazil', 'New Zealand', 'Portugal']
+
+QUERIES = ['chablis', 'france', 'reserve', 'napa valley reserve', 'ethiopia yirgacheffe',
+           'grand cru burgundy', 'oak', 'single origin colombia', 'nothing matches this']
+
+def make_products(count, seed=7):
+    rng = random.Random(seed)
+    for i in range(count):
+        yield i, {
+            'name': f"{rng.choice(WORDS)} {rng.choice(WORDS)} {rng.randrange(10 ** 5)}",
+            'region': rng.choice(REGIONS),
+            'country': rng.choice(COUNTRIES),
+        }
+
+def percentile(samples, fraction):
+    samples = sorted(samples)
+    return samples[min(len(samples) - 1, int(len(samples) * fraction))]
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--docs', type=int, default=1000000)
+    parser.add_argument('--runs', type=int, default=200)
+    parser.add_argument('--page-size', type=int, default=50)
+    args = parser.parse_args()
+
+    index = InvertedIndex({'name': 2})
+    start = time.perf_counter()
+    index.rebuild(make_products(args.docs))
+    print(f"Indexed {len(index)} products in {time.perf_counter() - start:.1f} s")
+
+    print(f"{'query':<26}{'p50':>10}{'p99':>10}")
+    for query in QUERIES:
+        timings = []
+        for _ in range(args.runs):
+            start = time.perf_counter()
+            index.search(query, args.page_size + 1)
+            timings.append(time.perf_counter() - start)
+        print(f"{query:<26}{percentile(timings, 0.5) * 1000:>7.3f} ms{percentile(timings, 0.99) * 1000:>7.3f} ms")
+
+    start = time.perf_counter()
+    for i in range(1000):
+        index.add(i, {'name': f'Updated Chablis {i}', 'region': 'Chablis', 'country': 'France'})
+    print(f"1000 incremental updates: {(time.perf_counter() - start) * 1000:.1f} ms")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,104 @@
+"""Throughput of bulk upserts against one INSERT and commit per row.
+
+Writes --rows synthetic wines into a scratch table (bench_bulk_wines, created
+LIKE wines) with bulk_upsert() at several chunk sizes, then re-sends them all
+with ids so every row takes the ON DUPLICATE KEY UPDATE path. The
+row-at-a-time baseline (what POST /api/wines/ costs per SKU) is timed on
+--single rows. Needs the configured MySQL database.
+
+    python benchmarks/bench_bulk.py --rows 100000
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from db.connection import get_pool
+from models.wine_model import WineModel
+from utils.bulk import bulk_upsert, upsert_sql
+
+SCRATCH = 'bench_bulk_wines'
+
+def make_rows(count, seed=5):
+    rng = random.Random(seed)
+    return [{
+        'name': f"Bench Wine {i}",
+        'type': rng.choice(['red', 'white', 'rose', 'sparkling']),
+        'region': rng.choice(['Bordeaux', 'Rioja', 'Napa Valley', 'Mosel']),
+        'country': rng.choice(['France', 'Spain', 'USA', 'Germany']),
+        'vintage': rng.randint(1990, 2023),
+        'price': f"{rng.uniform(8, 300):.2f}",
+        'alcohol_content': f"{rng.uniform(9, 15):.2f}",
+        'acidity_level': rng.choice(['low', 'medium', 'high']),
+        'sweetness_level': rng.choice(['dry', 'off-dry', 'semi-sweet', 'sweet']),
+    } for i in range(count)]
+
+def reset_table():
+    conn = get_pool().get_connection()
+    try:
+        with conn.cursor() as cursor:
+            cursor.execute(f"DROP TABLE IF EXISTS {SCRATCH}")
+            cursor.execute(f"CREATE TABLE {SCRATCH} LIKE wines")
+        conn.commit()
+    finally:
+        conn.close()
+
+def row_at_a_time(rows):
+    conn = get_pool().get_connection()
+    try:
+        with conn.cursor() as cursor:
+            sql = upsert_sql(SCRATCH, WineModel.BULK_COLUMNS, 1)
+            for row in rows:
+                cursor.execute(sql, [row.get(column) for column in WineModel.BULK_COLUMNS])
+                conn.commit()
+    finally:
+        conn.close()
+
+def timed(label, count, fn):
+    start = time.perf_counter()
+    result = fn()
+    elapsed = time.perf_counter() - start
+    print(f"{label:<34}{count:>9}{elapsed:>10.2f} s{count / elapsed:>12,.0f} rows/s")
+    return result
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, default=100000)
+    parser.add_argument('--single', type=int, default=2000)
+    parser.add_argument('--chunk-sizes', default='100,1000,5000')
+    parser.add_argument('--keep', action='store_true', help='keep the scratch table afterwards')
+    args = parser.parse_args()
+
+    rows = make_rows(args.rows)
+    print(f"{'method':<34}{'rows':>9}{'time':>12}{'throughput':>16}")
+
+    reset_table()
+    timed('INSERT + COMMIT per row', args.single, lambda: row_at_a_time(rows[:args.single]))
+
+    for chunk_size in (int(size) for size in args.chunk_sizes.split(',')):
+        reset_table()
+        result = timed(f"bulk insert, chunk_size={chunk_size}", len(rows), lambda: bulk_upsert(
+            SCRATCH, WineModel.BULK_COLUMNS, rows, WineModel._validate_bulk_row, chunk_size))
+        assert result['failed'] == 0, result['errors'][:5]
+
+    # Every row again, now with its id: all updates
+    for i, row in enumerate(rows, start=1):
+        row['id'] = i
+        row['price'] = '9.99'
+    timed(f"bulk update, chunk_size={chunk_size}", len(rows), lambda: bulk_upsert(
+        SCRATCH, WineModel.BULK_COLUMNS, rows, WineModel._validate_bulk_row, chunk_size))
+
+    if not args.keep:
+        conn = get_pool().get_connection()
+        try:
+            with conn.cursor() as cursor:
+                cursor.execute(f"DROP TABLE {SCRATCH}")
+            conn.commit()
+        finally:
+            conn.close()
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,95 @@
+"""Compare FULLTEXT MATCH ... AGAINST with the LIKE '%term%' search path.
+
+Copies the seeded wines and coffees into scratch tables (bench_wines,
+bench_coffees) scaled up --scale times, then times both query styles for a
+few search terms, fetching one page of page_size rows like /api/search does.
+Needs the configured MySQL database populated (populate_database_1000.py).
+
+    python benchmarks/bench_fulltext.py --scale 100
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pymysql
+from db.connection import get_pool
+
+TABLES = {
+    # table: (columns copied, FULLTEXT columns)
+    'wines': (('name', 'type', 'region', 'country', 'vintage', 'price'),
+              ('name', 'region', 'country')),
+    'coffees': (('name', 'type', 'origin', 'country', 'roast_level', 'price', 'description'),
+                ('name', 'origin', 'country', 'description')),
+}
+
+TERMS = ['valley', 'reserve', 'colombia', 'bordeaux', 'ethiopia']
+
+def build(cursor, table, scale):
+    columns, searchable = TABLES[table]
+    scratch = f"bench_{table}"
+    cursor.execute(f"DROP TABLE IF EXISTS {scratch}")
+    cursor.execute(f"CREATE TABLE {scratch} LIKE {table}")
+    try:
+        cursor.execute(f"ALTER TABLE {scratch} ADD FULLTEXT INDEX ft_search ({', '.join(searchable)})")
+    except pymysql.err.OperationalError:
+        pass  # copied from the source table's ft_*_search index
+
+    column_list = ', '.join(columns)
+    select_list = ', '.join(f"CONCAT(name, ' ', %s)" if c == 'name' else c for c in columns)
+    for copy in range(scale):
+        cursor.execute(f"INSERT INTO {scratch} ({column_list}) SELECT {select_list} FROM {table}",
+                       (f"#{copy}",))
+    cursor.execute(f"SELECT COUNT(*) AS n FROM {scratch}")
+    return scratch, cursor.fetchone()['n']
+
+def best_of(cursor, repeat, sql, params):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        cursor.execute(sql, params)
+        rows = cursor.fetchall()
+        timings.append(time.perf_counter() - start)
+    return min(timings), len(rows)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--scale', type=int, default=100)
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--page-size', type=int, default=50)
+    parser.add_argument('--keep', action='store_true', help='keep the scratch tables afterwards')
+    args = parser.parse_args()
+
+    conn = get_pool().get_connection()
+    try:
+        with conn.cursor() as cursor:
+            for table, (_, searchable) in TABLES.items():
+                scratch, count = build(cursor, table, args.scale)
+                conn.commit()
+                print(f"\n{scratch}: {count} rows")
+                print(f"{'term':<12}{'LIKE':>12}{'FULLTEXT':>12}{'speedup':>9}")
+
+                like = " OR ".join(f"{c} LIKE %s" for c in searchable)
+                match = f"MATCH({', '.join(searchable)}) AGAINST (%s IN NATURAL LANGUAGE MODE)"
+                for term in TERMS:
+                    like_time, _ = best_of(
+                        cursor, args.repeat,
+                        f"SELECT id, name FROM {scratch} WHERE {like} ORDER BY name, id LIMIT %s",
+                        [f"%{term}%"] * len(searchable) + [args.page_size])
+                    match_time, _ = best_of(
+                        cursor, args.repeat,
+                        f"SELECT id, name, {match} AS score FROM {scratch} WHERE {match} "
+                        f"ORDER BY score DESC, id LIMIT %s",
+                        [term, term, args.page_size])
+                    print(f"{term:<12}{like_time * 1000:>9.2f} ms{match_time * 1000:>9.2f} ms"
+                          f"{like_time / match_time:>8.1f}x")
+
+                if not args.keep:
+                    cursor.execute(f"DROP TABLE {scratch}")
+    finally:
+        conn.close()
+
+if __name__ == '__main__':
+    main()
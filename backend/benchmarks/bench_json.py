@@ -0,0 +1,71 @@
+"""Compare Flask's default JSON provider with FastJSONProvider.
+
+Encodes a synthetic wines payload shaped like GET /api/wines/ (Decimal
+prices, datetime created_at) and reports the best of several runs.
+
+    python benchmarks/bench_json.py --rows 100000
+"""
+import argparse
+import os
+import sys
+import time
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from flask import Flask
+from flask.json.provider import DefaultJSONProvider
+from utils.json_provider import FastJSONProvider
+
+TYPES = ['Red', 'White', 'Rosé', 'Sparkling', 'Dessert']
+COUNTRIES = ['France', 'Italy', 'Spain', 'USA', 'Australia', 'Chile']
+
+def make_wines(count):
+    created = datetime(2024, 1, 1)
+    return [{
+        'id': i,
+        'name': f'Wine {i}',
+        'type': TYPES[i % len(TYPES)],
+        'region': f'Region {i % 97}',
+        'country': COUNTRIES[i % len(COUNTRIES)],
+        'vintage': 1990 + i % 34,
+        'price': Decimal(f'{10 + i % 490}.{i % 100:02d}'),
+        'alcohol_content': Decimal(f'{11 + i % 5}.5'),
+        'acidity_level': 'Medium',
+        'sweetness_level': 'Dry',
+        'created_at': created + timedelta(minutes=i),
+    } for i in range(count)]
+
+def best_of(repeat, fn):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, default=100000)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    app = Flask(__name__)
+    payload = {'wines': make_wines(args.rows), 'count': args.rows}
+    providers = [('flask default', DefaultJSONProvider(app)), ('fast (http dates)', FastJSONProvider(app))]
+
+    iso_app = Flask(__name__)
+    iso_app.config['JSON_DATETIME_FORMAT'] = 'iso'
+    providers.append(('fast (iso dates)', FastJSONProvider(iso_app)))
+
+    print(f"Encoding {args.rows} wines, best of {args.repeat}")
+    baseline = None
+    for label, provider in providers:
+        with app.app_context():
+            seconds = best_of(args.repeat, lambda: provider.response(payload))
+        baseline = baseline or seconds
+        print(f"  {label:<18} {seconds * 1000:8.1f} ms  {baseline / seconds:5.1f}x")
+
+if __name__ == '__main__':
+    main()
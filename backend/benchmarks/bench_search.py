@@ -0,0 +1,112 @@
+"""Time wine searches on the columnar catalog against the other search paths.
+
+Runs a few typical /api/wines/ filter combinations over a synthetic catalog
+with a plain row-by-row Python scan and with ColumnarCatalog masks. With
+--sql the same filters are also sent to MySQL through the SQL search path
+(timed against whatever is loaded in the configured database).
+
+    python benchmarks/bench_search.py --rows 100000 [--sql]
+"""
+import argparse
+import os
+import random
+import sys
+import time
+from decimal import Decimal
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import Config
+from utils.columnar import ColumnarCatalog
+
+TYPES = ['Red', 'White', 'Rosé', 'Sparkling', 'Dessert']
+COUNTRIES = ['France', 'Italy', 'Spain', 'USA', 'Australia', 'Chile', 'Argentina', 'Germany']
+REGIONS = ['Bordeaux', 'Burgundy', 'Tuscany', 'Piedmont', 'Rioja', 'Napa Valley',
+           'Sonoma', 'Barossa Valley', 'Mendoza', 'Mosel', 'Loire Valley', 'Champagne']
+
+QUERIES = [
+    ('type', {'type': 'Red'}),
+    ('region LIKE', {'region': 'valley'}),
+    ('price range', {'min_price': '20', 'max_price': '45'}),
+    ('type + country + price', {'type': 'White', 'country': 'France', 'max_price': '30'}),
+]
+
+def make_wines(count, seed=42):
+    rng = random.Random(seed)
+    return sorted(({
+        'id': i,
+        'name': f'Wine {rng.randrange(10 ** 6):06d}',
+        'type': rng.choice(TYPES),
+        'country': rng.choice(COUNTRIES),
+        'region': rng.choice(REGIONS),
+        'vintage': rng.randint(1980, 2023),
+        'price': Decimal(f'{rng.randint(8, 400)}.{rng.randint(0, 99):02d}'),
+        'alcohol_content': Decimal(f'{rng.randint(11, 15)}.{rng.randint(0, 9)}'),
+    } for i in range(1, count + 1)), key=lambda w: (w['name'], w['id']))
+
+def split(filters):
+    """Filters in the shape WineModel._search_snapshot() builds"""
+    equals = {k: filters[k] for k in ('type', 'country') if filters.get(k)}
+    contains = {'region': filters['region']} if filters.get('region') else {}
+    ranges = {'price': (filters.get('min_price'), filters.get('max_price'))}
+    return equals, contains, ranges
+
+def scan(rows, filters):
+    equals, contains, ranges = split(filters)
+    low, high = ranges['price']
+    low = Decimal(low) if low else None
+    high = Decimal(high) if high else None
+    result = []
+    for row in rows:
+        if any((row[c] or '').casefold() != v.casefold() for c, v in equals.items()):
+            continue
+        if any(v.casefold() not in (row[c] or '').casefold() for c, v in contains.items()):
+            continue
+        if (low is not None and row['price'] < low) or (high is not None and row['price'] > high):
+            continue
+        result.append(row)
+    return result
+
+def best_of(repeat, fn):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        timings.append(time.perf_counter() - start)
+    return min(timings), len(result)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, default=100000)
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--sql', action='store_true', help='also time the MySQL search path')
+    args = parser.parse_args()
+
+    if not ColumnarCatalog.available():
+        sys.exit('NumPy is not installed; the columnar catalog is unavailable')
+
+    rows = make_wines(args.rows)
+    start = time.perf_counter()
+    columnar = ColumnarCatalog(rows, ('price', 'vintage', 'alcohol_content'),
+                               ('type', 'country', 'region'))
+    print(f"Built columns for {args.rows} wines in {(time.perf_counter() - start) * 1000:.1f} ms")
+
+    if args.sql:
+        from models.wine_model import WineModel
+        Config.CATALOG_SNAPSHOT_ENABLED = False
+
+    print(f"{'query':<26}{'rows':>8}{'python scan':>14}{'columnar':>12}{'speedup':>9}"
+          + (f"{'mysql':>12}" if args.sql else ''))
+    for label, filters in QUERIES:
+        scan_time, count = best_of(args.repeat, lambda: scan(rows, filters))
+        column_time, column_count = best_of(args.repeat, lambda: columnar.search(*split(filters)))
+        assert column_count == count, label
+        line = (f"{label:<26}{count:>8}{scan_time * 1000:>11.2f} ms{column_time * 1000:>9.2f} ms"
+                f"{scan_time / column_time:>8.1f}x")
+        if args.sql:
+            sql_time, _ = best_of(args.repeat, lambda: WineModel.search_wines(filters))
+            line += f"{sql_time * 1000:>9.2f} ms"
+        print(line)
+
+if __name__ == '__main__':
+    main()
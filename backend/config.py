@@ -14,6 +14,68 @@ class Config:
     # Database connection string
     DATABASE_URL = f"mysql+pymysql://{MYSQL_USER}:{MYSQL_PASSWORD}@{MYSQL_HOST}:{MYSQL_PORT}/{MYSQL_DATABASE}"
     
+    # Read replicas: comma-separated host[:port] list sharing the primary's
+    # credentials. Reads fall back to the primary when a replica lags by more
+    # than MYSQL_REPLICA_MAX_LAG seconds.
+    MYSQL_REPLICA_HOSTS = [h.strip() for h in (os.environ.get('MYSQL_REPLICA_HOSTS') or '').split(',') if h.strip()]
+    MYSQL_REPLICA_MAX_LAG = float(os.environ.get('MYSQL_REPLICA_MAX_LAG') or 5)
+    MYSQL_REPLICA_LAG_CHECK_INTERVAL = float(os.environ.get('MYSQL_REPLICA_LAG_CHECK_INTERVAL') or 2)
+    
+    # Connection pool settings (timeouts in seconds)
+    DB_POOL_MIN_SIZE = int(os.environ.get('DB_POOL_MIN_SIZE') or 1)
+    DB_POOL_MAX_SIZE = int(os.environ.get('DB_POOL_MAX_SIZE') or 10)
+    DB_POOL_TIMEOUT = float(os.environ.get('DB_POOL_TIMEOUT') or 5)
+    DB_POOL_IDLE_TIMEOUT = float(os.environ.get('DB_POOL_IDLE_TIMEOUT') or 300)
+    DB_POOL_PING_INTERVAL = float(os.environ.get('DB_POOL_PING_INTERVAL') or 30)
+    
+    # Keyset pagination for list endpoints
+    DEFAULT_PAGE_SIZE = int(os.environ.get('DEFAULT_PAGE_SIZE') or 50)
+    MAX_PAGE_SIZE = int(os.environ.get('MAX_PAGE_SIZE') or 200)
+    
+    # Most ids one multi-get (/batch) request may ask for
+    MAX_BATCH_SIZE = int(os.environ.get('MAX_BATCH_SIZE') or 500)
+    
+    # Bulk upserts: rows per multi-row INSERT (and transaction), and the most
+    # rows one request may send
+    BULK_CHUNK_SIZE = int(os.environ.get('BULK_CHUNK_SIZE') or 1000)
+    BULK_MAX_ROWS = int(os.environ.get('BULK_MAX_ROWS') or 100000)
+    
+    # In-memory wine/coffee catalog snapshot; writes made outside the app are
+    # picked up within CATALOG_SNAPSHOT_MAX_STALENESS seconds
+    CATALOG_SNAPSHOT_ENABLED = (os.environ.get('CATALOG_SNAPSHOT_ENABLED') or 'True') == 'True'
+    CATALOG_SNAPSHOT_MAX_STALENESS = float(os.environ.get('CATALOG_SNAPSHOT_MAX_STALENESS') or 5)
+    
+    # Top-rated leaderboards, ranked by Bayesian average: each product's
+    # ratings are blended with LEADERBOARD_PRIOR_WEIGHT phantom reviews at
+    # the catalog-wide mean, so a single 5-star review doesn't top the list.
+    # The GetTopRatedWines/GetTopRatedCoffees procedures always use 10
+    LEADERBOARD_ENABLED = (os.environ.get('LEADERBOARD_ENABLED') or 'True') == 'True'
+    LEADERBOARD_PRIOR_WEIGHT = float(os.environ.get('LEADERBOARD_PRIOR_WEIGHT') or 10)
+    
+    # Write-behind review ingestion: POST /api/reviews/ queues validated reviews
+    # in a local SQLite file and answers 202; a background worker writes them
+    # to MySQL up to REVIEW_QUEUE_BATCH_SIZE at a time, pausing
+    # REVIEW_QUEUE_INTERVAL seconds whenever it runs dry so bursts coalesce.
+    # Written/failed entries stay queryable for REVIEW_QUEUE_RETENTION seconds.
+    REVIEW_QUEUE_ENABLED = (os.environ.get('REVIEW_QUEUE_ENABLED') or 'False') == 'True'
+    REVIEW_QUEUE_PATH = os.environ.get('REVIEW_QUEUE_PATH') or 'review_queue.sqlite3'
+    REVIEW_QUEUE_BATCH_SIZE = int(os.environ.get('REVIEW_QUEUE_BATCH_SIZE') or 500)
+    REVIEW_QUEUE_INTERVAL = float(os.environ.get('REVIEW_QUEUE_INTERVAL') or 0.5)
+    REVIEW_QUEUE_RETENTION = float(os.environ.get('REVIEW_QUEUE_RETENTION') or 86400)
+    
+    # /api/search backend: 'index' (in-process BM25 over the snapshot) or 'mysql' (FULLTEXT)
+    SEARCH_ENGINE = os.environ.get('SEARCH_ENGINE') or 'index'
+    
+    # Response compression: bodies below COMPRESS_MIN_SIZE bytes are sent as-is;
+    # compressed bodies of ETag-validated responses are cached up to
+    # COMPRESS_CACHE_MAX_BYTES.
+    COMPRESS_MIN_SIZE = int(os.environ.get('COMPRESS_MIN_SIZE') or 1024)
+    COMPRESS_LEVEL = int(os.environ.get('COMPRESS_LEVEL') or 6)
+    COMPRESS_CACHE_MAX_BYTES = int(os.environ.get('COMPRESS_CACHE_MAX_BYTES') or 32 * 1024 * 1024)
+    
+    # 'http' keeps Flask's HTTP-date datetimes; 'iso' lets orjson emit ISO 8601
+    JSON_DATETIME_FORMAT = os.environ.get('JSON_DATETIME_FORMAT') or 'http'
+    
     # Application settings
     DEBUG = os.environ.get('FLASK_DEBUG') == 'True'
     TESTING = False 
\ No newline at end of file
@@ -1,23 +1,246 @@
+import threading
+from functools import partial
 import pymysql
+from flask import g, has_app_context, has_request_context, jsonify, request
 from config import Config
+from db.pool import ConnectionPool, in_transaction
+from db.replicas import Replica, ReplicaRouter
 
-def get_db_connection():
-    """Create and return a MySQL database connection"""
+_pool = None
+_router = None
+_pool_lock = threading.Lock()
+
+def _create_connection(host=None, port=None, **options):
+    """Open a new MySQL database connection (to the primary by default).
+
+    Extra pymysql options (e.g. local_infile=True for the catalog loader)
+    are passed through.
+    """
     try:
         connection = pymysql.connect(
-            host=Config.MYSQL_HOST,
-            port=Config.MYSQL_PORT,
+            host=host or Config.MYSQL_HOST,
+            port=port or Config.MYSQL_PORT,
             user=Config.MYSQL_USER,
             password=Config.MYSQL_PASSWORD,
             database=Config.MYSQL_DATABASE,
             charset='utf8mb4',
-            cursorclass=pymysql.cursors.DictCursor
+            cursorclass=pymysql.cursors.DictCursor,
+            **options
         )
         return connection
     except pymysql.Error as e:
         print(f"Error connecting to MySQL: {e}")
         raise
 
+def _new_pool(connect, min_size):
+    return ConnectionPool(
+        connect,
+        min_size=min_size,
+        max_size=Config.DB_POOL_MAX_SIZE,
+        timeout=Config.DB_POOL_TIMEOUT,
+        idle_timeout=Config.DB_POOL_IDLE_TIMEOUT,
+        ping_interval=Config.DB_POOL_PING_INTERVAL
+    )
+
+def get_pool():
+    """Return the process-wide primary connection pool, creating it on first use"""
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = _new_pool(_create_connection, Config.DB_POOL_MIN_SIZE)
+    return _pool
+
+def get_router():
+    """Return the replica router built from Config.MYSQL_REPLICA_HOSTS"""
+    global _router
+    if _router is None:
+        with _pool_lock:
+            if _router is None:
+                replicas = []
+                for address in Config.MYSQL_REPLICA_HOSTS:
+                    host, _, port = address.partition(':')
+                    port = int(port) if port else Config.MYSQL_PORT
+                    # Lazily filled so an unreachable replica never blocks startup
+                    pool = _new_pool(partial(_create_connection, host, port), 0)
+                    replicas.append(Replica(address, pool,
+                                            max_lag=Config.MYSQL_REPLICA_MAX_LAG,
+                                            check_interval=Config.MYSQL_REPLICA_LAG_CHECK_INTERVAL))
+                _router = ReplicaRouter(replicas)
+    return _router
+
+def close_pool():
+    """Close all pooled connections (e.g. on shutdown or after fork)"""
+    global _pool, _router
+    with _pool_lock:
+        if _pool is not None:
+            _pool.close()
+            _pool = None
+        if _router is not None:
+            for replica in _router.replicas:
+                replica.pool.close()
+            _router = None
+
+class RequestConnection:
+    """Connection shared by every model call within one app context.
+
+    Model code keeps calling commit() and close() as before, but both are
+    deferred: the unit of work is committed once when the request finishes
+    successfully (or rolled back otherwise) and the connection then goes
+    back to the pool. See init_app().
+    """
+
+    def __init__(self, conn):
+        self._conn = conn
+
+    def __getattr__(self, name):
+        return getattr(self._conn, name)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        pass
+
+    def commit(self):
+        """Deferred until the end of the request"""
+
+    def close(self):
+        """Deferred until the end of the request"""
+
+    def finish(self, commit):
+        """Commit or roll back the unit of work and release the connection"""
+        try:
+            if in_transaction(self._conn):
+                if commit:
+                    self._conn.commit()
+                else:
+                    self._conn.rollback()
+        finally:
+            self._conn.close()
+
+def _replica_allowed():
+    """Replicas only serve safe-method requests that have not touched the primary.
+
+    Once a request has used the primary, or if it is a write request at all,
+    every later read in it stays on the primary so it sees its own writes.
+    """
+    if has_request_context() and request.method not in ('GET', 'HEAD'):
+        return False
+    return g.get('_db_conn') is None
+
+def get_db_connection(readonly=False):
+    """Return a MySQL connection.
+
+    Inside a Flask app context every call returns the same request-scoped
+    connection; elsewhere (scripts, tests) a connection is borrowed from the
+    pool and close() returns it. Read-only callers pass readonly=True and are
+    routed to a sufficiently fresh replica when one is configured.
+    """
+    if has_app_context():
+        if readonly and _replica_allowed():
+            conn = g.get('_db_replica_conn')
+            if conn is None:
+                replica_conn = get_router().get_connection()
+                if replica_conn is not None:
+                    conn = g._db_replica_conn = RequestConnection(replica_conn)
+            if conn is not None:
+                return conn
+
+        conn = g.get('_db_conn')
+        if conn is None:
+            conn = g._db_conn = RequestConnection(get_pool().get_connection())
+        return conn
+
+    if readonly:
+        conn = get_router().get_connection()
+        if conn is not None:
+            return conn
+    return get_pool().get_connection()
+
+def on_commit(callback):
+    """Run callback once the current unit of work has been committed.
+
+    Inside a request the callback waits for the request's commit and is
+    dropped if it rolls back; elsewhere model writes commit immediately, so
+    it runs right away.
+    """
+    if has_app_context() and g.get('_db_conn') is not None:
+        g.setdefault('_db_on_commit', []).append(callback)
+    else:
+        callback()
+
+def stream_query(sql, params=None, readonly=True, chunk_size=1000):
+    """Run a query on an unbuffered server-side cursor and return a row iterator.
+
+    The query is executed before this returns, so errors surface to the
+    caller; rows are then pulled from MySQL chunk_size at a time as the
+    iterator is consumed, keeping memory flat regardless of result size.
+    The connection is borrowed outside the request scope because an
+    unbuffered result ties it up until the last row has been read.
+    """
+    conn = get_router().get_connection() if readonly else None
+    if conn is None:
+        conn = get_pool().get_connection()
+
+    try:
+        cursor = conn.cursor(pymysql.cursors.SSDictCursor)
+        cursor.execute(sql, params)
+    except Exception:
+        conn.discard()
+        raise
+
+    def rows():
+        finished = False
+        try:
+            while True:
+                chunk = cursor.fetchmany(chunk_size)
+                if not chunk:
+                    break
+                yield from chunk
+            finished = True
+        finally:
+            if finished:
+                cursor.close()
+                conn.close()
+            else:
+                # Abandoned mid-result (client went away): draining the rest
+                # of an unbuffered result would be wasted work, so drop it
+                conn.discard()
+
+    return rows()
+
+def init_app(app):
+    """Commit each request's unit of work once, before the response is sent"""
+
+    @app.after_request
+    def commit_request_connection(response):
+        conn = g.get('_db_conn')
+        if conn is None or response.status_code >= 400:
+            return response
+        g.pop('_db_conn')
+        try:
+            conn.finish(commit=True)
+        except Exception as e:
+            response = jsonify({'error': str(e)})
+            response.status_code = 500
+            return response
+
+        for callback in g.pop('_db_on_commit', ()):
+            try:
+                callback()
+            except Exception as e:
+                print(f"Post-commit callback failed: {e}")
+        return response
+
+    @app.teardown_appcontext
+    def rollback_request_connection(exc):
+        g.pop('_db_on_commit', None)
+        for key in ('_db_conn', '_db_replica_conn'):
+            conn = g.pop(key, None)
+            if conn is not None:
+                conn.finish(commit=False)
+
 def test_connection():
     """Test the database connection"""
     try:
@@ -0,0 +1,215 @@
+import threading
+import time
+from collections import deque
+
+from pymysql.constants import SERVER_STATUS
+
+
+def in_transaction(conn):
+    """True if the server reports an open transaction on this connection"""
+    return bool(getattr(conn, 'server_status', 0) & SERVER_STATUS.SERVER_STATUS_IN_TRANS)
+
+
+class PoolTimeout(Exception):
+    """Raised when no connection becomes available within the borrow timeout"""
+
+
+class PooledConnection:
+    """Proxy around a pooled connection; close() hands it back to the pool"""
+
+    def __init__(self, pool, conn):
+        self._pool = pool
+        self._conn = conn
+
+    def __getattr__(self, name):
+        conn = self.__dict__.get('_conn')
+        if conn is None:
+            raise AttributeError(f"Connection already returned to pool: {name}")
+        return getattr(conn, name)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    @property
+    def raw(self):
+        """The underlying driver connection"""
+        return self._conn
+
+    def close(self):
+        """Return the connection to the pool (safe to call more than once)"""
+        if self._conn is not None:
+            conn, self._conn = self._conn, None
+            self._pool.release(conn)
+
+    def discard(self):
+        """Close the connection for good instead of returning it to the pool"""
+        if self._conn is not None:
+            conn, self._conn = self._conn, None
+            self._pool._discard(conn)
+
+    def __del__(self):
+        # Callers that forget close() on an error path must not leak a slot
+        if self.__dict__.get('_conn') is not None:
+            conn, self._conn = self._conn, None
+            self._pool._discard(conn)
+
+
+class ConnectionPool:
+    """Thread-safe pool of database connections.
+
+    Idle connections are handed out most-recently-used first so the warm ones
+    stay warm, and connections idle for longer than ``idle_timeout`` are closed
+    as long as at least ``min_size`` connections remain open. A connection that
+    has sat idle for ``ping_interval`` seconds or more is pinged before it is
+    handed out; dead ones are discarded and replaced transparently.
+    """
+
+    def __init__(self, connect, min_size=1, max_size=10, timeout=5.0,
+                 idle_timeout=300.0, ping_interval=30.0):
+        if max_size < 1:
+            raise ValueError("max_size must be at least 1")
+        if min_size > max_size:
+            raise ValueError("min_size cannot exceed max_size")
+
+        self._connect = connect
+        self.min_size = min_size
+        self.max_size = max_size
+        self.timeout = timeout
+        self.idle_timeout = idle_timeout
+        self.ping_interval = ping_interval
+
+        self._idle = deque()  # (conn, last_used); oldest on the left
+        self._size = 0  # open connections, idle and checked out
+        self._cond = threading.Condition()
+        self._closed = False
+
+        for _ in range(min_size):
+            conn = self._connect()
+            self._size += 1
+            self._idle.append((conn, time.monotonic()))
+
+    @property
+    def size(self):
+        """Number of open connections, idle and checked out"""
+        return self._size
+
+    @property
+    def idle_count(self):
+        """Number of connections waiting in the pool"""
+        return len(self._idle)
+
+    def get_connection(self, timeout=None):
+        """Borrow a connection, waiting up to ``timeout`` seconds for one"""
+        timeout = self.timeout if timeout is None else timeout
+        deadline = time.monotonic() + timeout
+
+        while True:
+            conn, last_used = self._checkout(deadline)
+
+            if conn is None:
+                try:
+                    conn = self._connect()
+                except Exception:
+                    self._discard(None)
+                    raise
+                return PooledConnection(self, conn)
+
+            if time.monotonic() - last_used < self.ping_interval or self._is_alive(conn):
+                return PooledConnection(self, conn)
+
+            # Stale connection: drop it and try again within the same deadline
+            self._discard(conn)
+
+    def release(self, conn):
+        """Put a connection back into the pool"""
+        if self._closed or not getattr(conn, 'open', True):
+            self._discard(conn)
+            return
+
+        try:
+            # Never leak an open transaction (or a stale REPEATABLE READ
+            # snapshot) to the next borrower
+            if in_transaction(conn):
+                conn.rollback()
+        except Exception:
+            self._discard(conn)
+            return
+
+        with self._cond:
+            self._idle.append((conn, time.monotonic()))
+            self._cond.notify()
+
+    def close(self):
+        """Close every idle connection and refuse to keep returned ones"""
+        with self._cond:
+            self._closed = True
+            idle, self._idle = list(self._idle), deque()
+            self._size -= len(idle)
+            self._cond.notify_all()
+        for conn, _ in idle:
+            self._close_quietly(conn)
+
+    def _checkout(self, deadline):
+        """Take an idle connection or reserve a slot for a new one.
+
+        Returns ``(conn, last_used)``; ``conn`` is None when the caller should
+        open a new connection in the reserved slot.
+        """
+        with self._cond:
+            while True:
+                if self._closed:
+                    raise PoolTimeout("Connection pool is closed")
+
+                self._reap_idle()
+
+                if self._idle:
+                    return self._idle.pop()
+
+                if self._size < self.max_size:
+                    self._size += 1
+                    return None, None
+
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise PoolTimeout(
+                        f"No database connection available within {self.timeout}s "
+                        f"(pool size {self.max_size})"
+                    )
+                self._cond.wait(remaining)
+
+    def _reap_idle(self):
+        """Close connections idle past idle_timeout, keeping min_size open.
+
+        Must be called with the condition held.
+        """
+        cutoff = time.monotonic() - self.idle_timeout
+        while self._idle and self._size > self.min_size and self._idle[0][1] < cutoff:
+            conn, _ = self._idle.popleft()
+            self._size -= 1
+            self._close_quietly(conn)
+
+    def _discard(self, conn):
+        """Forget a connection (or a reserved slot) and wake up a waiter"""
+        with self._cond:
+            self._size -= 1
+            self._cond.notify()
+        if conn is not None:
+            self._close_quietly(conn)
+
+    @staticmethod
+    def _is_alive(conn):
+        try:
+            conn.ping(reconnect=False)
+            return True
+        except Exception:
+            return False
+
+    @staticmethod
+    def _close_quietly(conn):
+        try:
+            conn.close()
+        except Exception:
+            pass
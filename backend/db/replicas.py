@@ -0,0 +1,98 @@
+import itertools
+import threading
+import time
+
+
+def probe_replication_lag(conn):
+    """Return the replica's lag in seconds, or None if replication is broken.
+
+    A server with no replication configured reports lag 0 so that a plain
+    second instance can stand in for a replica in development.
+    """
+    with conn.cursor() as cursor:
+        try:
+            cursor.execute("SHOW REPLICA STATUS")
+            column = 'Seconds_Behind_Source'
+        except Exception:
+            # MySQL < 8.0.22 / MariaDB
+            cursor.execute("SHOW SLAVE STATUS")
+            column = 'Seconds_Behind_Master'
+        status = cursor.fetchone()
+
+    if not status:
+        return 0
+    lag = status.get(column)
+    return None if lag is None else float(lag)
+
+
+class Replica:
+    """A read replica with a cached replication-lag reading"""
+
+    def __init__(self, name, pool, max_lag=5.0, check_interval=2.0, probe=probe_replication_lag):
+        self.name = name
+        self.pool = pool
+        self.max_lag = max_lag
+        self.check_interval = check_interval
+        self._probe = probe
+        self._lag = None
+        self._checked_at = None
+        self._lock = threading.Lock()
+
+    @property
+    def lag(self):
+        """Last measured lag in seconds (None if unknown or broken)"""
+        return self._lag
+
+    def mark_down(self):
+        """Treat the replica as stale until the next lag check"""
+        self._lag = None
+        self._checked_at = time.monotonic()
+
+    def is_fresh(self):
+        """True if the replica is within max_lag, re-probing when the reading is old"""
+        now = time.monotonic()
+        if self._checked_at is None or now - self._checked_at >= self.check_interval:
+            # Only one thread probes; the others use the previous reading
+            if self._lock.acquire(blocking=False):
+                try:
+                    self._refresh_lag()
+                finally:
+                    self._lock.release()
+        return self._lag is not None and self._lag <= self.max_lag
+
+    def _refresh_lag(self):
+        try:
+            conn = self.pool.get_connection()
+            try:
+                self._lag = self._probe(conn)
+            finally:
+                conn.close()
+        except Exception as e:
+            print(f"Replica {self.name} lag check failed: {e}")
+            self._lag = None
+        self._checked_at = time.monotonic()
+
+
+class ReplicaRouter:
+    """Round-robin over replicas that are fresh enough to serve reads"""
+
+    def __init__(self, replicas):
+        self.replicas = list(replicas)
+        self._next = itertools.count()
+
+    def get_connection(self):
+        """Borrow a connection from a fresh replica, or None to use the primary"""
+        if not self.replicas:
+            return None
+
+        start = next(self._next)
+        for offset in range(len(self.replicas)):
+            replica = self.replicas[(start + offset) % len(self.replicas)]
+            if not replica.is_fresh():
+                continue
+            try:
+                return replica.pool.get_connection()
+            except Exception as e:
+                print(f"Replica {replica.name} unavailable: {e}")
+                replica.mark_down()
+        return None
@@ -132,8 +132,8 @@ CREATE INDEX idx_wines_type ON wines(type);
 CREATE INDEX idx_wines_region ON wines(region);
 CREATE INDEX idx_coffees_type ON coffees(type);
 CREATE INDEX idx_coffees_origin ON coffees(origin);
-CREATE INDEX idx_reviews_wine ON reviews(wine_id);
-CREATE INDEX idx_reviews_coffee ON reviews(coffee_id);
+CREATE INDEX idx_reviews_wine_created ON reviews(wine_id, created_at, id);
+CREATE INDEX idx_reviews_coffee_created ON reviews(coffee_id, created_at, id);
 CREATE INDEX idx_pairings_wine ON pairings(wine_id);
 CREATE INDEX idx_pairings_coffee ON pairings(coffee_id); 
 
@@ -255,4 +255,78 @@ CREATE INDEX IF NOT EXISTS idx_order_items_order ON order_items(order_id);
 CREATE INDEX IF NOT EXISTS idx_wine_grapes_wine ON wine_grape_varieties(wine_id);
 CREATE INDEX IF NOT EXISTS idx_suppliers_region ON suppliers(region_id);
 CREATE INDEX IF NOT EXISTS idx_wines_product ON wines(product_id);
-CREATE INDEX IF NOT EXISTS idx_wines_region_id ON wines(region_id);
\ No newline at end of file
+CREATE INDEX IF NOT EXISTS idx_wines_region_id ON wines(region_id);
+
+-- Keyset pagination: list endpoints page over (name, id) and (pairing_score, id)
+CREATE INDEX IF NOT EXISTS idx_wines_name ON wines(name);
+CREATE INDEX IF NOT EXISTS idx_coffees_name ON coffees(name);
+CREATE INDEX IF NOT EXISTS idx_pairings_score ON pairings(pairing_score);
+
+-- Review feeds page newest first over (created_at, id) within one product or
+-- user; these replace the single-column wine_id/coffee_id indexes, which made
+-- popular products filesort all of their reviews
+ALTER TABLE reviews ADD COLUMN IF NOT EXISTS user_id INT NULL;
+CREATE INDEX IF NOT EXISTS idx_reviews_wine_created ON reviews(wine_id, created_at, id);
+CREATE INDEX IF NOT EXISTS idx_reviews_coffee_created ON reviews(coffee_id, created_at, id);
+CREATE INDEX IF NOT EXISTS idx_reviews_user_created ON reviews(user_id, created_at, id);
+DROP INDEX IF EXISTS idx_reviews_wine ON reviews;
+DROP INDEX IF EXISTS idx_reviews_coffee ON reviews;
+
+-- Search filter combinations (equality column first, then the range or second
+-- equality column) so filtered catalog searches are index range scans
+CREATE INDEX IF NOT EXISTS idx_wines_type_price ON wines(type, price);
+CREATE INDEX IF NOT EXISTS idx_wines_type_vintage ON wines(type, vintage);
+CREATE INDEX IF NOT EXISTS idx_wines_acidity_sweetness ON wines(acidity_level, sweetness_level);
+CREATE INDEX IF NOT EXISTS idx_coffees_type_price ON coffees(type, price);
+CREATE INDEX IF NOT EXISTS idx_coffees_roast_acidity ON coffees(roast_level, acidity_level);
+
+-- Rating aggregates per product, maintained by ReviewModel in the same
+-- transaction as each review write (run reconcile_ratings.py after loading
+-- reviews any other way). Product detail, batch and top-rated reads use
+-- these instead of AVG/COUNT over reviews.
+ALTER TABLE wines
+    ADD COLUMN IF NOT EXISTS rating_sum INT NOT NULL DEFAULT 0,
+    ADD COLUMN IF NOT EXISTS rating_count INT NOT NULL DEFAULT 0,
+    ADD COLUMN IF NOT EXISTS avg_rating DECIMAL(3,2) NULL;
+ALTER TABLE coffees
+    ADD COLUMN IF NOT EXISTS rating_sum INT NOT NULL DEFAULT 0,
+    ADD COLUMN IF NOT EXISTS rating_count INT NOT NULL DEFAULT 0,
+    ADD COLUMN IF NOT EXISTS avg_rating DECIMAL(3,2) NULL;
+CREATE INDEX IF NOT EXISTS idx_wines_rating ON wines(avg_rating, rating_count);
+CREATE INDEX IF NOT EXISTS idx_coffees_rating ON coffees(avg_rating, rating_count);
+
+-- Star histograms (reviews per rating 1-5), maintained alongside the
+-- aggregates above; product detail responses return them as rating_info.histogram
+ALTER TABLE wines
+    ADD COLUMN IF NOT EXISTS rating_1 INT NOT NULL DEFAULT 0,
+    ADD COLUMN IF NOT EXISTS rating_2 INT NOT NULL DEFAULT 0,
+    ADD COLUMN IF NOT EXISTS rating_3 INT NOT NULL DEFAULT 0,
+    ADD COLUMN IF NOT EXISTS rating_4 INT NOT NULL DEFAULT 0,
+    ADD COLUMN IF NOT EXISTS rating_5 INT NOT NULL DEFAULT 0;
+ALTER TABLE coffees
+    ADD COLUMN IF NOT EXISTS rating_1 INT NOT NULL DEFAULT 0,
+    ADD COLUMN IF NOT EXISTS rating_2 INT NOT NULL DEFAULT 0,
+    ADD COLUMN IF NOT EXISTS rating_3 INT NOT NULL DEFAULT 0,
+    ADD COLUMN IF NOT EXISTS rating_4 INT NOT NULL DEFAULT 0,
+    ADD COLUMN IF NOT EXISTS rating_5 INT NOT NULL DEFAULT 0;
+
+-- Write-behind reviews (ReviewQueueModel) keep their queue tracking id, so a
+-- batch retried after an unrecorded commit never inserts a review twice
+ALTER TABLE reviews ADD COLUMN IF NOT EXISTS tracking_id CHAR(32) NULL;
+CREATE UNIQUE INDEX IF NOT EXISTS uq_reviews_tracking ON reviews(tracking_id);
+
+-- Per-table change counters, bumped by the *_version_* triggers in
+-- triggers_procedures_functions.sql. The API uses them for ETag/Last-Modified
+-- so unchanged catalog reads can be answered with 304 Not Modified.
+CREATE TABLE IF NOT EXISTS catalog_versions (
+    table_name VARCHAR(64) PRIMARY KEY,
+    version BIGINT UNSIGNED NOT NULL DEFAULT 0,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP
+);
+
+INSERT IGNORE INTO catalog_versions (table_name) VALUES ('wines'), ('coffees'), ('reviews'), ('pairings');
+
+-- Free-text search (/api/search) ranks MATCH ... AGAINST over these columns;
+-- LIKE '%term%' can never use idx_wines_region / idx_coffees_origin
+CREATE FULLTEXT INDEX IF NOT EXISTS ft_wines_search ON wines(name, region, country);
+CREATE FULLTEXT INDEX IF NOT EXISTS ft_coffees_search ON coffees(name, origin, country, description);
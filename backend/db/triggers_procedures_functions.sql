@@ -21,6 +21,18 @@ DROP TRIGGER IF EXISTS calculate_order_total_coffees_delete;
 DROP TRIGGER IF EXISTS validate_wine_rating;
 DROP TRIGGER IF EXISTS validate_coffee_rating;
 DROP TRIGGER IF EXISTS validate_pairing_score;
+DROP TRIGGER IF EXISTS wines_version_insert;
+DROP TRIGGER IF EXISTS wines_version_update;
+DROP TRIGGER IF EXISTS wines_version_delete;
+DROP TRIGGER IF EXISTS coffees_version_insert;
+DROP TRIGGER IF EXISTS coffees_version_update;
+DROP TRIGGER IF EXISTS coffees_version_delete;
+DROP TRIGGER IF EXISTS reviews_version_insert;
+DROP TRIGGER IF EXISTS reviews_version_update;
+DROP TRIGGER IF EXISTS reviews_version_delete;
+DROP TRIGGER IF EXISTS pairings_version_insert;
+DROP TRIGGER IF EXISTS pairings_version_update;
+DROP TRIGGER IF EXISTS pairings_version_delete;
 
 -- 1. Trigger to preserve created_at timestamp when updating wines
 DELIMITER //
@@ -56,17 +68,20 @@ CREATE TRIGGER calculate_order_total_wines
 AFTER INSERT ON order_wines
 FOR EACH ROW
 BEGIN
-    UPDATE orders 
-    SET total_amount = (
-        SELECT COALESCE(SUM(subtotal), 0) 
-        FROM order_wines 
-        WHERE order_id = NEW.order_id
-    ) + (
-        SELECT COALESCE(SUM(subtotal), 0) 
-        FROM order_coffees 
-        WHERE order_id = NEW.order_id
-    )
-    WHERE id = NEW.order_id;
+    -- generate_dataset.py writes total_amount itself and sets @skip_order_totals
+    IF @skip_order_totals IS NULL THEN
+        UPDATE orders 
+        SET total_amount = (
+            SELECT COALESCE(SUM(subtotal), 0) 
+            FROM order_wines 
+            WHERE order_id = NEW.order_id
+        ) + (
+            SELECT COALESCE(SUM(subtotal), 0) 
+            FROM order_coffees 
+            WHERE order_id = NEW.order_id
+        )
+        WHERE id = NEW.order_id;
+    END IF;
 END//
 DELIMITER ;
 
@@ -76,17 +91,20 @@ CREATE TRIGGER calculate_order_total_wines_update
 AFTER UPDATE ON order_wines
 FOR EACH ROW
 BEGIN
-    UPDATE orders 
-    SET total_amount = (
-        SELECT COALESCE(SUM(subtotal), 0) 
-        FROM order_wines 
-        WHERE order_id = NEW.order_id
-    ) + (
-        SELECT COALESCE(SUM(subtotal), 0) 
-        FROM order_coffees 
-        WHERE order_id = NEW.order_id
-    )
-    WHERE id = NEW.order_id;
+    -- generate_dataset.py writes total_amount itself and sets @skip_order_totals
+    IF @skip_order_totals IS NULL THEN
+        UPDATE orders 
+        SET total_amount = (
+            SELECT COALESCE(SUM(subtotal), 0) 
+            FROM order_wines 
+            WHERE order_id = NEW.order_id
+        ) + (
+            SELECT COALESCE(SUM(subtotal), 0) 
+            FROM order_coffees 
+            WHERE order_id = NEW.order_id
+        )
+        WHERE id = NEW.order_id;
+    END IF;
 END//
 DELIMITER ;
 
@@ -96,17 +114,20 @@ CREATE TRIGGER calculate_order_total_wines_delete
 AFTER DELETE ON order_wines
 FOR EACH ROW
 BEGIN
-    UPDATE orders 
-    SET total_amount = (
-        SELECT COALESCE(SUM(subtotal), 0) 
-        FROM order_wines 
-        WHERE order_id = OLD.order_id
-    ) + (
-        SELECT COALESCE(SUM(subtotal), 0) 
-        FROM order_coffees 
-        WHERE order_id = OLD.order_id
-    )
-    WHERE id = OLD.order_id;
+    -- generate_dataset.py writes total_amount itself and sets @skip_order_totals
+    IF @skip_order_totals IS NULL THEN
+        UPDATE orders 
+        SET total_amount = (
+            SELECT COALESCE(SUM(subtotal), 0) 
+            FROM order_wines 
+            WHERE order_id = OLD.order_id
+        ) + (
+            SELECT COALESCE(SUM(subtotal), 0) 
+            FROM order_coffees 
+            WHERE order_id = OLD.order_id
+        )
+        WHERE id = OLD.order_id;
+    END IF;
 END//
 DELIMITER ;
 
@@ -116,17 +137,20 @@ CREATE TRIGGER calculate_order_total_coffees
 AFTER INSERT ON order_coffees
 FOR EACH ROW
 BEGIN
-    UPDATE orders 
-    SET total_amount = (
-        SELECT COALESCE(SUM(subtotal), 0) 
-        FROM order_wines 
-        WHERE order_id = NEW.order_id
-    ) + (
-        SELECT COALESCE(SUM(subtotal), 0) 
-        FROM order_coffees 
-        WHERE order_id = NEW.order_id
-    )
-    WHERE id = NEW.order_id;
+    -- generate_dataset.py writes total_amount itself and sets @skip_order_totals
+    IF @skip_order_totals IS NULL THEN
+        UPDATE orders 
+        SET total_amount = (
+            SELECT COALESCE(SUM(subtotal), 0) 
+            FROM order_wines 
+            WHERE order_id = NEW.order_id
+        ) + (
+            SELECT COALESCE(SUM(subtotal), 0) 
+            FROM order_coffees 
+            WHERE order_id = NEW.order_id
+        )
+        WHERE id = NEW.order_id;
+    END IF;
 END//
 DELIMITER ;
 
@@ -136,17 +160,20 @@ CREATE TRIGGER calculate_order_total_coffees_update
 AFTER UPDATE ON order_coffees
 FOR EACH ROW
 BEGIN
-    UPDATE orders 
-    SET total_amount = (
-        SELECT COALESCE(SUM(subtotal), 0) 
-        FROM order_wines 
-        WHERE order_id = NEW.order_id
-    ) + (
-        SELECT COALESCE(SUM(subtotal), 0) 
-        FROM order_coffees 
-        WHERE order_id = NEW.order_id
-    )
-    WHERE id = NEW.order_id;
+    -- generate_dataset.py writes total_amount itself and sets @skip_order_totals
+    IF @skip_order_totals IS NULL THEN
+        UPDATE orders 
+        SET total_amount = (
+            SELECT COALESCE(SUM(subtotal), 0) 
+            FROM order_wines 
+            WHERE order_id = NEW.order_id
+        ) + (
+            SELECT COALESCE(SUM(subtotal), 0) 
+            FROM order_coffees 
+            WHERE order_id = NEW.order_id
+        )
+        WHERE id = NEW.order_id;
+    END IF;
 END//
 DELIMITER ;
 
@@ -156,17 +183,20 @@ CREATE TRIGGER calculate_order_total_coffees_delete
 AFTER DELETE ON order_coffees
 FOR EACH ROW
 BEGIN
-    UPDATE orders 
-    SET total_amount = (
-        SELECT COALESCE(SUM(subtotal), 0) 
-        FROM order_wines 
-        WHERE order_id = OLD.order_id
-    ) + (
-        SELECT COALESCE(SUM(subtotal), 0) 
-        FROM order_coffees 
-        WHERE order_id = OLD.order_id
-    )
-    WHERE id = OLD.order_id;
+    -- generate_dataset.py writes total_amount itself and sets @skip_order_totals
+    IF @skip_order_totals IS NULL THEN
+        UPDATE orders 
+        SET total_amount = (
+            SELECT COALESCE(SUM(subtotal), 0) 
+            FROM order_wines 
+            WHERE order_id = OLD.order_id
+        ) + (
+            SELECT COALESCE(SUM(subtotal), 0) 
+            FROM order_coffees 
+            WHERE order_id = OLD.order_id
+        )
+        WHERE id = OLD.order_id;
+    END IF;
 END//
 DELIMITER ;
 
@@ -209,6 +239,168 @@ BEGIN
 END//
 DELIMITER ;
 
+-- 12. Trigger to bump the wines catalog version after inserts (drives HTTP ETags)
+DELIMITER //
+CREATE TRIGGER wines_version_insert
+AFTER INSERT ON wines
+FOR EACH ROW
+BEGIN
+    -- Bulk loaders set @skip_catalog_version and bump the version once at the end
+    IF @skip_catalog_version IS NULL THEN
+        UPDATE catalog_versions SET version = version + 1 WHERE table_name = 'wines';
+    END IF;
+END//
+DELIMITER ;
+
+-- 13. Trigger to bump the wines catalog version after updates (drives HTTP ETags)
+DELIMITER //
+CREATE TRIGGER wines_version_update
+AFTER UPDATE ON wines
+FOR EACH ROW
+BEGIN
+    -- Bulk loaders set @skip_catalog_version and bump the version once at the end.
+    -- Rating aggregate updates (every review write) are not catalog changes:
+    -- the cached catalog leaves those columns out.
+    IF @skip_catalog_version IS NULL
+       AND OLD.rating_sum <=> NEW.rating_sum AND OLD.rating_count <=> NEW.rating_count THEN
+        UPDATE catalog_versions SET version = version + 1 WHERE table_name = 'wines';
+    END IF;
+END//
+DELIMITER ;
+
+-- 14. Trigger to bump the wines catalog version after deletes (drives HTTP ETags)
+DELIMITER //
+CREATE TRIGGER wines_version_delete
+AFTER DELETE ON wines
+FOR EACH ROW
+BEGIN
+    -- Bulk loaders set @skip_catalog_version and bump the version once at the end
+    IF @skip_catalog_version IS NULL THEN
+        UPDATE catalog_versions SET version = version + 1 WHERE table_name = 'wines';
+    END IF;
+END//
+DELIMITER ;
+
+-- 15. Trigger to bump the coffees catalog version after inserts (drives HTTP ETags)
+DELIMITER //
+CREATE TRIGGER coffees_version_insert
+AFTER INSERT ON coffees
+FOR EACH ROW
+BEGIN
+    -- Bulk loaders set @skip_catalog_version and bump the version once at the end
+    IF @skip_catalog_version IS NULL THEN
+        UPDATE catalog_versions SET version = version + 1 WHERE table_name = 'coffees';
+    END IF;
+END//
+DELIMITER ;
+
+-- 16. Trigger to bump the coffees catalog version after updates (drives HTTP ETags)
+DELIMITER //
+CREATE TRIGGER coffees_version_update
+AFTER UPDATE ON coffees
+FOR EACH ROW
+BEGIN
+    -- Bulk loaders set @skip_catalog_version and bump the version once at the end.
+    -- Rating aggregate updates (every review write) are not catalog changes:
+    -- the cached catalog leaves those columns out.
+    IF @skip_catalog_version IS NULL
+       AND OLD.rating_sum <=> NEW.rating_sum AND OLD.rating_count <=> NEW.rating_count THEN
+        UPDATE catalog_versions SET version = version + 1 WHERE table_name = 'coffees';
+    END IF;
+END//
+DELIMITER ;
+
+-- 17. Trigger to bump the coffees catalog version after deletes (drives HTTP ETags)
+DELIMITER //
+CREATE TRIGGER coffees_version_delete
+AFTER DELETE ON coffees
+FOR EACH ROW
+BEGIN
+    -- Bulk loaders set @skip_catalog_version and bump the version once at the end
+    IF @skip_catalog_version IS NULL THEN
+        UPDATE catalog_versions SET version = version + 1 WHERE table_name = 'coffees';
+    END IF;
+END//
+DELIMITER ;
+
+-- 18. Trigger to bump the reviews catalog version after inserts (drives HTTP ETags)
+DELIMITER //
+CREATE TRIGGER reviews_version_insert
+AFTER INSERT ON reviews
+FOR EACH ROW
+BEGIN
+    -- Bulk loaders set @skip_catalog_version and bump the version once at the end
+    IF @skip_catalog_version IS NULL THEN
+        UPDATE catalog_versions SET version = version + 1 WHERE table_name = 'reviews';
+    END IF;
+END//
+DELIMITER ;
+
+-- 19. Trigger to bump the reviews catalog version after updates (drives HTTP ETags)
+DELIMITER //
+CREATE TRIGGER reviews_version_update
+AFTER UPDATE ON reviews
+FOR EACH ROW
+BEGIN
+    -- Bulk loaders set @skip_catalog_version and bump the version once at the end
+    IF @skip_catalog_version IS NULL THEN
+        UPDATE catalog_versions SET version = version + 1 WHERE table_name = 'reviews';
+    END IF;
+END//
+DELIMITER ;
+
+-- 20. Trigger to bump the reviews catalog version after deletes (drives HTTP ETags)
+DELIMITER //
+CREATE TRIGGER reviews_version_delete
+AFTER DELETE ON reviews
+FOR EACH ROW
+BEGIN
+    -- Bulk loaders set @skip_catalog_version and bump the version once at the end
+    IF @skip_catalog_version IS NULL THEN
+        UPDATE catalog_versions SET version = version + 1 WHERE table_name = 'reviews';
+    END IF;
+END//
+DELIMITER ;
+
+-- 21. Trigger to bump the pairings catalog version after inserts (drives HTTP ETags)
+DELIMITER //
+CREATE TRIGGER pairings_version_insert
+AFTER INSERT ON pairings
+FOR EACH ROW
+BEGIN
+    -- Bulk loaders set @skip_catalog_version and bump the version once at the end
+    IF @skip_catalog_version IS NULL THEN
+        UPDATE catalog_versions SET version = version + 1 WHERE table_name = 'pairings';
+    END IF;
+END//
+DELIMITER ;
+
+-- 22. Trigger to bump the pairings catalog version after updates (drives HTTP ETags)
+DELIMITER //
+CREATE TRIGGER pairings_version_update
+AFTER UPDATE ON pairings
+FOR EACH ROW
+BEGIN
+    -- Bulk loaders set @skip_catalog_version and bump the version once at the end
+    IF @skip_catalog_version IS NULL THEN
+        UPDATE catalog_versions SET version = version + 1 WHERE table_name = 'pairings';
+    END IF;
+END//
+DELIMITER ;
+
+-- 23. Trigger to bump the pairings catalog version after deletes (drives HTTP ETags)
+DELIMITER //
+CREATE TRIGGER pairings_version_delete
+AFTER DELETE ON pairings
+FOR EACH ROW
+BEGIN
+    -- Bulk loaders set @skip_catalog_version and bump the version once at the end
+    IF @skip_catalog_version IS NULL THEN
+        UPDATE catalog_versions SET version = version + 1 WHERE table_name = 'pairings';
+    END IF;
+END//
+DELIMITER ;
+
 -- ==========================================
 -- PART 2: STORED PROCEDURES
 -- ==========================================
@@ -248,11 +440,17 @@ DELIMITER ;
 DELIMITER //
 CREATE PROCEDURE GetTopRatedWines(IN top_count INT)
 BEGIN
-    SELECT w.*, AVG(r.rating) as avg_rating, COUNT(r.id) as review_count
+    -- Reads the rating aggregates kept on wines instead of grouping reviews,
+    -- ranked by Bayesian average: 10 phantom reviews at the mean rating, so
+    -- one 5-star review doesn't top the list. The weight is fixed at 10 here;
+    -- it does not follow LEADERBOARD_PRIOR_WEIGHT, which only the API reads
+    DECLARE prior_mean DECIMAL(10,6);
+    SELECT COALESCE(SUM(rating_sum) / SUM(rating_count), 0) INTO prior_mean FROM wines;
+    SELECT w.*, w.rating_count as review_count,
+           (prior_mean * 10 + w.rating_sum) / (10 + w.rating_count) as score
     FROM wines w
-    LEFT JOIN reviews r ON w.id = r.wine_id
-    GROUP BY w.id
-    ORDER BY avg_rating DESC, review_count DESC
+    WHERE w.rating_count > 0
+    ORDER BY score DESC, w.rating_count DESC, w.id
     LIMIT top_count;
 END//
 DELIMITER ;
@@ -261,11 +459,17 @@ DELIMITER ;
 DELIMITER //
 CREATE PROCEDURE GetTopRatedCoffees(IN top_count INT)
 BEGIN
-    SELECT c.*, AVG(r.rating) as avg_rating, COUNT(r.id) as review_count
+    -- Reads the rating aggregates kept on coffees instead of grouping reviews,
+    -- ranked by Bayesian average: 10 phantom reviews at the mean rating, so
+    -- one 5-star review doesn't top the list. The weight is fixed at 10 here;
+    -- it does not follow LEADERBOARD_PRIOR_WEIGHT, which only the API reads
+    DECLARE prior_mean DECIMAL(10,6);
+    SELECT COALESCE(SUM(rating_sum) / SUM(rating_count), 0) INTO prior_mean FROM coffees;
+    SELECT c.*, c.rating_count as review_count,
+           (prior_mean * 10 + c.rating_sum) / (10 + c.rating_count) as score
     FROM coffees c
-    LEFT JOIN reviews r ON c.id = r.coffee_id
-    GROUP BY c.id
-    ORDER BY avg_rating DESC, review_count DESC
+    WHERE c.rating_count > 0
+    ORDER BY score DESC, c.rating_count DESC, c.id
     LIMIT top_count;
 END//
 DELIMITER ;
@@ -454,14 +658,15 @@ DETERMINISTIC
 BEGIN
     DECLARE avg_rating DECIMAL(3,2);
     
+    -- Columns are qualified: unqualified names would resolve to the local variable
     IF product_type = 'wine' THEN
-        SELECT COALESCE(AVG(rating), 0) INTO avg_rating
-        FROM reviews
-        WHERE wine_id = product_id;
+        SELECT COALESCE(w.avg_rating, 0) INTO avg_rating
+        FROM wines w
+        WHERE w.id = product_id;
     ELSEIF product_type = 'coffee' THEN
-        SELECT COALESCE(AVG(rating), 0) INTO avg_rating
-        FROM reviews
-        WHERE coffee_id = product_id;
+        SELECT COALESCE(c.avg_rating, 0) INTO avg_rating
+        FROM coffees c
+        WHERE c.id = product_id;
     END IF;
     
     RETURN avg_rating;
@@ -0,0 +1,296 @@
+"""Generate a large, repeatable synthetic dataset for performance testing.
+
+    python generate_dataset.py --wines 1000000 --coffees 1000000 --seed 42
+    python generate_dataset.py --wines 50000 --coffees 50000 --out data/   # CSV partitions
+
+Builds wines and coffees (from the populate_database_1000.py templates),
+customers, reviews, pairings and orders with their order_wines and
+order_coffees items. Ids are explicit and every row depends only on --seed
+and its id (see utils/synthetic.py), so the same arguments always produce
+the same data whatever --workers and --partition-size are.
+
+Each table is split into id-range partitions that a process pool generates
+in parallel; every worker writes its partitions in --batch-size multi-row
+INSERT ... ON DUPLICATE KEY UPDATE statements over its own connection, or
+with --out as one CSV file per partition (wines/coffees parts can be fed to
+load_catalog.py). Tables are written in foreign key order: customers and
+products first, then reviews, pairings and orders.
+
+Workers skip the per-row catalog version and order total triggers (order
+totals are generated with the orders); the catalog versions are bumped once
+at the end and the products' rating aggregates are then rebuilt from the
+reviews. Writing to MySQL refuses to touch tables that already have rows
+unless --overwrite is given, since existing ids would be replaced.
+"""
+import argparse
+import csv
+import os
+import random
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from db.connection import _create_connection
+from models.review_model import ReviewModel
+from utils import synthetic
+from utils.bulk import write_chunk
+
+COLUMNS = {
+    'customers': ('id', 'name', 'email', 'phone', 'address', 'created_at'),
+    'wines': ('id', 'name', 'type', 'region', 'country', 'vintage', 'price', 'alcohol_content',
+              'acidity_level', 'sweetness_level', 'created_at'),
+    'coffees': ('id', 'name', 'type', 'origin', 'country', 'roast_level', 'price', 'description',
+                'acidity_level', 'created_at'),
+    'reviews': ('id', 'wine_id', 'coffee_id', 'customer_id', 'rating', 'comment', 'created_at'),
+    'pairings': ('id', 'wine_id', 'coffee_id', 'pairing_score', 'description'),
+    'orders': ('id', 'customer_id', 'order_date', 'total_amount'),
+    'order_wines': ('order_id', 'wine_id', 'quantity', 'subtotal'),
+    'order_coffees': ('order_id', 'coffee_id', 'quantity', 'subtotal'),
+}
+VERSIONED = ('wines', 'coffees', 'reviews', 'pairings')
+
+def partitions(count, size):
+    """(first_id, count) id ranges covering 1..count"""
+    return [(first, min(size, count - first + 1)) for first in range(1, count + 1, size)]
+
+def _rows(settings, job):
+    """Yield (table, row) for one partition, parents before children"""
+    kind, first_id, count, first_review_id = job
+    seed = settings['seed']
+    rng = random.Random()
+    ids = range(first_id, first_id + count)
+    if kind == 'customers':
+        for i in ids:
+            yield 'customers', synthetic.customer_row(seed, i, rng)
+    elif kind == 'wines':
+        for i in ids:
+            yield 'wines', synthetic.wine_row(seed, i, rng)
+    elif kind == 'coffees':
+        for i in ids:
+            yield 'coffees', synthetic.coffee_row(seed, i, rng)
+    elif kind in ('wine_reviews', 'coffee_reviews'):
+        for row in synthetic.review_rows(seed, kind.split('_')[0] + 's', first_id, count, first_review_id,
+                                         settings['customers'], settings['reviews_per_product']):
+            yield 'reviews', row
+    elif kind == 'pairings':
+        for i in ids:
+            yield 'pairings', synthetic.pairing_row(seed, i, settings['wines'], settings['coffees'], rng)
+    elif kind == 'orders':
+        for i in ids:
+            order, wine_items, coffee_items = synthetic.order_rows(
+                seed, i, settings['customers'], settings['wines'], settings['coffees'], rng)
+            yield 'orders', order
+            for item in wine_items:
+                yield 'order_wines', item
+            for item in coffee_items:
+                yield 'order_coffees', item
+
+def batches(settings, job):
+    """Group a partition's rows into {table: rows} batches of batch_size
+    top-level rows (an order stays with its items); within a batch tables
+    are listed parents first"""
+    parent = 'reviews' if job[0].endswith('_reviews') else job[0]
+    batch = {}
+    size = 0
+    for table, row in _rows(settings, job):
+        if table == parent:
+            if size >= settings['batch_size']:
+                yield batch
+                batch, size = {}, 0
+            size += 1
+        batch.setdefault(table, []).append(row)
+    if batch:
+        yield batch
+
+class CsvSink:
+    """Writes each table of a partition to <out>/<table>/part-<job>-<first id>.csv"""
+    def __init__(self, out, job):
+        self.out = out
+        self.job = job
+        self.files = {}
+
+    def write(self, table, rows):
+        if table not in self.files:
+            directory = os.path.join(self.out, table)
+            os.makedirs(directory, exist_ok=True)
+            name = f"part-{self.job[0]}-{self.job[1]:010d}.csv"
+            f = open(os.path.join(directory, name), 'w', encoding='utf-8', newline='')
+            writer = csv.writer(f)
+            writer.writerow(COLUMNS[table])
+            self.files[table] = (f, writer)
+        writer = self.files[table][1]
+        for row in rows:
+            writer.writerow(['' if row.get(column) is None else row[column] for column in COLUMNS[table]])
+        return len(rows)
+
+    def commit(self):
+        pass
+
+    def close(self):
+        for f, _ in self.files.values():
+            f.close()
+
+class MySQLSink:
+    """Upserts batches over the worker's connection, one transaction per batch"""
+    def __init__(self, conn):
+        self.conn = conn
+        self.errors = []
+
+    def write(self, table, rows):
+        columns = COLUMNS[table]
+        with self.conn.cursor() as cursor:
+            return write_chunk(cursor, table, columns,
+                               [(row.get('id'), [row.get(column) for column in columns]) for row in rows],
+                               self.errors)
+
+    def commit(self):
+        self.conn.commit()
+
+    def close(self):
+        pass
+
+_settings = None
+_connection = None
+
+def _init_worker(settings):
+    global _settings, _connection
+    _settings = settings
+    if not settings['out']:
+        _connection = _create_connection()
+        with _connection.cursor() as cursor:
+            cursor.execute("SET @skip_catalog_version = 1, @skip_order_totals = 1")
+
+def _generate(job):
+    """Worker: generate and write one partition.
+    Returns ({table: rows written}, number of failed rows, the first few failures)"""
+    sink = CsvSink(_settings['out'], job) if _settings['out'] else MySQLSink(_connection)
+    written = {}
+    try:
+        for batch in batches(_settings, job):
+            for table, rows in batch.items():
+                written[table] = written.get(table, 0) + sink.write(table, rows)
+            sink.commit()
+    finally:
+        sink.close()
+    errors = getattr(sink, 'errors', [])
+    return written, len(errors), errors[:5]
+
+def _review_total(job):
+    """Worker: number of reviews a product partition will get"""
+    kind, first_id, count, _ = job
+    rng = random.Random()
+    product_kind = kind.split('_')[0] + 's'
+    return sum(synthetic.review_count(_settings['seed'], product_kind, i, _settings['reviews_per_product'], rng)
+               for i in range(first_id, first_id + count))
+
+def run_phase(pool, label, jobs):
+    """Run jobs on the pool, printing progress; returns rows written per table"""
+    start = time.perf_counter()
+    totals = {}
+    failures = 0
+    futures = [pool.submit(_generate, job) for job in jobs]
+    for done, future in enumerate(as_completed(futures), 1):
+        written, failed, errors = future.result()
+        for table, count in written.items():
+            totals[table] = totals.get(table, 0) + count
+        if failed:
+            failures += failed
+            for error in errors:
+                print(f"  row {error['index']}: {error['error']}")
+        print(f"  {label}: {done}/{len(jobs)} partitions", end='\r')
+    elapsed = time.perf_counter() - start
+    rows = sum(totals.values())
+    print(f"  {label}: {rows:,} rows in {elapsed:.1f} s ({rows / elapsed if elapsed else 0:,.0f} rows/s)"
+          f" - {', '.join(f'{table} {count:,}' for table, count in totals.items())}"
+          + (f", {failures:,} failed" if failures else ''))
+    return totals
+
+def existing_rows():
+    """Tables (of those generated) that already have rows"""
+    conn = _create_connection()
+    try:
+        with conn.cursor() as cursor:
+            busy = []
+            for table in COLUMNS:
+                cursor.execute(f"SELECT 1 FROM {table} LIMIT 1")
+                if cursor.fetchone():
+                    busy.append(table)
+            return busy
+    finally:
+        conn.close()
+
+def bump_versions():
+    conn = _create_connection()
+    try:
+        with conn.cursor() as cursor:
+            cursor.execute("UPDATE catalog_versions SET version = version + 1 WHERE table_name IN %s",
+                           (VERSIONED,))
+        conn.commit()
+    finally:
+        conn.close()
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--wines', type=int, default=1000000)
+    parser.add_argument('--coffees', type=int, default=1000000)
+    parser.add_argument('--customers', type=int, default=100000)
+    parser.add_argument('--orders', type=int, default=500000)
+    parser.add_argument('--pairings', type=int, default=1000000)
+    parser.add_argument('--reviews-per-product', type=float, default=3.0, help='average; the spread is long-tailed')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1)
+    parser.add_argument('--partition-size', type=int, default=50000, help='ids per partition (per task)')
+    parser.add_argument('--batch-size', type=int, default=2000, help='rows per INSERT and transaction')
+    parser.add_argument('--out', help='write CSV partitions under this directory instead of MySQL')
+    parser.add_argument('--overwrite', action='store_true', help='write even if the tables already have rows')
+    args = parser.parse_args()
+
+    if not args.customers and args.orders:
+        parser.error('--orders needs at least one customer')
+    if args.pairings > args.wines * args.coffees:
+        parser.error('--pairings cannot exceed wines x coffees (pairs are unique)')
+    if not args.out and not args.overwrite:
+        busy = existing_rows()
+        if busy:
+            print(f"Refusing to write: {', '.join(busy)} already have rows (use --overwrite or a scratch database)")
+            return 1
+
+    settings = {
+        'seed': args.seed, 'wines': args.wines, 'coffees': args.coffees, 'customers': args.customers,
+        'reviews_per_product': args.reviews_per_product, 'batch_size': max(1, args.batch_size), 'out': args.out
+    }
+    size = max(1, args.partition_size)
+
+    def jobs(kind, count, review_offsets=None):
+        return [(kind, first, n, review_offsets[i] if review_offsets else None)
+                for i, (first, n) in enumerate(partitions(count, size))]
+
+    start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=max(1, args.workers), initializer=_init_worker,
+                             initargs=(settings,)) as pool:
+        print(f"Generating with seed {args.seed} on {args.workers} workers")
+        run_phase(pool, 'customers and products',
+                  jobs('customers', args.customers) + jobs('wines', args.wines) + jobs('coffees', args.coffees))
+
+        # Review ids run on across partitions, so count each partition's
+        # reviews first to know where its ids start
+        review_jobs = jobs('wine_reviews', args.wines) + jobs('coffee_reviews', args.coffees)
+        offsets = []
+        next_id = 1
+        for total in pool.map(_review_total, review_jobs):
+            offsets.append(next_id)
+            next_id += total
+        review_jobs = [job[:3] + (offset,) for job, offset in zip(review_jobs, offsets)]
+
+        run_phase(pool, 'reviews, pairings and orders',
+                  review_jobs + jobs('pairings', args.pairings) + jobs('orders', args.orders))
+
+    if not args.out:
+        bump_versions()
+        # Reviews were written without touching the products' rating aggregates
+        for column in ('wine_id', 'coffee_id'):
+            ReviewModel.reconcile_ratings(column)
+    print(f"Done in {time.perf_counter() - start:.1f} s")
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,250 @@
+"""Bulk-load wines or coffees from CSV or JSONL files.
+
+Replaces the row-by-row population scripts for large catalog refreshes:
+
+    python load_catalog.py wines wines.csv more_wines.jsonl
+    python load_catalog.py coffees coffees.csv --method infile --rebuild-indexes
+
+Columns are those of WineModel/CoffeeModel.BULK_COLUMNS (CSV files need a
+header row; empty CSV fields load as NULL, other columns are ignored). With
+either method, rows with an id that already exists are updated and the rest
+are inserted.
+
+--method batch (default) validates every row like POST /api/<table>/bulk and
+writes multi-row INSERT ... ON DUPLICATE KEY UPDATE statements, one
+transaction per batch, reporting rejected rows. --method infile hands CSV
+files to LOAD DATA LOCAL INFILE (fastest; MySQL does the parsing, so rows are
+only checked by the server and the server must allow local_infile). Each file
+is loaded into a temporary staging table and merged with one INSERT ...
+SELECT ... ON DUPLICATE KEY UPDATE, since LOAD DATA itself can only skip
+existing ids or REPLACE them, and REPLACE deletes the row first, cascading to
+its reviews and pairings.
+
+The per-row catalog version triggers are skipped for the load and the version
+is bumped once at the end, which is all they do. --rebuild-indexes drops the
+table's secondary indexes first and recreates them in one pass afterwards.
+"""
+import argparse
+import csv
+import json
+import os
+import sys
+import time
+
+from db.connection import _create_connection
+from models.wine_model import WineModel
+from models.coffee_model import CoffeeModel
+from utils.bulk import write_chunk
+
+MODELS = {'wines': WineModel, 'coffees': CoffeeModel}
+INTEGER_COLUMNS = ('id', 'vintage')
+
+def read_rows(path):
+    """Yield rows from a .csv or .jsonl/.ndjson file"""
+    if path.endswith(('.jsonl', '.ndjson')):
+        with open(path, encoding='utf-8') as f:
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+    elif path.endswith('.csv'):
+        with open(path, encoding='utf-8', newline='') as f:
+            for row in csv.DictReader(f):
+                yield coerce_csv_row(row)
+    else:
+        raise ValueError(f"{path}: expected a .csv, .jsonl or .ndjson file")
+
+def coerce_csv_row(row):
+    """CSV values are all strings: empty means NULL and integer columns are parsed"""
+    row = {column: (value if value != '' else None) for column, value in row.items()}
+    for column in INTEGER_COLUMNS:
+        value = row.get(column)
+        if value is not None:
+            try:
+                row[column] = int(value)
+            except ValueError:
+                pass  # left as a string for validation to reject
+    return row
+
+def secondary_indexes(cursor, table):
+    """{name: (kind, column list)} for every index but the primary key"""
+    cursor.execute("""SELECT INDEX_NAME, NON_UNIQUE, INDEX_TYPE, COLUMN_NAME, SUB_PART
+                      FROM information_schema.STATISTICS
+                      WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s AND INDEX_NAME <> 'PRIMARY'
+                      ORDER BY INDEX_NAME, SEQ_IN_INDEX""", (table,))
+    indexes = {}
+    for row in cursor.fetchall():
+        kind = 'FULLTEXT INDEX' if row['INDEX_TYPE'] == 'FULLTEXT' else \
+            'INDEX' if row['NON_UNIQUE'] else 'UNIQUE INDEX'
+        column = row['COLUMN_NAME'] + (f"({row['SUB_PART']})" if row['SUB_PART'] else '')
+        indexes.setdefault(row['INDEX_NAME'], (kind, []))[1].append(column)
+    return indexes
+
+def drop_indexes(cursor, table):
+    """Drop the secondary indexes that can be dropped; returns their definitions"""
+    dropped = {}
+    for name, definition in secondary_indexes(cursor, table).items():
+        try:
+            cursor.execute(f"ALTER TABLE {table} DROP INDEX {name}")
+            dropped[name] = definition
+        except Exception as e:
+            # e.g. an index a foreign key depends on
+            print(f"  keeping index {name}: {e}")
+    return dropped
+
+def create_indexes(cursor, table, indexes):
+    """Recreate dropped indexes: regular ones in a single ALTER, FULLTEXT one at a time"""
+    regular = [f"ADD {kind} {name} ({', '.join(columns)})"
+               for name, (kind, columns) in indexes.items() if kind != 'FULLTEXT INDEX']
+    if regular:
+        cursor.execute(f"ALTER TABLE {table} " + ', '.join(regular))
+    for name, (kind, columns) in indexes.items():
+        if kind == 'FULLTEXT INDEX':
+            cursor.execute(f"ALTER TABLE {table} ADD FULLTEXT INDEX {name} ({', '.join(columns)})")
+
+def load_batches(conn, table, model, paths, batch_size):
+    """Validate and upsert rows batch by batch. Returns (written, rejected)"""
+    columns = model.BULK_COLUMNS
+    written = 0
+    errors = []
+    batch = []
+    number = 0
+
+    def flush(cursor):
+        count = write_chunk(cursor, table, columns, batch, errors)
+        conn.commit()
+        batch.clear()
+        return count
+
+    with conn.cursor() as cursor:
+        for path in paths:
+            for row in read_rows(path):
+                number += 1
+                error = model._validate_bulk_row(row)
+                if error:
+                    errors.append({'index': number, 'error': error})
+                    continue
+                batch.append((number, [row.get(column) for column in columns]))
+                if len(batch) >= batch_size:
+                    written += flush(cursor)
+            if batch:
+                written += flush(cursor)
+
+    for error in errors[:20]:
+        print(f"  row {error['index']}: {error['error']}")
+    if len(errors) > 20:
+        print(f"  ... and {len(errors) - 20} more rejected rows")
+    return written, len(errors)
+
+def infile_columns(header, columns):
+    """Column list and SET clause for LOAD DATA: every field is read into a
+    variable so empty strings become NULL, and unknown columns are skipped"""
+    variables = ', '.join(f"@{column}" if column in columns else '@unused' for column in header)
+    assignments = ', '.join(f"{column} = NULLIF(@{column}, '')" for column in header if column in columns)
+    return variables, assignments
+
+def staging_statements(table, columns):
+    """(create, merge, drop) statements for the temporary table a CSV file is
+    loaded into before being upserted into ``table``"""
+    staging = f"{table}_staging"
+    column_list = ', '.join(columns)
+    updates = ', '.join(f"{column} = VALUES({column})" for column in columns if column != 'id')
+    # Same column types as the table but no keys, and a nullable id so rows
+    # without one still get the next AUTO_INCREMENT value when merged
+    create = [f"CREATE TEMPORARY TABLE {staging} SELECT {column_list} FROM {table} LIMIT 0",
+              f"ALTER TABLE {staging} MODIFY id INT NULL"]
+    merge = (f"INSERT INTO {table} ({column_list}) SELECT {column_list} FROM {staging} "
+             f"ON DUPLICATE KEY UPDATE {updates}")
+    return create, merge, f"DROP TEMPORARY TABLE IF EXISTS {staging}"
+
+def load_infile(conn, table, model, paths):
+    """LOAD DATA LOCAL INFILE each CSV file into a staging table and upsert
+    it into ``table``. Returns (written, warnings)"""
+    written = warnings = 0
+    staging = f"{table}_staging"
+    create, merge, drop = staging_statements(table, model.BULK_COLUMNS)
+    with conn.cursor() as cursor:
+        for path in paths:
+            if not path.endswith('.csv'):
+                raise ValueError(f"{path}: --method infile only loads CSV files")
+            with open(path, encoding='utf-8', newline='') as f:
+                first_line = f.readline()
+            header = next(csv.reader([first_line]))
+            variables, assignments = infile_columns(header, model.BULK_COLUMNS)
+            line_end = '\\r\\n' if first_line.endswith('\r\n') else '\\n'
+            try:
+                for statement in create:
+                    cursor.execute(statement)
+                cursor.execute(f"""LOAD DATA LOCAL INFILE %s INTO TABLE {staging}
+                                   CHARACTER SET utf8mb4
+                                   FIELDS TERMINATED BY ',' OPTIONALLY ENCLOSED BY '"'
+                                   LINES TERMINATED BY '{line_end}'
+                                   IGNORE 1 LINES ({variables}) SET {assignments}""", (os.path.abspath(path),))
+                loaded = cursor.rowcount
+                cursor.execute("SHOW COUNT(*) WARNINGS")
+                count = list(cursor.fetchone().values())[0]
+                if count:
+                    warnings += count
+                    cursor.execute("SHOW WARNINGS LIMIT 5")
+                    for warning in cursor.fetchall():
+                        print(f"  {path}: {warning['Message']}")
+                cursor.execute(merge)
+                conn.commit()
+                written += loaded
+            finally:
+                cursor.execute(drop)
+    return written, warnings
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('table', choices=sorted(MODELS))
+    parser.add_argument('paths', nargs='+', help='.csv, .jsonl or .ndjson files')
+    parser.add_argument('--method', choices=('batch', 'infile'), default='batch')
+    parser.add_argument('--batch-size', type=int, default=5000, help='rows per INSERT and transaction')
+    parser.add_argument('--rebuild-indexes', action='store_true',
+                        help='drop secondary indexes before loading and rebuild them after')
+    parser.add_argument('--keep-triggers', action='store_true',
+                        help='let the catalog version triggers fire for every row')
+    args = parser.parse_args()
+
+    table, model = args.table, MODELS[args.table]
+    conn = _create_connection(local_infile=args.method == 'infile')
+    try:
+        with conn.cursor() as cursor:
+            if not args.keep_triggers:
+                cursor.execute("SET @skip_catalog_version = 1")
+            dropped = {}
+            if args.rebuild_indexes:
+                print(f"Dropping secondary indexes on {table}...")
+                dropped = drop_indexes(cursor, table)
+
+        start = time.perf_counter()
+        try:
+            if args.method == 'infile':
+                written, problems = load_infile(conn, table, model, args.paths)
+                problem_label = 'warnings'
+            else:
+                written, problems = load_batches(conn, table, model, args.paths, max(1, args.batch_size))
+                problem_label = 'rejected'
+        finally:
+            with conn.cursor() as cursor:
+                if dropped:
+                    print(f"Rebuilding {len(dropped)} indexes on {table}...")
+                    index_start = time.perf_counter()
+                    create_indexes(cursor, table, dropped)
+                    print(f"  rebuilt in {time.perf_counter() - index_start:.1f} s")
+                if not args.keep_triggers:
+                    # One bump for the whole load, so caches and the API's
+                    # catalog snapshots pick it up
+                    cursor.execute("SET @skip_catalog_version = NULL")
+                    cursor.execute("UPDATE catalog_versions SET version = version + 1 WHERE table_name = %s",
+                                   (table,))
+            conn.commit()
+        elapsed = time.perf_counter() - start
+
+        print(f"Loaded {written} {table} in {elapsed:.1f} s "
+              f"({written / elapsed if elapsed else 0:,.0f} rows/s), {problems} {problem_label}")
+    finally:
+        conn.close()
+
+if __name__ == '__main__':
+    sys.exit(main())
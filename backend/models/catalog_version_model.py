@@ -0,0 +1,36 @@
+from db.connection import get_db_connection
+
+class CatalogVersionModel:
+    # table_name -> callbacks told about every version read (see watch())
+    _watchers = {}
+    
+    @staticmethod
+    def watch(table, callback):
+        """Call ``callback(version)`` with each version of ``table`` read here.
+        
+        In-memory copies (catalog snapshots, leaderboards) use it to learn
+        that a response is about to be labelled (ETag) with a version newer
+        than the one they were built from, and catch up before serving it.
+        """
+        CatalogVersionModel._watchers.setdefault(table, []).append(callback)
+    
+    @staticmethod
+    def get_versions(tables):
+        """Get the change counter and last-modified time for each table.
+        
+        Returns {table_name: {'version': int, 'updated_at': datetime}}; tables
+        without a catalog_versions row are left out.
+        """
+        conn = get_db_connection(readonly=True)
+        try:
+            with conn.cursor() as cursor:
+                placeholders = ', '.join(['%s'] * len(tables))
+                cursor.execute(f"SELECT table_name, version, updated_at FROM catalog_versions "
+                               f"WHERE table_name IN ({placeholders})", tuple(tables))
+                versions = {row['table_name']: row for row in cursor.fetchall()}
+        finally:
+            conn.close()
+        for table, row in versions.items():
+            for callback in CatalogVersionModel._watchers.get(table, ()):
+                callback(row['version'])
+        return versions
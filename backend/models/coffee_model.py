@@ -1,28 +1,95 @@
-from db.connection import get_db_connection
+from db.connection import get_db_connection, stream_query
+from utils.catalog_snapshot import CatalogSnapshot
+from utils.fieldsets import select_list
+from utils.filters import equals_sql
+from utils.bulk import bulk_upsert, validate_row
+from utils.facets import PRICE_EDGES, count_grouped, facet_sql
 
 class CoffeeModel:
+    # Columns that may be requested through ?fields= and returned by default.
+    # The rating aggregates (rating_sum, rating_count, avg_rating, rating_1..5, kept up
+    # to date by ReviewModel) are not among them: they change with every
+    # review, without a catalog version bump, and are served as rating_info.
+    FIELDS = ('id', 'name', 'type', 'origin', 'country', 'roast_level', 'price',
+              'description', 'acidity_level', 'product_id', 'region_id', 'brand_id',
+              'blend_id', 'created_at')
+    COLUMNS = {field: field for field in FIELDS}
+    
+    # In-memory copy serving the hot read paths (see utils/catalog_snapshot.py)
+    SNAPSHOT = CatalogSnapshot(
+        'coffees', indexed=('type', 'country', 'origin', 'roast_level'),
+        numeric=('price',),
+        categorical=('type', 'country', 'origin', 'roast_level', 'acidity_level'),
+        columns=FIELDS)
+    
+    # Search filters: exact matches (a list matches any of its values, like
+    # SQL IN) and inclusive ranges given as column -> (min filter, max filter)
+    EQUALITY_FILTERS = ('type', 'country', 'roast_level', 'acidity_level')
+    RANGE_FILTERS = {'price': ('min_price', 'max_price')}
+    
+    # Columns written by bulk_upsert_coffees(); rows are full records, so an
+    # omitted column is set to NULL on update
+    BULK_COLUMNS = ('id', 'name', 'type', 'origin', 'country', 'roast_level', 'price', 'description', 'acidity_level')
+    
+    # Facet counts returned by get_coffees_faceted(): value counts for these
+    # columns and bucket counts for the numeric ones
+    FACETS = ('type', 'country', 'origin', 'roast_level', 'acidity_level')
+    BUCKETS = {'price': PRICE_EDGES}
+    
+    @staticmethod
+    def _select(fields):
+        """SELECT list for the requested fields (all of FIELDS when None)"""
+        return select_list(fields or CoffeeModel.FIELDS, CoffeeModel.COLUMNS)
+    
     @staticmethod
-    def get_all_coffees():
+    def get_all_coffees(fields=None):
         """Get all coffees from the database"""
-        conn = get_db_connection()
+        if CoffeeModel.SNAPSHOT.ready():
+            return CoffeeModel.SNAPSHOT.all(fields)
+        conn = get_db_connection(readonly=True)
         try:
             with conn.cursor() as cursor:
-                cursor.execute("SELECT * FROM coffees ORDER BY name")
+                cursor.execute(f"SELECT {CoffeeModel._select(fields)} FROM coffees ORDER BY name")
                 return cursor.fetchall()
         finally:
             conn.close()
     
+    @staticmethod
+    def stream_all_coffees(chunk_size=1000, fields=None):
+        """Iterate over all coffees without buffering the table in memory"""
+        return stream_query(f"SELECT {CoffeeModel._select(fields)} FROM coffees ORDER BY name", chunk_size=chunk_size)
+    
     @staticmethod
     def get_coffee_by_id(coffee_id):
         """Get a specific coffee by ID"""
-        conn = get_db_connection()
+        if CoffeeModel.SNAPSHOT.ready():
+            return CoffeeModel.SNAPSHOT.get(coffee_id)
+        conn = get_db_connection(readonly=True)
         try:
             with conn.cursor() as cursor:
-                cursor.execute("SELECT * FROM coffees WHERE id = %s", (coffee_id,))
+                cursor.execute(f"SELECT {CoffeeModel._select(None)} FROM coffees WHERE id = %s", (coffee_id,))
                 return cursor.fetchone()
         finally:
             conn.close()
     
+    @staticmethod
+    def get_coffees_by_ids(coffee_ids, fields=None):
+        """Get several coffees with one query, in the order of coffee_ids (unknown ids are skipped)"""
+        if not coffee_ids:
+            return []
+        if CoffeeModel.SNAPSHOT.ready():
+            rows = [CoffeeModel.SNAPSHOT.get(coffee_id, fields) for coffee_id in coffee_ids]
+            return [row for row in rows if row is not None]
+        conn = get_db_connection(readonly=True)
+        try:
+            with conn.cursor() as cursor:
+                condition, params = equals_sql('id', list(coffee_ids))
+                cursor.execute(f"SELECT {CoffeeModel._select(fields)} FROM coffees WHERE 1=1" + condition, params)
+                by_id = {row['id']: row for row in cursor.fetchall()}
+                return [by_id[coffee_id] for coffee_id in coffee_ids if coffee_id in by_id]
+        finally:
+            conn.close()
+    
     @staticmethod
     def create_coffee(coffee_data):
         """Create a new coffee"""
@@ -38,10 +105,34 @@ class CoffeeModel:
                     coffee_data.get('acidity_level')
                 ))
                 conn.commit()
-                return cursor.lastrowid
+                coffee_id = cursor.lastrowid
+                CoffeeModel.SNAPSHOT.sync(cursor, coffee_id)
+                return coffee_id
         finally:
             conn.close()
     
+    @staticmethod
+    def _validate_bulk_row(row):
+        return validate_row(
+            row,
+            required=('name', 'type'),
+            enums={'roast_level': ('light', 'medium', 'medium-dark', 'dark'),
+                   'acidity_level': ('low', 'medium', 'high')},
+            integers=('id',),
+            decimals=('price',)
+        )
+    
+    @staticmethod
+    def bulk_upsert_coffees(rows, chunk_size=None):
+        """Insert or update many coffees (by id) with multi-row INSERT ... ON DUPLICATE KEY UPDATE.
+        
+        Runs one transaction per chunk and returns a summary with per-row
+        errors (see utils/bulk.py). The catalog snapshot reloads once on its
+        next read rather than being patched row by row.
+        """
+        return bulk_upsert('coffees', CoffeeModel.BULK_COLUMNS, rows, CoffeeModel._validate_bulk_row,
+                           chunk_size, after_chunk=CoffeeModel.SNAPSHOT.invalidate)
+    
     @staticmethod
     def update_coffee(coffee_id, coffee_data):
         """Update an existing coffee"""
@@ -57,7 +148,10 @@ class CoffeeModel:
                     coffee_data.get('acidity_level'), coffee_id
                 ))
                 conn.commit()
-                return cursor.rowcount > 0
+                updated = cursor.rowcount > 0
+                if updated:
+                    CoffeeModel.SNAPSHOT.sync(cursor, coffee_id)
+                return updated
         finally:
             conn.close()
     
@@ -69,53 +163,124 @@ class CoffeeModel:
             with conn.cursor() as cursor:
                 cursor.execute("DELETE FROM coffees WHERE id = %s", (coffee_id,))
                 conn.commit()
-                return cursor.rowcount > 0
+                deleted = cursor.rowcount > 0
+                if deleted:
+                    CoffeeModel.SNAPSHOT.sync(cursor, coffee_id)
+                return deleted
         finally:
             conn.close()
     
     @staticmethod
-    def search_coffees(filters):
+    def _filter_sql(filters):
+        """Build the WHERE conditions and parameters for coffee search filters"""
+        sql = ""
+        params = []
+        
+        for column in CoffeeModel.EQUALITY_FILTERS:
+            if filters.get(column):
+                condition, values = equals_sql(column, filters[column])
+                sql += condition
+                params.extend(values)
+        
+        if filters.get('origin'):
+            sql += " AND origin LIKE %s"
+            params.append(f"%{filters['origin']}%")
+        
+        for column, (low, high) in CoffeeModel.RANGE_FILTERS.items():
+            if filters.get(low):
+                sql += f" AND {column} >= %s"
+                params.append(filters[low])
+            if filters.get(high):
+                sql += f" AND {column} <= %s"
+                params.append(filters[high])
+        
+        return sql, params
+    
+    @staticmethod
+    def _snapshot_filters(filters):
+        """The search filters as CatalogSnapshot.search() equals/contains/ranges"""
+        return {
+            'equals': {c: filters[c] for c in CoffeeModel.EQUALITY_FILTERS if filters.get(c)},
+            'contains': {'origin': filters['origin']} if filters.get('origin') else {},
+            'ranges': {c: (filters.get(low) or None, filters.get(high) or None)
+                       for c, (low, high) in CoffeeModel.RANGE_FILTERS.items()}
+        }
+    
+    @staticmethod
+    def _search_snapshot(filters, fields=None):
+        """Evaluate the search filters against the catalog snapshot"""
+        return CoffeeModel.SNAPSHOT.search(fields=fields, **CoffeeModel._snapshot_filters(filters))
+    
+    @staticmethod
+    def search_coffees(filters, fields=None):
         """Search coffees with filters"""
-        conn = get_db_connection()
+        if CoffeeModel.SNAPSHOT.ready():
+            rows = CoffeeModel._search_snapshot(filters, fields)
+            if rows is not None:
+                return rows
+        conn = get_db_connection(readonly=True)
+        try:
+            with conn.cursor() as cursor:
+                where, params = CoffeeModel._filter_sql(filters)
+                sql = f"SELECT {CoffeeModel._select(fields)} FROM coffees WHERE 1=1" + where + " ORDER BY name"
+                cursor.execute(sql, params)
+                return cursor.fetchall()
+        finally:
+            conn.close()
+    
+    @staticmethod
+    def get_coffees_page(filters, after=None, page_size=50, fields=None):
+        """Get one page of coffees ordered by (name, id), optionally filtered.
+        
+        ``after`` is the (name, id) of the last coffee on the previous page.
+        One extra row is fetched so callers can tell whether another page exists.
+        """
+        conn = get_db_connection(readonly=True)
         try:
             with conn.cursor() as cursor:
-                sql = "SELECT * FROM coffees WHERE 1=1"
-                params = []
-                
-                if filters.get('type'):
-                    sql += " AND type = %s"
-                    params.append(filters['type'])
-                
-                if filters.get('origin'):
-                    sql += " AND origin LIKE %s"
-                    params.append(f"%{filters['origin']}%")
-                
-                if filters.get('country'):
-                    sql += " AND country = %s"
-                    params.append(filters['country'])
-                
-                if filters.get('roast_level'):
-                    sql += " AND roast_level = %s"
-                    params.append(filters['roast_level'])
-                
-                if filters.get('min_price'):
-                    sql += " AND price >= %s"
-                    params.append(filters['min_price'])
-                
-                if filters.get('max_price'):
-                    sql += " AND price <= %s"
-                    params.append(filters['max_price'])
-                
-                sql += " ORDER BY name"
+                where, params = CoffeeModel._filter_sql(filters)
+                sql = f"SELECT {CoffeeModel._select(fields)} FROM coffees WHERE 1=1" + where
+                if after:
+                    sql += " AND (name > %s OR (name = %s AND id > %s))"
+                    params.extend([after[0], after[0], after[1]])
+                sql += " ORDER BY name, id LIMIT %s"
+                params.append(page_size + 1)
                 cursor.execute(sql, params)
                 return cursor.fetchall()
         finally:
             conn.close()
     
+    @staticmethod
+    def get_coffees_faceted(filters, after=None, page_size=50, fields=None):
+        """Get one page of coffees (as get_coffees_page()) plus facet counts.
+        
+        Counts cover every coffee matching the filters, not just the page,
+        and come from a single pass over the catalog snapshot or a single
+        GROUP BY query. Returns (rows, facets).
+        """
+        if CoffeeModel.SNAPSHOT.ready():
+            result = CoffeeModel.SNAPSHOT.facet_search(
+                facets=CoffeeModel.FACETS, buckets=CoffeeModel.BUCKETS, after=after,
+                limit=page_size + 1, fields=fields, **CoffeeModel._snapshot_filters(filters))
+            if result is not None:
+                return result
+        rows = CoffeeModel.get_coffees_page(filters, after, page_size, fields)
+        conn = get_db_connection(readonly=True)
+        try:
+            with conn.cursor() as cursor:
+                where, params = CoffeeModel._filter_sql(filters)
+                sql, bucket_params = facet_sql('coffees', CoffeeModel.FACETS, CoffeeModel.BUCKETS, where)
+                cursor.execute(sql, bucket_params + params)
+                return rows, count_grouped(cursor.fetchall(), CoffeeModel.FACETS, CoffeeModel.BUCKETS)
+        finally:
+            conn.close()
+    
     @staticmethod
     def get_coffee_types():
         """Get all unique coffee types"""
-        conn = get_db_connection()
+        if CoffeeModel.SNAPSHOT.ready():
+            return CoffeeModel.SNAPSHOT.distinct('type')
+        conn = get_db_connection(readonly=True)
         try:
             with conn.cursor() as cursor:
                 cursor.execute("SELECT DISTINCT type FROM coffees ORDER BY type")
@@ -126,7 +291,9 @@ class CoffeeModel:
     @staticmethod
     def get_coffee_origins():
         """Get all unique coffee origins"""
-        conn = get_db_connection()
+        if CoffeeModel.SNAPSHOT.ready():
+            return CoffeeModel.SNAPSHOT.distinct('origin')
+        conn = get_db_connection(readonly=True)
         try:
             with conn.cursor() as cursor:
                 cursor.execute("SELECT DISTINCT origin FROM coffees WHERE origin IS NOT NULL ORDER BY origin")
@@ -137,7 +304,9 @@ class CoffeeModel:
     @staticmethod
     def get_roast_levels():
         """Get all unique roast levels"""
-        conn = get_db_connection()
+        if CoffeeModel.SNAPSHOT.ready():
+            return CoffeeModel.SNAPSHOT.distinct('roast_level')
+        conn = get_db_connection(readonly=True)
         try:
             with conn.cursor() as cursor:
                 cursor.execute("SELECT DISTINCT roast_level FROM coffees WHERE roast_level IS NOT NULL ORDER BY roast_level")
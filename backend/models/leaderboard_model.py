@@ -0,0 +1,145 @@
+import threading
+import time
+from config import Config
+from db.connection import get_pool
+from models.catalog_version_model import CatalogVersionModel
+from models.wine_model import WineModel
+from models.coffee_model import CoffeeModel
+from utils.leaderboard import Leaderboard, LeaderboardSource
+
+class LeaderboardModel:
+    """Top-rated wines and coffees served from in-memory Leaderboards.
+
+    Boards are loaded from the products' rating aggregates and then follow
+    every review write made through ReviewModel (record()). Review writes
+    made elsewhere move the 'reviews' catalog version further than this
+    process's own writes account for, which triggers a reload on the next
+    read after CATALOG_SNAPSHOT_MAX_STALENESS seconds, or right away once a
+    newer reviews version has been read for an ETag, as for CatalogSnapshot.
+    """
+
+    TABLES = {'wine_id': 'wines', 'coffee_id': 'coffees'}
+    MODELS = {'wine_id': WineModel, 'coffee_id': CoffeeModel}
+    BOARDS = {'wine_id': Leaderboard(Config.LEADERBOARD_PRIOR_WEIGHT),
+              'coffee_id': Leaderboard(Config.LEADERBOARD_PRIOR_WEIGHT)}
+    SOURCES = [LeaderboardSource(BOARDS['wine_id'], WineModel.SNAPSHOT),
+               LeaderboardSource(BOARDS['coffee_id'], CoffeeModel.SNAPSHOT)]
+
+    _lock = threading.Lock()
+    _version = None
+    _own_writes = 0
+    _checked_at = 0.0
+    _failed_at = None
+    _required = 0
+
+    @staticmethod
+    def require_version(version):
+        """Note a reviews version about to label a response (an ETag)"""
+        LeaderboardModel._required = max(LeaderboardModel._required, version)
+
+    @staticmethod
+    def _behind():
+        cls = LeaderboardModel
+        return cls._version is not None and cls._required > cls._version + cls._own_writes
+
+    @staticmethod
+    def _load():
+        conn = get_pool().get_connection()
+        try:
+            with conn.cursor() as cursor:
+                cursor.execute("START TRANSACTION WITH CONSISTENT SNAPSHOT")
+                cursor.execute("SELECT version FROM catalog_versions WHERE table_name = 'reviews'")
+                version = cursor.fetchone()['version']
+                rows = {}
+                for column, table in LeaderboardModel.TABLES.items():
+                    cursor.execute(f"SELECT id, type, rating_sum, rating_count FROM {table} WHERE rating_count > 0")
+                    rows[column] = cursor.fetchall()
+            conn.commit()
+        finally:
+            conn.close()
+        for column, board in LeaderboardModel.BOARDS.items():
+            board.load(rows[column])
+        LeaderboardModel._version, LeaderboardModel._own_writes = version, 0
+
+    @staticmethod
+    def _read_version():
+        conn = get_pool().get_connection()
+        try:
+            with conn.cursor() as cursor:
+                cursor.execute("SELECT version FROM catalog_versions WHERE table_name = 'reviews'")
+                row = cursor.fetchone()
+            conn.commit()
+            return row['version'] if row else None
+        finally:
+            conn.close()
+
+    @staticmethod
+    def ready():
+        """Load or re-check the boards when due; False means query MySQL instead"""
+        cls = LeaderboardModel
+        if not Config.LEADERBOARD_ENABLED:
+            return False
+        now = time.monotonic()
+        behind = cls._behind()
+        if cls._version is not None and not behind and now - cls._checked_at < Config.CATALOG_SNAPSHOT_MAX_STALENESS:
+            return True
+        if cls._failed_at is not None and now - cls._failed_at < Config.CATALOG_SNAPSHOT_MAX_STALENESS:
+            return False
+        if not cls._lock.acquire(blocking=cls._version is None or behind):
+            return True  # another thread is checking; keep serving
+        try:
+            if cls._version is None or cls._read_version() != cls._version + cls._own_writes:
+                cls._load()
+            else:
+                cls._version, cls._own_writes = cls._version + cls._own_writes, 0
+            cls._checked_at = time.monotonic()
+            cls._failed_at = None
+            return True
+        except Exception as e:
+            print(f"Leaderboard load failed: {e}")
+            cls._failed_at = time.monotonic()
+            return False
+        finally:
+            cls._lock.release()
+
+    @staticmethod
+    def record(changes, writes=1):
+        """Apply committed rating changes (see ReviewModel._rating_changes) made
+        by ``writes`` review rows, each of which bumped the reviews version"""
+        cls = LeaderboardModel
+        if cls._version is None:
+            return
+        for column, product_id, rating_sum, rating_count, _ in changes:
+            snapshot = cls.MODELS[column].SNAPSHOT
+            product = snapshot.get(product_id) if snapshot.loaded else None
+            cls.BOARDS[column].apply(product_id, rating_sum, rating_count, product and product.get('type'))
+        cls._own_writes += writes
+
+    @staticmethod
+    def top(column, limit, product_type=None):
+        """Top products as rows with avg_rating, review_count and score, or
+        None when the boards are unavailable"""
+        if not LeaderboardModel.ready():
+            return None
+        board = LeaderboardModel.BOARDS[column]
+        # A few spare entries cover products deleted outside the app since the last reload
+        ranked = board.top(limit + 5, product_type)
+        ids = [product_id for product_id, _, _, _ in ranked]
+        if column == 'wine_id':
+            products = {row['id']: row for row in WineModel.get_wines_by_ids(ids)}
+        else:
+            products = {row['id']: row for row in CoffeeModel.get_coffees_by_ids(ids)}
+        results = []
+        for product_id, score, average, count in ranked:
+            if product_id in products and len(results) < limit:
+                results.append({**products[product_id], 'avg_rating': round(average, 2),
+                                'review_count': count, 'score': round(score, 4)})
+        return results
+
+    @staticmethod
+    def prior(column):
+        """(prior mean, prior weight) the board scores with"""
+        board = LeaderboardModel.BOARDS[column]
+        return board.prior_mean, board.prior_weight
+
+CatalogVersionModel.watch('reviews', LeaderboardModel.require_version)
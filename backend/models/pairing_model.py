@@ -1,6 +1,24 @@
 from db.connection import get_db_connection
+from utils.fieldsets import select_list
+from utils.filters import equals_sql
 
 class PairingModel:
+    # Columns that may be requested through ?fields= on the pairing list
+    COLUMNS = {
+        'id': 'p.id', 'wine_id': 'p.wine_id', 'coffee_id': 'p.coffee_id',
+        'pairing_score': 'p.pairing_score', 'description': 'p.description',
+        'created_at': 'p.created_at', 'wine_name': 'w.name', 'wine_type': 'w.type',
+        'coffee_name': 'c.name', 'coffee_type': 'c.type'
+    }
+    
+    @staticmethod
+    def _select(fields):
+        """SELECT list for the requested fields (the full listing when None)"""
+        if fields:
+            return select_list(fields, PairingModel.COLUMNS)
+        return """p.*, w.name as wine_name, w.type as wine_type,
+                         c.name as coffee_name, c.type as coffee_type"""
+    
     @staticmethod
     def create_pairing(pairing_data):
         """Create a new wine-coffee pairing"""
@@ -21,7 +39,7 @@ class PairingModel:
     @staticmethod
     def get_pairing_by_id(pairing_id):
         """Get a specific pairing by ID"""
-        conn = get_db_connection()
+        conn = get_db_connection(readonly=True)
         try:
             with conn.cursor() as cursor:
                 sql = """SELECT p.*, w.name as wine_name, w.type as wine_type,
@@ -35,10 +53,30 @@ class PairingModel:
         finally:
             conn.close()
     
+    @staticmethod
+    def get_pairings_by_ids(pairing_ids, fields=None):
+        """Get several pairings with one query, in the order of pairing_ids (unknown ids are skipped)"""
+        if not pairing_ids:
+            return []
+        conn = get_db_connection(readonly=True)
+        try:
+            with conn.cursor() as cursor:
+                condition, params = equals_sql('p.id', list(pairing_ids))
+                sql = f"""SELECT {PairingModel._select(fields)}
+                         FROM pairings p
+                         LEFT JOIN wines w ON p.wine_id = w.id
+                         LEFT JOIN coffees c ON p.coffee_id = c.id
+                         WHERE 1=1{condition}"""
+                cursor.execute(sql, params)
+                by_id = {row['id']: row for row in cursor.fetchall()}
+                return [by_id[pairing_id] for pairing_id in pairing_ids if pairing_id in by_id]
+        finally:
+            conn.close()
+    
     @staticmethod
     def get_pairings_by_wine(wine_id):
         """Get all pairings for a specific wine"""
-        conn = get_db_connection()
+        conn = get_db_connection(readonly=True)
         try:
             with conn.cursor() as cursor:
                 sql = """SELECT p.*, c.name as coffee_name, c.type as coffee_type,
@@ -55,7 +93,7 @@ class PairingModel:
     @staticmethod
     def get_pairings_by_coffee(coffee_id):
         """Get all pairings for a specific coffee"""
-        conn = get_db_connection()
+        conn = get_db_connection(readonly=True)
         try:
             with conn.cursor() as cursor:
                 sql = """SELECT p.*, w.name as wine_name, w.type as wine_type,
@@ -70,13 +108,12 @@ class PairingModel:
             conn.close()
     
     @staticmethod
-    def get_all_pairings(limit=None):
+    def get_all_pairings(limit=None, fields=None):
         """Get all pairings"""
-        conn = get_db_connection()
+        conn = get_db_connection(readonly=True)
         try:
             with conn.cursor() as cursor:
-                sql = """SELECT p.*, w.name as wine_name, w.type as wine_type,
-                         c.name as coffee_name, c.type as coffee_type
+                sql = f"""SELECT {PairingModel._select(fields)}
                          FROM pairings p
                          LEFT JOIN wines w ON p.wine_id = w.id
                          LEFT JOIN coffees c ON p.coffee_id = c.id
@@ -119,7 +156,7 @@ class PairingModel:
     @staticmethod
     def get_best_pairings(limit=10):
         """Get the best rated pairings"""
-        conn = get_db_connection()
+        conn = get_db_connection(readonly=True)
         try:
             with conn.cursor() as cursor:
                 sql = """SELECT p.*, w.name as wine_name, w.type as wine_type,
@@ -136,36 +173,73 @@ class PairingModel:
             conn.close()
     
     @staticmethod
-    def search_pairings(filters):
+    def _filter_sql(filters):
+        """Build the WHERE conditions and parameters for pairing search filters"""
+        sql = ""
+        params = []
+        
+        if filters.get('wine_type'):
+            sql += " AND w.type = %s"
+            params.append(filters['wine_type'])
+        
+        if filters.get('coffee_type'):
+            sql += " AND c.type = %s"
+            params.append(filters['coffee_type'])
+        
+        if filters.get('min_score'):
+            sql += " AND p.pairing_score >= %s"
+            params.append(filters['min_score'])
+        
+        if filters.get('max_score'):
+            sql += " AND p.pairing_score <= %s"
+            params.append(filters['max_score'])
+        
+        return sql, params
+    
+    @staticmethod
+    def search_pairings(filters, fields=None):
         """Search pairings with filters"""
-        conn = get_db_connection()
+        conn = get_db_connection(readonly=True)
         try:
             with conn.cursor() as cursor:
-                sql = """SELECT p.*, w.name as wine_name, w.type as wine_type,
-                         c.name as coffee_name, c.type as coffee_type
+                where, params = PairingModel._filter_sql(filters)
+                sql = f"""SELECT {PairingModel._select(fields)}
                          FROM pairings p
                          LEFT JOIN wines w ON p.wine_id = w.id
                          LEFT JOIN coffees c ON p.coffee_id = c.id
-                         WHERE 1=1"""
-                params = []
-                
-                if filters.get('wine_type'):
-                    sql += " AND w.type = %s"
-                    params.append(filters['wine_type'])
-                
-                if filters.get('coffee_type'):
-                    sql += " AND c.type = %s"
-                    params.append(filters['coffee_type'])
-                
-                if filters.get('min_score'):
-                    sql += " AND p.pairing_score >= %s"
-                    params.append(filters['min_score'])
-                
-                if filters.get('max_score'):
-                    sql += " AND p.pairing_score <= %s"
-                    params.append(filters['max_score'])
-                
-                sql += " ORDER BY p.pairing_score DESC"
+                         WHERE 1=1""" + where + " ORDER BY p.pairing_score DESC"
+                cursor.execute(sql, params)
+                return cursor.fetchall()
+        finally:
+            conn.close()
+    
+    @staticmethod
+    def get_pairings_page(filters, after=None, page_size=50, fields=None):
+        """Get one page of pairings ordered by (pairing_score, id) descending.
+        
+        ``after`` is the (pairing_score, id) of the last pairing on the previous
+        page. Unscored pairings (NULL) sort last, as MySQL orders NULLs in a
+        descending sort. One extra row is fetched so callers can tell whether
+        another page exists.
+        """
+        conn = get_db_connection(readonly=True)
+        try:
+            with conn.cursor() as cursor:
+                where, params = PairingModel._filter_sql(filters)
+                sql = f"""SELECT {PairingModel._select(fields)}
+                         FROM pairings p
+                         LEFT JOIN wines w ON p.wine_id = w.id
+                         LEFT JOIN coffees c ON p.coffee_id = c.id
+                         WHERE 1=1""" + where
+                if after and after[0] is None:
+                    sql += " AND p.pairing_score IS NULL AND p.id < %s"
+                    params.append(after[1])
+                elif after:
+                    sql += """ AND (p.pairing_score < %s OR (p.pairing_score = %s AND p.id < %s)
+                                    OR p.pairing_score IS NULL)"""
+                    params.extend([after[0], after[0], after[1]])
+                sql += " ORDER BY p.pairing_score DESC, p.id DESC LIMIT %s"
+                params.append(page_size + 1)
                 cursor.execute(sql, params)
                 return cursor.fetchall()
         finally:
@@ -174,7 +248,7 @@ class PairingModel:
     @staticmethod
     def get_pairing_statistics():
         """Get pairing statistics"""
-        conn = get_db_connection()
+        conn = get_db_connection(readonly=True)
         try:
             with conn.cursor() as cursor:
                 # Total pairings
@@ -1,6 +1,73 @@
-from db.connection import get_db_connection
+import pymysql
+from config import Config
+from db.connection import get_db_connection, get_pool, on_commit
+from models.wine_model import WineModel
+from models.coffee_model import CoffeeModel
+from models.leaderboard_model import LeaderboardModel
+from utils.fieldsets import select_list
+from utils.filters import equals_sql
 
 class ReviewModel:
+    # Columns that may be requested through ?fields= on the review feeds
+    COLUMNS = {
+        'id': 'r.id', 'user_id': 'r.user_id', 'customer_id': 'r.customer_id',
+        'wine_id': 'r.wine_id', 'coffee_id': 'r.coffee_id', 'rating': 'r.rating',
+        'comment': 'r.comment', 'created_at': 'r.created_at'
+    }
+    PRODUCT_FEED_COLUMNS = {**COLUMNS, 'username': 'u.username'}
+    USER_FEED_COLUMNS = {**COLUMNS, 'wine_name': 'w.name', 'coffee_name': 'c.name'}
+    
+    # Products carry their own rating aggregates (rating_sum, rating_count,
+    # avg_rating and the star histogram rating_1..rating_5), changed in the
+    # same transaction as every review write so rating reads never scan
+    # reviews. reconcile_ratings() repairs drift from writes made outside the model.
+    RATED_TABLES = {'wine_id': 'wines', 'coffee_id': 'coffees'}
+    STARS = (1, 2, 3, 4, 5)
+    HISTOGRAM_COLUMNS = tuple(f'rating_{star}' for star in STARS)
+    
+    @staticmethod
+    def _rating_deltas(signed_reviews):
+        """Sum (review, +1/-1) pairs into [(product column, product id, rating
+        sum delta, count delta, per-star count deltas)], ordered by product so
+        concurrent writers lock product rows alike"""
+        changes = {}
+        for review, sign in signed_reviews:
+            if not review:
+                continue
+            for column in ReviewModel.RATED_TABLES:
+                if review.get(column) is not None:
+                    rating = int(review['rating'])
+                    delta = changes.setdefault((column, review[column]), [0, 0, [0] * len(ReviewModel.STARS)])
+                    delta[0] += sign * rating
+                    delta[1] += sign
+                    delta[2][rating - 1] += sign
+        return [(column, product_id, rating_sum, count, tuple(stars))
+                for (column, product_id), (rating_sum, count, stars) in sorted(changes.items())
+                if any(stars)]
+    
+    @staticmethod
+    def _rating_changes(old, new):
+        """Aggregate deltas (see _rating_deltas()) for a review going from
+        ``old`` to ``new`` (either may be None)"""
+        return ReviewModel._rating_deltas(((old, -1), (new, 1)))
+    
+    @staticmethod
+    def _apply_rating_changes(cursor, changes):
+        """Add rating deltas to the products' aggregates (assignments run left
+        to right, so avg_rating sees the new sum and count)"""
+        stars = ', '.join(f"{column} = {column} + %s" for column in ReviewModel.HISTOGRAM_COLUMNS)
+        for column, product_id, rating_sum, count, star_counts in changes:
+            cursor.execute(f"""UPDATE {ReviewModel.RATED_TABLES[column]}
+                               SET rating_sum = rating_sum + %s, rating_count = rating_count + %s,
+                                   avg_rating = IF(rating_count > 0, rating_sum / rating_count, NULL),
+                                   {stars}
+                               WHERE id = %s""", (rating_sum, count, *star_counts, product_id))
+    
+    @staticmethod
+    def _locked_review(cursor, review_id):
+        cursor.execute("SELECT wine_id, coffee_id, rating FROM reviews WHERE id = %s FOR UPDATE", (review_id,))
+        return cursor.fetchone()
+    
     @staticmethod
     def create_review(review_data):
         """Create a new review"""
@@ -14,15 +81,99 @@ class ReviewModel:
                     review_data.get('coffee_id'), review_data['rating'],
                     review_data.get('comment')
                 ))
+                review_id = cursor.lastrowid
+                changes = ReviewModel._rating_changes(None, review_data)
+                ReviewModel._apply_rating_changes(cursor, changes)
                 conn.commit()
-                return cursor.lastrowid
+                on_commit(lambda: LeaderboardModel.record(changes))
+                return review_id
         finally:
             conn.close()
     
+    INSERT_COLUMNS = ('user_id', 'wine_id', 'coffee_id', 'rating', 'comment')
+    
+    @staticmethod
+    def create_reviews(reviews):
+        """Insert a batch of validated reviews (the write-behind queue's drain).
+        
+        One multi-row INSERT, replayed row by row if it fails so one bad review
+        (e.g. its product was deleted meanwhile) doesn't sink the batch. Each
+        product's aggregates and the reviews catalog version are updated once
+        for the whole batch, in the same transaction. Returns one entry per
+        review: None if written, else the error message.
+        
+        Reviews carrying a queue tracking_id are written at most once: ids
+        already in reviews (a retried batch whose commit went through) count
+        as written but are neither inserted again nor added to the aggregates.
+        Raises only if nothing was committed, so the batch can then be retried.
+        """
+        columns = ReviewModel.INSERT_COLUMNS + ('tracking_id',)
+        row = '(' + ', '.join(['%s'] * len(columns)) + ')'
+        sql = f"INSERT INTO reviews ({', '.join(columns)}) VALUES "
+        # Guard only: the locking read below already keeps duplicates out
+        on_duplicate = " ON DUPLICATE KEY UPDATE tracking_id = tracking_id"
+        results = [None] * len(reviews)
+        inserted = []
+        committed = False
+        conn = get_pool().get_connection()
+        try:
+            with conn.cursor() as cursor:
+                cursor.execute("SET @skip_catalog_version = 1")
+                tracking_ids = [review['tracking_id'] for review in reviews if review.get('tracking_id')]
+                existing = set()
+                if tracking_ids:
+                    # FOR UPDATE also locks the gaps of absent ids until commit
+                    cursor.execute(f"""SELECT tracking_id FROM reviews
+                                       WHERE tracking_id IN ({', '.join(['%s'] * len(tracking_ids))})
+                                       FOR UPDATE""", tracking_ids)
+                    existing = {found['tracking_id'] for found in cursor.fetchall()}
+                fresh = [index for index, review in enumerate(reviews) if review.get('tracking_id') not in existing]
+                values = {index: [reviews[index].get(column) for column in columns] for index in fresh}
+                if fresh:
+                    try:
+                        cursor.execute(sql + ', '.join([row] * len(fresh)) + on_duplicate,
+                                       [value for index in fresh for value in values[index]])
+                        inserted = fresh
+                    except pymysql.MySQLError:
+                        for index in fresh:
+                            try:
+                                cursor.execute(sql + row + on_duplicate, values[index])
+                                if cursor.rowcount == 1:
+                                    inserted.append(index)
+                            except pymysql.MySQLError as e:
+                                results[index] = str(e)
+                # Bump the version before touching the products: the single-review
+                # writes lock catalog_versions first too (their reviews trigger
+                # fires before _apply_rating_changes), so every path takes the
+                # locks in the same order and cannot deadlock with a batch
+                if inserted:
+                    cursor.execute("UPDATE catalog_versions SET version = version + 1 WHERE table_name = 'reviews'")
+                changes = ReviewModel._rating_deltas((reviews[index], 1) for index in inserted)
+                ReviewModel._apply_rating_changes(cursor, changes)
+                conn.commit()
+                committed = True
+                cursor.execute("SET @skip_catalog_version = NULL")
+        except Exception as e:
+            # Closing rolls back anything uncommitted, and a connection that may
+            # still skip the version triggers must not go back to the pool
+            conn.discard()
+            if not committed:
+                raise
+            print(f"Review batch committed, but resetting its connection failed: {e}")
+        else:
+            conn.close()
+        if inserted:
+            try:
+                LeaderboardModel.record(changes)
+            except Exception as e:
+                # The boards reload once they see the unaccounted version bump
+                print(f"Leaderboard update failed: {e}")
+        return results
+    
     @staticmethod
     def get_review_by_id(review_id):
         """Get a specific review by ID"""
-        conn = get_db_connection()
+        conn = get_db_connection(readonly=True)
         try:
             with conn.cursor() as cursor:
                 sql = """SELECT r.*, u.username, w.name as wine_name, c.name as coffee_name
@@ -37,59 +188,54 @@ class ReviewModel:
             conn.close()
     
     @staticmethod
-    def get_reviews_by_wine(wine_id, limit=None):
-        """Get all reviews for a specific wine"""
-        conn = get_db_connection()
+    def _feed(column, value, columns, joins, limit=None, after=None):
+        """Reviews with ``column`` = ``value``, newest first.
+        
+        Ordered by (created_at, id) descending to match the idx_reviews_*_created
+        indexes, so MySQL reads the feed in index order instead of sorting.
+        ``after`` is the (created_at, id) of the last review on the previous page.
+        """
+        conn = get_db_connection(readonly=True)
         try:
             with conn.cursor() as cursor:
-                sql = """SELECT r.*, u.username
+                sql = f"""SELECT {columns}
                          FROM reviews r
-                         LEFT JOIN users u ON r.user_id = u.id
-                         WHERE r.wine_id = %s
-                         ORDER BY r.created_at DESC"""
+                         {joins}
+                         WHERE r.{column} = %s"""
+                params = [value]
+                if after:
+                    sql += " AND (r.created_at < %s OR (r.created_at = %s AND r.id < %s))"
+                    params.extend([after[0], after[0], after[1]])
+                sql += " ORDER BY r.created_at DESC, r.id DESC"
                 if limit:
-                    sql += f" LIMIT {limit}"
-                cursor.execute(sql, (wine_id,))
+                    sql += " LIMIT %s"
+                    params.append(limit)
+                cursor.execute(sql, params)
                 return cursor.fetchall()
         finally:
             conn.close()
     
     @staticmethod
-    def get_reviews_by_coffee(coffee_id, limit=None):
+    def get_reviews_by_wine(wine_id, limit=None, fields=None, after=None):
+        """Get all reviews for a specific wine"""
+        columns = select_list(fields, ReviewModel.PRODUCT_FEED_COLUMNS) if fields else "r.*, u.username"
+        return ReviewModel._feed('wine_id', wine_id, columns,
+                                 "LEFT JOIN users u ON r.user_id = u.id", limit, after)
+    
+    @staticmethod
+    def get_reviews_by_coffee(coffee_id, limit=None, fields=None, after=None):
         """Get all reviews for a specific coffee"""
-        conn = get_db_connection()
-        try:
-            with conn.cursor() as cursor:
-                sql = """SELECT r.*, u.username
-                         FROM reviews r
-                         LEFT JOIN users u ON r.user_id = u.id
-                         WHERE r.coffee_id = %s
-                         ORDER BY r.created_at DESC"""
-                if limit:
-                    sql += f" LIMIT {limit}"
-                cursor.execute(sql, (coffee_id,))
-                return cursor.fetchall()
-        finally:
-            conn.close()
+        columns = select_list(fields, ReviewModel.PRODUCT_FEED_COLUMNS) if fields else "r.*, u.username"
+        return ReviewModel._feed('coffee_id', coffee_id, columns,
+                                 "LEFT JOIN users u ON r.user_id = u.id", limit, after)
     
     @staticmethod
-    def get_reviews_by_user(user_id, limit=None):
+    def get_reviews_by_user(user_id, limit=None, fields=None, after=None):
         """Get all reviews by a specific user"""
-        conn = get_db_connection()
-        try:
-            with conn.cursor() as cursor:
-                sql = """SELECT r.*, w.name as wine_name, c.name as coffee_name
-                         FROM reviews r
-                         LEFT JOIN wines w ON r.wine_id = w.id
-                         LEFT JOIN coffees c ON r.coffee_id = c.id
-                         WHERE r.user_id = %s
-                         ORDER BY r.created_at DESC"""
-                if limit:
-                    sql += f" LIMIT {limit}"
-                cursor.execute(sql, (user_id,))
-                return cursor.fetchall()
-        finally:
-            conn.close()
+        columns = select_list(fields, ReviewModel.USER_FEED_COLUMNS) if fields else "r.*, w.name as wine_name, c.name as coffee_name"
+        return ReviewModel._feed('user_id', user_id, columns,
+                                 """LEFT JOIN wines w ON r.wine_id = w.id
+                         LEFT JOIN coffees c ON r.coffee_id = c.id""", limit, after)
     
     @staticmethod
     def update_review(review_id, review_data):
@@ -97,12 +243,21 @@ class ReviewModel:
         conn = get_db_connection()
         try:
             with conn.cursor() as cursor:
+                old = ReviewModel._locked_review(cursor, review_id)
                 sql = "UPDATE reviews SET rating = %s, comment = %s WHERE id = %s"
                 cursor.execute(sql, (
                     review_data['rating'], review_data.get('comment'), review_id
                 ))
+                writes = cursor.rowcount
+                updated = writes > 0
+                changes = []
+                if old:
+                    new = {**old, 'rating': review_data['rating']}
+                    changes = ReviewModel._rating_changes(old, new)
+                    ReviewModel._apply_rating_changes(cursor, changes)
                 conn.commit()
-                return cursor.rowcount > 0
+                on_commit(lambda: LeaderboardModel.record(changes, writes))
+                return updated
         finally:
             conn.close()
     
@@ -112,74 +267,140 @@ class ReviewModel:
         conn = get_db_connection()
         try:
             with conn.cursor() as cursor:
+                old = ReviewModel._locked_review(cursor, review_id)
                 cursor.execute("DELETE FROM reviews WHERE id = %s", (review_id,))
+                deleted = cursor.rowcount > 0
+                changes = ReviewModel._rating_changes(old, None) if deleted else []
+                ReviewModel._apply_rating_changes(cursor, changes)
                 conn.commit()
-                return cursor.rowcount > 0
+                on_commit(lambda: LeaderboardModel.record(changes, int(deleted)))
+                return deleted
         finally:
             conn.close()
     
+    @staticmethod
+    def _rating_info(row):
+        return {
+            'average_rating': float(row['avg_rating']) if row and row['avg_rating'] else 0,
+            'review_count': row['rating_count'] if row else 0,
+            # Reviews per star, {"1": n, ..., "5": n}
+            'histogram': {str(star): row[f'rating_{star}'] if row else 0 for star in ReviewModel.STARS}
+        }
+    
     @staticmethod
     def get_average_rating_wine(wine_id):
         """Get average rating for a wine"""
-        conn = get_db_connection()
-        try:
-            with conn.cursor() as cursor:
-                cursor.execute("SELECT AVG(rating) as avg_rating, COUNT(*) as review_count FROM reviews WHERE wine_id = %s", (wine_id,))
-                result = cursor.fetchone()
-                return {
-                    'average_rating': float(result['avg_rating']) if result['avg_rating'] else 0,
-                    'review_count': result['review_count']
-                }
-        finally:
-            conn.close()
+        return ReviewModel._average_ratings('wine_id', [wine_id])[wine_id]
     
     @staticmethod
     def get_average_rating_coffee(coffee_id):
         """Get average rating for a coffee"""
-        conn = get_db_connection()
+        return ReviewModel._average_ratings('coffee_id', [coffee_id])[coffee_id]
+    
+    @staticmethod
+    def _average_ratings(column, product_ids):
+        """Rating info (as get_average_rating_wine()) for many products from their aggregate columns"""
+        ratings = {product_id: ReviewModel._rating_info(None) for product_id in product_ids}
+        if not product_ids:
+            return ratings
+        conn = get_db_connection(readonly=True)
         try:
             with conn.cursor() as cursor:
-                cursor.execute("SELECT AVG(rating) as avg_rating, COUNT(*) as review_count FROM reviews WHERE coffee_id = %s", (coffee_id,))
-                result = cursor.fetchone()
-                return {
-                    'average_rating': float(result['avg_rating']) if result['avg_rating'] else 0,
-                    'review_count': result['review_count']
-                }
+                condition, params = equals_sql('id', list(product_ids))
+                cursor.execute(f"""SELECT id, avg_rating, rating_count, {', '.join(ReviewModel.HISTOGRAM_COLUMNS)}
+                                   FROM {ReviewModel.RATED_TABLES[column]}
+                                   WHERE 1=1{condition}""", params)
+                for result in cursor.fetchall():
+                    ratings[result['id']] = ReviewModel._rating_info(result)
+                return ratings
         finally:
             conn.close()
     
     @staticmethod
-    def get_top_rated_wines(limit=10):
-        """Get top rated wines"""
-        conn = get_db_connection()
+    def get_average_ratings_wines(wine_ids):
+        """Get {wine_id: rating info} for several wines"""
+        return ReviewModel._average_ratings('wine_id', wine_ids)
+    
+    @staticmethod
+    def get_average_ratings_coffees(coffee_ids):
+        """Get {coffee_id: rating info} for several coffees"""
+        return ReviewModel._average_ratings('coffee_id', coffee_ids)
+    
+    @staticmethod
+    def _top_rated(column, columns, limit, product_type=None):
+        """Products with reviews by Bayesian score (see utils.leaderboard),
+        from the in-memory leaderboard when available, else from MySQL"""
+        products = LeaderboardModel.top(column, limit, product_type)
+        if products is not None:
+            return products
+        conn = get_db_connection(readonly=True)
         try:
             with conn.cursor() as cursor:
-                sql = """SELECT w.*, AVG(r.rating) as avg_rating, COUNT(r.id) as review_count
-                         FROM wines w
-                         LEFT JOIN reviews r ON w.id = r.wine_id
-                         GROUP BY w.id
-                         HAVING review_count > 0
-                         ORDER BY avg_rating DESC, review_count DESC
+                table = ReviewModel.RATED_TABLES[column]
+                condition, params = equals_sql('type', product_type) if product_type else ('', [])
+                sql = f"""SELECT {columns}, avg_rating, rating_count AS review_count,
+                                (prior.mean * %s + rating_sum) / (%s + rating_count) AS score
+                         FROM {table}
+                         CROSS JOIN (SELECT COALESCE(SUM(rating_sum) / SUM(rating_count), 0) AS mean
+                                     FROM {table}) prior
+                         WHERE rating_count > 0{condition}
+                         ORDER BY score DESC, rating_count DESC, id
                          LIMIT %s"""
-                cursor.execute(sql, (limit,))
+                weight = Config.LEADERBOARD_PRIOR_WEIGHT
+                cursor.execute(sql, [weight, weight] + params + [limit])
                 return cursor.fetchall()
         finally:
             conn.close()
     
     @staticmethod
-    def get_top_rated_coffees(limit=10):
-        """Get top rated coffees"""
-        conn = get_db_connection()
+    def get_top_rated_wines(limit=10, product_type=None):
+        """Get top rated wines, optionally of one type"""
+        return ReviewModel._top_rated('wine_id', WineModel._select(None), limit, product_type)
+    
+    @staticmethod
+    def get_top_rated_coffees(limit=10, product_type=None):
+        """Get top rated coffees, optionally of one type"""
+        return ReviewModel._top_rated('coffee_id', CoffeeModel._select(None), limit, product_type)
+    
+    @staticmethod
+    def reconcile_ratings(column, chunk_size=10000):
+        """Recompute one product table's rating aggregates and histograms from reviews.
+        
+        Walks the table in id ranges, one transaction each, and only rewrites
+        rows whose aggregates drifted. Returns the number of rows fixed.
+        """
+        table = ReviewModel.RATED_TABLES[column]
+        counts = ', '.join(f"SUM(rating = {star}) AS rating_{star}" for star in ReviewModel.STARS)
+        assignments = ', '.join(f"p.{name} = COALESCE(r.{name}, 0)" for name in ReviewModel.HISTOGRAM_COLUMNS)
+        unchanged = ' AND '.join(f"p.{name} <=> COALESCE(r.{name}, 0)" for name in ReviewModel.HISTOGRAM_COLUMNS)
+        conn = get_pool().get_connection()
         try:
             with conn.cursor() as cursor:
-                sql = """SELECT c.*, AVG(r.rating) as avg_rating, COUNT(r.id) as review_count
-                         FROM coffees c
-                         LEFT JOIN reviews r ON c.id = r.coffee_id
-                         GROUP BY c.id
-                         HAVING review_count > 0
-                         ORDER BY avg_rating DESC, review_count DESC
-                         LIMIT %s"""
-                cursor.execute(sql, (limit,))
-                return cursor.fetchall()
+                cursor.execute(f"SELECT COALESCE(MAX(id), 0) AS max_id FROM {table}")
+                max_id = cursor.fetchone()['max_id']
+                fixed = 0
+                for low in range(1, max_id + 1, chunk_size):
+                    high = low + chunk_size - 1
+                    cursor.execute(f"""UPDATE {table} p
+                                       LEFT JOIN (SELECT {column} AS product_id, SUM(rating) AS rating_sum,
+                                                         COUNT(*) AS rating_count, {counts}
+                                                  FROM reviews WHERE {column} BETWEEN %s AND %s
+                                                  GROUP BY {column}) r ON r.product_id = p.id
+                                       SET p.rating_sum = COALESCE(r.rating_sum, 0),
+                                           p.rating_count = COALESCE(r.rating_count, 0),
+                                           p.avg_rating = r.rating_sum / r.rating_count,
+                                           {assignments}
+                                       WHERE p.id BETWEEN %s AND %s
+                                         AND NOT (p.rating_sum <=> COALESCE(r.rating_sum, 0)
+                                                  AND p.rating_count <=> COALESCE(r.rating_count, 0)
+                                                  AND {unchanged})""",
+                                   (low, high, low, high))
+                    fixed += cursor.rowcount
+                    conn.commit()
+                if fixed:
+                    # Cached rating responses are keyed on the reviews version
+                    cursor.execute("UPDATE catalog_versions SET version = version + 1 WHERE table_name = 'reviews'")
+                    conn.commit()
+                return fixed
         finally:
-            conn.close() 
\ No newline at end of file
+            conn.close()
@@ -0,0 +1,80 @@
+import threading
+import time
+from config import Config
+from models.review_model import ReviewModel
+from utils.review_queue import ReviewQueue
+
+class ReviewQueueModel:
+    """Write-behind ingestion for POST /api/reviews/ (REVIEW_QUEUE_ENABLED).
+
+    Accepted reviews are queued in a local SQLite file and written to MySQL
+    by one background thread per process, a batch at a time, so a burst of
+    reviews becomes a few multi-row INSERTs instead of one transaction each.
+    Each process needs its own REVIEW_QUEUE_PATH.
+    """
+
+    FIELDS = ReviewModel.INSERT_COLUMNS
+
+    _queue = None
+    _lock = threading.Lock()
+    _worker = None
+
+    @staticmethod
+    def queue():
+        with ReviewQueueModel._lock:
+            if ReviewQueueModel._queue is None:
+                ReviewQueueModel._queue = ReviewQueue(Config.REVIEW_QUEUE_PATH)
+            return ReviewQueueModel._queue
+
+    @staticmethod
+    def enqueue(review_data):
+        """Durably queue a validated review; returns its tracking id"""
+        review = {field: review_data.get(field) for field in ReviewQueueModel.FIELDS}
+        return ReviewQueueModel.queue().put(review)
+
+    @staticmethod
+    def status(tracking_id):
+        """Queue entry for a tracking id ('queued', 'writing', 'written' or 'failed'), or None"""
+        return ReviewQueueModel.queue().status(tracking_id)
+
+    @staticmethod
+    def drain(batch_size=None):
+        """Write one batch of queued reviews to MySQL; returns how many were taken"""
+        queue = ReviewQueueModel.queue()
+        batch = queue.take(batch_size or Config.REVIEW_QUEUE_BATCH_SIZE)
+        if not batch:
+            return 0
+        try:
+            results = ReviewModel.create_reviews([review for _, review in batch])
+        except Exception:
+            # create_reviews() only raises before its commit; retry the batch on
+            # the next pass (reviews already written are skipped by tracking id)
+            queue.release([seq for seq, _ in batch])
+            raise
+        queue.finish([(seq, error) for (seq, _), error in zip(batch, results)])
+        return len(batch)
+
+    @staticmethod
+    def _run():
+        queue = ReviewQueueModel.queue()
+        while True:
+            try:
+                # A partial batch means the queue is drained; give the next burst time to build up
+                if ReviewQueueModel.drain() < Config.REVIEW_QUEUE_BATCH_SIZE:
+                    queue.purge(Config.REVIEW_QUEUE_RETENTION)
+                    time.sleep(Config.REVIEW_QUEUE_INTERVAL)
+            except Exception as e:
+                print(f"Review queue drain failed: {e}")
+                time.sleep(Config.REVIEW_QUEUE_INTERVAL)
+
+    @staticmethod
+    def start():
+        """Start the background writer (once), first re-queueing reviews a
+        previous run had claimed but not recorded as written"""
+        with ReviewQueueModel._lock:
+            if ReviewQueueModel._worker is not None:
+                return
+            ReviewQueueModel._worker = threading.Thread(target=ReviewQueueModel._run,
+                                                        name='review-queue', daemon=True)
+        ReviewQueueModel.queue().requeue_claimed()
+        ReviewQueueModel._worker.start()
@@ -0,0 +1,118 @@
+from db.connection import get_db_connection
+from models.wine_model import WineModel
+from models.coffee_model import CoffeeModel
+from utils.search_index import CatalogSearchIndex
+from utils.autocomplete import AutocompleteIndex, SuggestionSource
+
+class SearchModel:
+    # Kinds of product /api/search covers, with the FULLTEXT column list of each
+    # (must match ft_wines_search / ft_coffees_search in schema.sql)
+    KINDS = ('wine', 'coffee')
+
+    # In-process BM25 indexes over the same columns, kept in step with the
+    # catalog snapshots so queries never touch MySQL
+    INDEXES = {
+        'wine': CatalogSearchIndex(WineModel.SNAPSHOT, ('name', 'region', 'country')),
+        'coffee': CatalogSearchIndex(CoffeeModel.SNAPSHOT, ('name', 'origin', 'country', 'description')),
+    }
+    
+    # Typo-tolerant suggestions for the search box, fed by the same snapshots
+    AUTOCOMPLETE = AutocompleteIndex()
+    SUGGESTION_SOURCES = {
+        'wine': SuggestionSource(AUTOCOMPLETE, WineModel.SNAPSHOT, 'wine', ('name', 'region')),
+        'coffee': SuggestionSource(AUTOCOMPLETE, CoffeeModel.SNAPSHOT, 'coffee', ('name', 'origin')),
+    }
+    
+    WINE_MATCH = "MATCH(name, region, country) AGAINST (%s IN NATURAL LANGUAGE MODE)"
+    COFFEE_MATCH = "MATCH(name, origin, country, description) AGAINST (%s IN NATURAL LANGUAGE MODE)"
+
+    @staticmethod
+    def search_products(query, kinds=KINDS, after=None, page_size=50):
+        """Relevance-ranked FULLTEXT search over wines and coffees.
+
+        Results are ordered by (score DESC, kind, id) and ``after`` is the
+        (score, kind, id) of the last result on the previous page. One extra
+        row is fetched so callers can tell whether another page exists.
+        """
+        conn = get_db_connection(readonly=True)
+        try:
+            with conn.cursor() as cursor:
+                parts = []
+                params = []
+                if 'wine' in kinds:
+                    parts.append(f"""SELECT 'wine' AS kind, id, name, type, region, NULL AS origin,
+                                            country, price, {SearchModel.WINE_MATCH} AS score
+                                     FROM wines WHERE {SearchModel.WINE_MATCH}""")
+                    params.extend([query, query])
+                if 'coffee' in kinds:
+                    parts.append(f"""SELECT 'coffee' AS kind, id, name, type, NULL AS region, origin,
+                                            country, price, {SearchModel.COFFEE_MATCH} AS score
+                                     FROM coffees WHERE {SearchModel.COFFEE_MATCH}""")
+                    params.extend([query, query])
+
+                sql = "SELECT * FROM (" + " UNION ALL ".join(parts) + ") results WHERE 1=1"
+                if after:
+                    sql += " AND (score < %s OR (score = %s AND (kind > %s OR (kind = %s AND id > %s))))"
+                    params.extend([after[0], after[0], after[1], after[1], after[2]])
+                sql += " ORDER BY score DESC, kind, id LIMIT %s"
+                params.append(page_size + 1)
+                cursor.execute(sql, params)
+                return cursor.fetchall()
+        finally:
+            conn.close()
+    
+    @staticmethod
+    def warm():
+        """Load the catalog snapshots, and with them the search indexes"""
+        for index in SearchModel.INDEXES.values():
+            index.snapshot.ready()
+    
+    @staticmethod
+    def search_index(query, kinds=KINDS, after=None, page_size=50):
+        """BM25 search over the in-process indexes, shaped like search_products().
+        
+        Returns None when a snapshot is unavailable so callers can fall back
+        to FULLTEXT.
+        """
+        results = []
+        for kind in kinds:
+            index = SearchModel.INDEXES[kind]
+            if not index.snapshot.ready():
+                return None
+            
+            # Resume each index after the cursor's position in (score, kind, id) order
+            kind_after = None
+            if after:
+                score, after_kind, after_id = after
+                if kind == after_kind:
+                    kind_after = (score, after_id)
+                else:
+                    kind_after = (score, float('inf') if kind < after_kind else 0)
+            
+            for row_id, score in index.search(query, page_size + 1, after=kind_after):
+                row = index.snapshot.get(row_id)
+                if row is None:
+                    continue
+                results.append({
+                    'kind': kind,
+                    'id': row_id,
+                    'name': row.get('name'),
+                    'type': row.get('type'),
+                    'region': row.get('region'),
+                    'origin': row.get('origin'),
+                    'country': row.get('country'),
+                    'price': row.get('price'),
+                    'score': score
+                })
+        
+        results.sort(key=lambda r: (-r['score'], r['kind'], r['id']))
+        return results[:page_size + 1]
+    
+    @staticmethod
+    def autocomplete(query, kinds=KINDS, limit=10):
+        """(suggestions, corrected_query) for a partly typed query, or None
+        while a catalog snapshot is unavailable"""
+        for kind in kinds:
+            if not SearchModel.SUGGESTION_SOURCES[kind].snapshot.ready():
+                return None
+        return SearchModel.AUTOCOMPLETE.suggest(query, limit, set(kinds))
@@ -1,28 +1,97 @@
-from db.connection import get_db_connection
+from db.connection import get_db_connection, stream_query
+from utils.catalog_snapshot import CatalogSnapshot
+from utils.fieldsets import select_list
+from utils.filters import equals_sql
+from utils.bulk import bulk_upsert, validate_row
+from utils.facets import PRICE_EDGES, VINTAGE_EDGES, count_grouped, facet_sql
 
 class WineModel:
+    # Columns that may be requested through ?fields= and returned by default.
+    # The rating aggregates (rating_sum, rating_count, avg_rating, rating_1..5, kept up
+    # to date by ReviewModel) are not among them: they change with every
+    # review, without a catalog version bump, and are served as rating_info.
+    FIELDS = ('id', 'name', 'type', 'region', 'country', 'vintage', 'price',
+              'alcohol_content', 'acidity_level', 'sweetness_level', 'product_id',
+              'region_id', 'brand_id', 'blend_id', 'created_at')
+    COLUMNS = {field: field for field in FIELDS}
+    
+    # In-memory copy serving the hot read paths (see utils/catalog_snapshot.py)
+    SNAPSHOT = CatalogSnapshot(
+        'wines', indexed=('type', 'country', 'region'),
+        numeric=('price', 'vintage', 'alcohol_content'),
+        categorical=('type', 'country', 'region', 'acidity_level', 'sweetness_level'),
+        columns=FIELDS)
+    
+    # Search filters: exact matches (a list matches any of its values, like
+    # SQL IN) and inclusive ranges given as column -> (min filter, max filter).
+    # body_level (passed by the recommender) has no column since the schema
+    # dropped it, so it is not a filter.
+    EQUALITY_FILTERS = ('type', 'country', 'acidity_level', 'sweetness_level')
+    RANGE_FILTERS = {'price': ('min_price', 'max_price'), 'vintage': ('min_vintage', 'max_vintage')}
+    
+    # Columns written by bulk_upsert_wines(); rows are full records, so an
+    # omitted column is set to NULL on update
+    BULK_COLUMNS = ('id', 'name', 'type', 'region', 'country', 'vintage', 'price', 'alcohol_content', 'acidity_level', 'sweetness_level')
+    
+    # Facet counts returned by get_wines_faceted(): value counts for these
+    # columns and bucket counts for the numeric ones
+    FACETS = ('type', 'country', 'region', 'acidity_level', 'sweetness_level')
+    BUCKETS = {'price': PRICE_EDGES, 'vintage': VINTAGE_EDGES}
+    
     @staticmethod
-    def get_all_wines():
+    def _select(fields):
+        """SELECT list for the requested fields (all of FIELDS when None)"""
+        return select_list(fields or WineModel.FIELDS, WineModel.COLUMNS)
+    
+    @staticmethod
+    def get_all_wines(fields=None):
         """Get all wines from the database"""
-        conn = get_db_connection()
+        if WineModel.SNAPSHOT.ready():
+            return WineModel.SNAPSHOT.all(fields)
+        conn = get_db_connection(readonly=True)
         try:
             with conn.cursor() as cursor:
-                cursor.execute("SELECT * FROM wines ORDER BY name")
+                cursor.execute(f"SELECT {WineModel._select(fields)} FROM wines ORDER BY name")
                 return cursor.fetchall()
         finally:
             conn.close()
     
+    @staticmethod
+    def stream_all_wines(chunk_size=1000, fields=None):
+        """Iterate over all wines without buffering the table in memory"""
+        return stream_query(f"SELECT {WineModel._select(fields)} FROM wines ORDER BY name", chunk_size=chunk_size)
+    
     @staticmethod
     def get_wine_by_id(wine_id):
         """Get a specific wine by ID"""
-        conn = get_db_connection()
+        if WineModel.SNAPSHOT.ready():
+            return WineModel.SNAPSHOT.get(wine_id)
+        conn = get_db_connection(readonly=True)
         try:
             with conn.cursor() as cursor:
-                cursor.execute("SELECT * FROM wines WHERE id = %s", (wine_id,))
+                cursor.execute(f"SELECT {WineModel._select(None)} FROM wines WHERE id = %s", (wine_id,))
                 return cursor.fetchone()
         finally:
             conn.close()
     
+    @staticmethod
+    def get_wines_by_ids(wine_ids, fields=None):
+        """Get several wines with one query, in the order of wine_ids (unknown ids are skipped)"""
+        if not wine_ids:
+            return []
+        if WineModel.SNAPSHOT.ready():
+            rows = [WineModel.SNAPSHOT.get(wine_id, fields) for wine_id in wine_ids]
+            return [row for row in rows if row is not None]
+        conn = get_db_connection(readonly=True)
+        try:
+            with conn.cursor() as cursor:
+                condition, params = equals_sql('id', list(wine_ids))
+                cursor.execute(f"SELECT {WineModel._select(fields)} FROM wines WHERE 1=1" + condition, params)
+                by_id = {row['id']: row for row in cursor.fetchall()}
+                return [by_id[wine_id] for wine_id in wine_ids if wine_id in by_id]
+        finally:
+            conn.close()
+    
     @staticmethod
     def create_wine(wine_data):
         """Create a new wine"""
@@ -39,10 +108,34 @@ class WineModel:
                     wine_data.get('acidity_level'), wine_data.get('sweetness_level')
                 ))
                 conn.commit()
-                return cursor.lastrowid
+                wine_id = cursor.lastrowid
+                WineModel.SNAPSHOT.sync(cursor, wine_id)
+                return wine_id
         finally:
             conn.close()
     
+    @staticmethod
+    def _validate_bulk_row(row):
+        return validate_row(
+            row,
+            required=('name', 'type'),
+            enums={'acidity_level': ('low', 'medium', 'high'),
+                   'sweetness_level': ('dry', 'off-dry', 'semi-sweet', 'sweet')},
+            integers=('id', 'vintage'),
+            decimals=('price', 'alcohol_content')
+        )
+    
+    @staticmethod
+    def bulk_upsert_wines(rows, chunk_size=None):
+        """Insert or update many wines (by id) with multi-row INSERT ... ON DUPLICATE KEY UPDATE.
+        
+        Runs one transaction per chunk and returns a summary with per-row
+        errors (see utils/bulk.py). The catalog snapshot reloads once on its
+        next read rather than being patched row by row.
+        """
+        return bulk_upsert('wines', WineModel.BULK_COLUMNS, rows, WineModel._validate_bulk_row,
+                           chunk_size, after_chunk=WineModel.SNAPSHOT.invalidate)
+    
     @staticmethod
     def update_wine(wine_id, wine_data):
         """Update an existing wine"""
@@ -59,7 +152,10 @@ class WineModel:
                     wine_data.get('acidity_level'), wine_data.get('sweetness_level'), wine_id
                 ))
                 conn.commit()
-                return cursor.rowcount > 0
+                updated = cursor.rowcount > 0
+                if updated:
+                    WineModel.SNAPSHOT.sync(cursor, wine_id)
+                return updated
         finally:
             conn.close()
     
@@ -71,49 +167,124 @@ class WineModel:
             with conn.cursor() as cursor:
                 cursor.execute("DELETE FROM wines WHERE id = %s", (wine_id,))
                 conn.commit()
-                return cursor.rowcount > 0
+                deleted = cursor.rowcount > 0
+                if deleted:
+                    WineModel.SNAPSHOT.sync(cursor, wine_id)
+                return deleted
         finally:
             conn.close()
     
     @staticmethod
-    def search_wines(filters):
+    def _filter_sql(filters):
+        """Build the WHERE conditions and parameters for wine search filters"""
+        sql = ""
+        params = []
+        
+        for column in WineModel.EQUALITY_FILTERS:
+            if filters.get(column):
+                condition, values = equals_sql(column, filters[column])
+                sql += condition
+                params.extend(values)
+        
+        if filters.get('region'):
+            sql += " AND region LIKE %s"
+            params.append(f"%{filters['region']}%")
+        
+        for column, (low, high) in WineModel.RANGE_FILTERS.items():
+            if filters.get(low):
+                sql += f" AND {column} >= %s"
+                params.append(filters[low])
+            if filters.get(high):
+                sql += f" AND {column} <= %s"
+                params.append(filters[high])
+        
+        return sql, params
+    
+    @staticmethod
+    def _snapshot_filters(filters):
+        """The search filters as CatalogSnapshot.search() equals/contains/ranges"""
+        return {
+            'equals': {c: filters[c] for c in WineModel.EQUALITY_FILTERS if filters.get(c)},
+            'contains': {'region': filters['region']} if filters.get('region') else {},
+            'ranges': {c: (filters.get(low) or None, filters.get(high) or None)
+                       for c, (low, high) in WineModel.RANGE_FILTERS.items()}
+        }
+    
+    @staticmethod
+    def _search_snapshot(filters, fields=None):
+        """Evaluate the search filters against the catalog snapshot"""
+        return WineModel.SNAPSHOT.search(fields=fields, **WineModel._snapshot_filters(filters))
+    
+    @staticmethod
+    def search_wines(filters, fields=None):
         """Search wines with filters"""
-        conn = get_db_connection()
+        if WineModel.SNAPSHOT.ready():
+            rows = WineModel._search_snapshot(filters, fields)
+            if rows is not None:
+                return rows
+        conn = get_db_connection(readonly=True)
+        try:
+            with conn.cursor() as cursor:
+                where, params = WineModel._filter_sql(filters)
+                sql = f"SELECT {WineModel._select(fields)} FROM wines WHERE 1=1" + where + " ORDER BY name"
+                cursor.execute(sql, params)
+                return cursor.fetchall()
+        finally:
+            conn.close()
+    
+    @staticmethod
+    def get_wines_page(filters, after=None, page_size=50, fields=None):
+        """Get one page of wines ordered by (name, id), optionally filtered.
+        
+        ``after`` is the (name, id) of the last wine on the previous page.
+        One extra row is fetched so callers can tell whether another page exists.
+        """
+        conn = get_db_connection(readonly=True)
         try:
             with conn.cursor() as cursor:
-                sql = "SELECT * FROM wines WHERE 1=1"
-                params = []
-                
-                if filters.get('type'):
-                    sql += " AND type = %s"
-                    params.append(filters['type'])
-                
-                if filters.get('region'):
-                    sql += " AND region LIKE %s"
-                    params.append(f"%{filters['region']}%")
-                
-                if filters.get('country'):
-                    sql += " AND country = %s"
-                    params.append(filters['country'])
-                
-                if filters.get('min_price'):
-                    sql += " AND price >= %s"
-                    params.append(filters['min_price'])
-                
-                if filters.get('max_price'):
-                    sql += " AND price <= %s"
-                    params.append(filters['max_price'])
-                
-                sql += " ORDER BY name"
+                where, params = WineModel._filter_sql(filters)
+                sql = f"SELECT {WineModel._select(fields)} FROM wines WHERE 1=1" + where
+                if after:
+                    sql += " AND (name > %s OR (name = %s AND id > %s))"
+                    params.extend([after[0], after[0], after[1]])
+                sql += " ORDER BY name, id LIMIT %s"
+                params.append(page_size + 1)
                 cursor.execute(sql, params)
                 return cursor.fetchall()
         finally:
             conn.close()
     
+    @staticmethod
+    def get_wines_faceted(filters, after=None, page_size=50, fields=None):
+        """Get one page of wines (as get_wines_page()) plus facet counts.
+        
+        Counts cover every wine matching the filters, not just the page,
+        and come from a single pass over the catalog snapshot or a single
+        GROUP BY query. Returns (rows, facets).
+        """
+        if WineModel.SNAPSHOT.ready():
+            result = WineModel.SNAPSHOT.facet_search(
+                facets=WineModel.FACETS, buckets=WineModel.BUCKETS, after=after,
+                limit=page_size + 1, fields=fields, **WineModel._snapshot_filters(filters))
+            if result is not None:
+                return result
+        rows = WineModel.get_wines_page(filters, after, page_size, fields)
+        conn = get_db_connection(readonly=True)
+        try:
+            with conn.cursor() as cursor:
+                where, params = WineModel._filter_sql(filters)
+                sql, bucket_params = facet_sql('wines', WineModel.FACETS, WineModel.BUCKETS, where)
+                cursor.execute(sql, bucket_params + params)
+                return rows, count_grouped(cursor.fetchall(), WineModel.FACETS, WineModel.BUCKETS)
+        finally:
+            conn.close()
+    
     @staticmethod
     def get_wine_types():
         """Get all unique wine types"""
-        conn = get_db_connection()
+        if WineModel.SNAPSHOT.ready():
+            return WineModel.SNAPSHOT.distinct('type')
+        conn = get_db_connection(readonly=True)
         try:
             with conn.cursor() as cursor:
                 cursor.execute("SELECT DISTINCT type FROM wines ORDER BY type")
@@ -124,7 +295,9 @@ class WineModel:
     @staticmethod
     def get_wine_regions():
         """Get all unique wine regions"""
-        conn = get_db_connection()
+        if WineModel.SNAPSHOT.ready():
+            return WineModel.SNAPSHOT.distinct('region')
+        conn = get_db_connection(readonly=True)
         try:
             with conn.cursor() as cursor:
                 cursor.execute("SELECT DISTINCT region FROM wines WHERE region IS NOT NULL ORDER BY region")
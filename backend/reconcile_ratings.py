@@ -0,0 +1,35 @@
+"""Recompute the rating aggregates on wines and coffees from reviews.
+
+    python reconcile_ratings.py             # both tables
+    python reconcile_ratings.py wines
+
+ReviewModel keeps rating_sum, rating_count and avg_rating current on every
+review write it makes. Reviews written any other way (generate_dataset.py,
+imports, manual SQL) leave them behind; run this afterwards, or on a
+schedule as a safety net. Only rows that drifted are rewritten.
+"""
+import argparse
+import sys
+import time
+
+from models.review_model import ReviewModel
+
+COLUMNS = {'wines': 'wine_id', 'coffees': 'coffee_id'}
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('tables', nargs='*', help='wines and/or coffees (default: both)')
+    parser.add_argument('--chunk-size', type=int, default=10000, help='product ids per transaction')
+    args = parser.parse_args()
+    unknown = set(args.tables) - set(COLUMNS)
+    if unknown:
+        parser.error(f"unknown table: {', '.join(sorted(unknown))}")
+
+
+    for table in args.tables or sorted(COLUMNS):
+        start = time.perf_counter()
+        fixed = ReviewModel.reconcile_ratings(COLUMNS[table], max(1, args.chunk_size))
+        print(f"{table}: {fixed} rows corrected in {time.perf_counter() - start:.1f} s")
+
+if __name__ == '__main__':
+    sys.exit(main())
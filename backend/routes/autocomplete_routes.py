@@ -0,0 +1,40 @@
+from flask import Blueprint, request, jsonify
+from models.search_model import SearchModel
+from utils.http_cache import conditional
+
+autocomplete_bp = Blueprint('autocomplete', __name__)
+
+@autocomplete_bp.route('/', methods=['GET'])
+@conditional('wines', 'coffees')
+def autocomplete():
+    """Suggestions for a partly typed wine/coffee name, wine region or coffee origin"""
+    try:
+        query = request.args.get('q') or ''
+        if not query.strip():
+            return jsonify({'error': 'Query parameter q is required'}), 400
+        
+        kinds = SearchModel.KINDS
+        if request.args.get('type'):
+            if request.args['type'] not in SearchModel.KINDS:
+                return jsonify({'error': f"type must be one of: {', '.join(SearchModel.KINDS)}"}), 400
+            kinds = (request.args['type'],)
+        
+        try:
+            limit = int(request.args.get('limit', 10))
+        except ValueError:
+            return jsonify({'error': 'limit must be an integer'}), 400
+        if not 1 <= limit <= SearchModel.AUTOCOMPLETE.MAX_LIMIT:
+            return jsonify({'error': f"limit must be between 1 and {SearchModel.AUTOCOMPLETE.MAX_LIMIT}"}), 400
+        
+        result = SearchModel.autocomplete(query, kinds, limit)
+        if result is None:
+            return jsonify({'error': 'Autocomplete is unavailable while the catalog snapshot is not loaded'}), 503
+        suggestions, corrected = result
+        
+        return jsonify({
+            'query': query,
+            'corrected': corrected,
+            'suggestions': suggestions
+        }), 200
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
@@ -1,39 +1,134 @@
+from functools import partial
 from flask import Blueprint, request, jsonify
 from models.coffee_model import CoffeeModel
 from models.review_model import ReviewModel
+from utils.streaming import STREAM_FORMATS, stream_response
+from utils.pagination import InvalidCursor, decode_cursor, get_page_size, is_paginated, paginate, review_feed
+from utils.fieldsets import InvalidFields, parse_fields
+from utils.filters import InvalidFilter, InvalidIds, parse_ids, parse_number, parse_values
+from utils.http_cache import conditional
+from config import Config
 
 coffee_bp = Blueprint('coffees', __name__)
 
+def _filters(args):
+    """Search filters from the query string.
+
+    Exact-match filters take comma-separated values (?roast_level=light,medium)
+    matching any of them.
+    """
+    filters = {}
+    for column in CoffeeModel.EQUALITY_FILTERS:
+        if args.get(column):
+            filters[column] = parse_values(args[column])
+    if args.get('origin'):
+        filters['origin'] = args.get('origin')
+    if args.get('min_price'):
+        filters['min_price'] = parse_number(args.get('min_price'), 'min_price')
+    if args.get('max_price'):
+        filters['max_price'] = parse_number(args.get('max_price'), 'max_price')
+    return filters
+
 @coffee_bp.route('/', methods=['GET'])
+@conditional('coffees')
 def get_coffees():
     """Get all coffees or search coffees with filters"""
     try:
-        filters = {}
+        filters = _filters(request.args)
+        
+        # ?fields=name,type,price narrows the SELECT list (id and sort keys always included)
+        required = ('id', 'name') if is_paginated(request.args) else ('id',)
+        fields = parse_fields(request.args.get('fields'), CoffeeModel.FIELDS, required)
         
-        # Get query parameters for filtering
-        if request.args.get('type'):
-            filters['type'] = request.args.get('type')
-        if request.args.get('origin'):
-            filters['origin'] = request.args.get('origin')
-        if request.args.get('country'):
-            filters['country'] = request.args.get('country')
-        if request.args.get('roast_level'):
-            filters['roast_level'] = request.args.get('roast_level')
-        if request.args.get('min_price'):
-            filters['min_price'] = float(request.args.get('min_price'))
-        if request.args.get('max_price'):
-            filters['max_price'] = float(request.args.get('max_price'))
+        # ?stream=ndjson|json streams the full catalog from a server-side cursor
+        stream_format = request.args.get('stream')
+        if stream_format:
+            if stream_format not in STREAM_FORMATS:
+                return jsonify({'error': f'stream must be one of: {", ".join(STREAM_FORMATS)}'}), 400
+            if filters:
+                return jsonify({'error': 'Streaming is only supported for the unfiltered catalog'}), 400
+            return stream_response(CoffeeModel.stream_all_coffees(fields=fields), 'coffees', stream_format)
+        
+        # ?page_size= and/or ?cursor= switch to keyset pagination over (name, id)
+        if is_paginated(request.args):
+            page_size = get_page_size(request.args)
+            after = decode_cursor(request.args['cursor'], 2) if request.args.get('cursor') else None
+            rows = CoffeeModel.get_coffees_page(filters, after, page_size, fields)
+            coffees, next_cursor = paginate(rows, page_size, lambda c: (c['name'], c['id']))
+            return jsonify({'coffees': coffees, 'count': len(coffees), 'next_cursor': next_cursor}), 200
         
         if filters:
-            coffees = CoffeeModel.search_coffees(filters)
+            coffees = CoffeeModel.search_coffees(filters, fields)
         else:
-            coffees = CoffeeModel.get_all_coffees()
+            coffees = CoffeeModel.get_all_coffees(fields)
         
         return jsonify({'coffees': coffees, 'count': len(coffees)}), 200
+    except (InvalidCursor, InvalidFields, InvalidFilter) as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@coffee_bp.route('/facets', methods=['GET'])
+@conditional('coffees')
+def get_coffees_facets():
+    """Get one page of coffees plus filter counts (type, country, price buckets, ...) for all matches"""
+    try:
+        filters = _filters(request.args)
+        fields = parse_fields(request.args.get('fields'), CoffeeModel.FIELDS, ('id', 'name'))
+        page_size = get_page_size(request.args)
+        after = decode_cursor(request.args['cursor'], 2) if request.args.get('cursor') else None
+        
+        rows, facets = CoffeeModel.get_coffees_faceted(filters, after, page_size, fields)
+        coffees, next_cursor = paginate(rows, page_size, lambda r: (r['name'], r['id']))
+        return jsonify({
+            'coffees': coffees,
+            'count': len(coffees),
+            'next_cursor': next_cursor,
+            'facets': facets
+        }), 200
+    except (InvalidCursor, InvalidFields, InvalidFilter) as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+def _batch_response(ids, fields):
+    """Coffees (with rating_info) for an id list, plus the ids that don't exist"""
+    coffee_ids = parse_ids(ids)
+    coffees = CoffeeModel.get_coffees_by_ids(coffee_ids, parse_fields(fields, CoffeeModel.FIELDS))
+    ratings = ReviewModel.get_average_ratings_coffees([coffee['id'] for coffee in coffees])
+    for coffee in coffees:
+        coffee['rating_info'] = ratings[coffee['id']]
+    found = {coffee['id'] for coffee in coffees}
+    return jsonify({
+        'coffees': coffees,
+        'count': len(coffees),
+        'missing': [coffee_id for coffee_id in coffee_ids if coffee_id not in found]
+    }), 200
+
+@coffee_bp.route('/batch', methods=['GET'])
+@conditional('coffees', 'reviews')
+def get_coffees_batch():
+    """Get several coffees by ?ids=1,2,3 in one round trip"""
+    try:
+        return _batch_response(request.args.get('ids') or '', request.args.get('fields'))
+    except (InvalidIds, InvalidFields) as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@coffee_bp.route('/batch', methods=['POST'])
+def post_coffees_batch():
+    """Get several coffees by a JSON body {"ids": [...]}, for lists too long for a URL"""
+    try:
+        data = request.get_json(silent=True) or {}
+        return _batch_response(data.get('ids'), request.args.get('fields'))
+    except (InvalidIds, InvalidFields) as e:
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
 @coffee_bp.route('/<int:coffee_id>', methods=['GET'])
+@conditional('coffees', 'reviews')
 def get_coffee(coffee_id):
     """Get a specific coffee by ID"""
     try:
@@ -70,6 +165,28 @@ def create_coffee():
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+@coffee_bp.route('/bulk', methods=['POST'])
+def bulk_upsert_coffees():
+    """Create or update many coffees at once from a JSON list (or {"coffees": [...]}).
+    
+    Rows with an existing id are updated, the rest are created. ?chunk_size=
+    sets rows per INSERT and transaction. Rows that fail are listed under
+    errors by their index and do not stop the others.
+    """
+    try:
+        data = request.get_json(silent=True)
+        rows = data.get('coffees') if isinstance(data, dict) else data
+        if not isinstance(rows, list) or not rows:
+            return jsonify({'error': 'Body must be a non-empty list of coffees'}), 400
+        if len(rows) > Config.BULK_MAX_ROWS:
+            return jsonify({'error': f'At most {Config.BULK_MAX_ROWS} rows per request'}), 400
+        chunk_size = request.args.get('chunk_size', type=int)
+        
+        result = CoffeeModel.bulk_upsert_coffees(rows, chunk_size)
+        return jsonify(result), 200
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
 @coffee_bp.route('/<int:coffee_id>', methods=['PUT'])
 def update_coffee(coffee_id):
     """Update an existing coffee"""
@@ -108,6 +225,7 @@ def delete_coffee(coffee_id):
         return jsonify({'error': str(e)}), 500
 
 @coffee_bp.route('/<int:coffee_id>/reviews', methods=['GET'])
+@conditional('coffees', 'reviews')
 def get_coffee_reviews(coffee_id):
     """Get all reviews for a specific coffee"""
     try:
@@ -116,13 +234,17 @@ def get_coffee_reviews(coffee_id):
         if not coffee:
             return jsonify({'error': 'Coffee not found'}), 404
         
-        limit = request.args.get('limit', type=int)
-        reviews = ReviewModel.get_reviews_by_coffee(coffee_id, limit)
-        return jsonify({'reviews': reviews, 'count': len(reviews)}), 200
+        # ?page_size= and/or ?cursor= switch to keyset pagination, newest first
+        feed = review_feed(request.args, ReviewModel.PRODUCT_FEED_COLUMNS,
+                           partial(ReviewModel.get_reviews_by_coffee, coffee_id))
+        return jsonify(feed), 200
+    except (InvalidCursor, InvalidFields) as e:
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
 @coffee_bp.route('/types', methods=['GET'])
+@conditional('coffees')
 def get_coffee_types():
     """Get all unique coffee types"""
     try:
@@ -132,6 +254,7 @@ def get_coffee_types():
         return jsonify({'error': str(e)}), 500
 
 @coffee_bp.route('/origins', methods=['GET'])
+@conditional('coffees')
 def get_coffee_origins():
     """Get all unique coffee origins"""
     try:
@@ -141,6 +264,7 @@ def get_coffee_origins():
         return jsonify({'error': str(e)}), 500
 
 @coffee_bp.route('/roast-levels', methods=['GET'])
+@conditional('coffees')
 def get_roast_levels():
     """Get all unique roast levels"""
     try:
@@ -150,11 +274,12 @@ def get_roast_levels():
         return jsonify({'error': str(e)}), 500
 
 @coffee_bp.route('/top-rated', methods=['GET'])
+@conditional('coffees', 'reviews')
 def get_top_rated_coffees():
     """Get top rated coffees"""
     try:
         limit = request.args.get('limit', 10, type=int)
-        coffees = ReviewModel.get_top_rated_coffees(limit)
+        coffees = ReviewModel.get_top_rated_coffees(limit, request.args.get('type'))
         return jsonify({'coffees': coffees, 'count': len(coffees)}), 200
     except Exception as e:
         return jsonify({'error': str(e)}), 500 
\ No newline at end of file
@@ -1,5 +1,6 @@
 from flask import Blueprint, jsonify, request
-from db.connection import get_db_connection
+from db.connection import get_db_connection, stream_query
+from utils.streaming import STREAM_FORMATS, stream_response
 import pymysql
 
 demo_bp = Blueprint('demo', __name__)
@@ -98,7 +99,7 @@ def test_rating_validation_trigger():
 def call_procedure(procedure_type):
     """Call stored procedures"""
     try:
-        conn = get_db_connection()
+        conn = get_db_connection(readonly=True)
         cursor = conn.cursor()
         
         if procedure_type == 'wines':
@@ -117,6 +118,8 @@ def call_procedure(procedure_type):
             cursor.execute("CALL GetPairings()")
             result = cursor.fetchall()
         else:
+            cursor.close()
+            conn.close()
             return jsonify({'error': 'Invalid procedure'}), 400
         
         cursor.close()
@@ -130,7 +133,17 @@ def call_procedure(procedure_type):
 def run_query(query_type):
     """Run SQL queries"""
     try:
-        conn = get_db_connection()
+        # Full-table queries can be streamed with ?stream=ndjson|json
+        stream_format = request.args.get('stream')
+        if stream_format:
+            if stream_format not in STREAM_FORMATS:
+                return jsonify({'error': f'stream must be one of: {", ".join(STREAM_FORMATS)}'}), 400
+            if query_type not in ('all-wines', 'all-coffees'):
+                return jsonify({'error': 'Streaming is only supported for all-wines and all-coffees'}), 400
+            table = 'wines' if query_type == 'all-wines' else 'coffees'
+            return stream_response(stream_query(f"SELECT * FROM {table}"), 'data', stream_format)
+        
+        conn = get_db_connection(readonly=True)
         cursor = conn.cursor()
         
         if query_type == 'all-wines':
@@ -213,6 +226,8 @@ def run_query(query_type):
                 ORDER BY total_coffees DESC
             """)
         else:
+            cursor.close()
+            conn.close()
             return jsonify({'error': 'Invalid query'}), 400
         
         result = cursor.fetchall()
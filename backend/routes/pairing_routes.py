@@ -2,10 +2,15 @@ from flask import Blueprint, request, jsonify
 from models.pairing_model import PairingModel
 from models.wine_model import WineModel
 from models.coffee_model import CoffeeModel
+from utils.pagination import InvalidCursor, decode_cursor, get_page_size, is_paginated, paginate
+from utils.fieldsets import InvalidFields, parse_fields
+from utils.filters import InvalidFilter, InvalidIds, parse_ids, parse_number
+from utils.http_cache import conditional
 
 pairing_bp = Blueprint('pairings', __name__)
 
 @pairing_bp.route('/', methods=['GET'])
+@conditional('pairings', 'wines', 'coffees')
 def get_pairings():
     """Get all pairings or search pairings with filters"""
     try:
@@ -17,21 +22,69 @@ def get_pairings():
         if request.args.get('coffee_type'):
             filters['coffee_type'] = request.args.get('coffee_type')
         if request.args.get('min_score'):
-            filters['min_score'] = float(request.args.get('min_score'))
+            filters['min_score'] = parse_number(request.args.get('min_score'), 'min_score')
         if request.args.get('max_score'):
-            filters['max_score'] = float(request.args.get('max_score'))
+            filters['max_score'] = parse_number(request.args.get('max_score'), 'max_score')
+        
+        # ?fields=wine_name,coffee_name narrows the SELECT list (id and sort keys always included)
+        required = ('id', 'pairing_score') if is_paginated(request.args) else ('id',)
+        fields = parse_fields(request.args.get('fields'), tuple(PairingModel.COLUMNS), required)
+        
+        # ?page_size= and/or ?cursor= switch to keyset pagination over (pairing_score, id)
+        if is_paginated(request.args):
+            page_size = get_page_size(request.args)
+            after = decode_cursor(request.args['cursor'], 2) if request.args.get('cursor') else None
+            rows = PairingModel.get_pairings_page(filters, after, page_size, fields)
+            pairings, next_cursor = paginate(rows, page_size, lambda p: (p['pairing_score'], p['id']))
+            return jsonify({'pairings': pairings, 'count': len(pairings), 'next_cursor': next_cursor}), 200
         
         if filters:
-            pairings = PairingModel.search_pairings(filters)
+            pairings = PairingModel.search_pairings(filters, fields)
         else:
             limit = request.args.get('limit', type=int)
-            pairings = PairingModel.get_all_pairings(limit)
+            pairings = PairingModel.get_all_pairings(limit, fields)
         
         return jsonify({'pairings': pairings, 'count': len(pairings)}), 200
+    except (InvalidCursor, InvalidFields, InvalidFilter) as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+def _batch_response(ids, fields):
+    """Pairings for an id list, plus the ids that don't exist"""
+    pairing_ids = parse_ids(ids)
+    pairings = PairingModel.get_pairings_by_ids(pairing_ids, parse_fields(fields, tuple(PairingModel.COLUMNS)))
+    found = {pairing['id'] for pairing in pairings}
+    return jsonify({
+        'pairings': pairings,
+        'count': len(pairings),
+        'missing': [pairing_id for pairing_id in pairing_ids if pairing_id not in found]
+    }), 200
+
+@pairing_bp.route('/batch', methods=['GET'])
+@conditional('pairings', 'wines', 'coffees')
+def get_pairings_batch():
+    """Get several pairings by ?ids=1,2,3 in one round trip"""
+    try:
+        return _batch_response(request.args.get('ids') or '', request.args.get('fields'))
+    except (InvalidIds, InvalidFields) as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@pairing_bp.route('/batch', methods=['POST'])
+def post_pairings_batch():
+    """Get several pairings by a JSON body {"ids": [...]}, for lists too long for a URL"""
+    try:
+        data = request.get_json(silent=True) or {}
+        return _batch_response(data.get('ids'), request.args.get('fields'))
+    except (InvalidIds, InvalidFields) as e:
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
 @pairing_bp.route('/<int:pairing_id>', methods=['GET'])
+@conditional('pairings', 'wines', 'coffees')
 def get_pairing(pairing_id):
     """Get a specific pairing by ID"""
     try:
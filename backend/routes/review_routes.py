@@ -1,7 +1,12 @@
-from flask import Blueprint, request, jsonify
+from functools import partial
+from flask import Blueprint, request, jsonify, url_for
+from config import Config
 from models.review_model import ReviewModel
+from models.review_queue_model import ReviewQueueModel
 from models.wine_model import WineModel
 from models.coffee_model import CoffeeModel
+from utils.fieldsets import InvalidFields
+from utils.pagination import InvalidCursor, review_feed
 
 review_bp = Blueprint('reviews', __name__)
 
@@ -23,7 +28,9 @@ def create_review():
         if 'wine_id' not in data and 'coffee_id' not in data:
             return jsonify({'error': 'Must provide either wine_id or coffee_id'}), 400
         
-        # Validate rating range
+        # Validate rating: whole stars from 1 to 5 (the rating aggregates count stars)
+        if isinstance(data['rating'], bool) or not isinstance(data['rating'], int):
+            return jsonify({'error': 'Rating must be an integer'}), 400
         if not (1 <= data['rating'] <= 5):
             return jsonify({'error': 'Rating must be between 1 and 5'}), 400
         
@@ -37,6 +44,13 @@ def create_review():
             if not coffee:
                 return jsonify({'error': 'Coffee not found'}), 404
         
+        # Write-behind mode: accept now, write to MySQL with the next batch
+        if Config.REVIEW_QUEUE_ENABLED:
+            tracking_id = ReviewQueueModel.enqueue(data)
+            response = jsonify({'tracking_id': tracking_id, 'status': 'queued'})
+            response.headers['Location'] = url_for('reviews.get_queued_review', tracking_id=tracking_id)
+            return response, 202
+        
         review_id = ReviewModel.create_review(data)
         if review_id:
             review = ReviewModel.get_review_by_id(review_id)
@@ -46,6 +60,18 @@ def create_review():
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+@review_bp.route('/queued/<tracking_id>', methods=['GET'])
+def get_queued_review(tracking_id):
+    """Get the state of a review accepted in write-behind mode"""
+    try:
+        entry = ReviewQueueModel.status(tracking_id)
+        if not entry:
+            return jsonify({'error': 'Queued review not found'}), 404
+        
+        return jsonify(entry), 200
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
 @review_bp.route('/<int:review_id>', methods=['GET'])
 def get_review(review_id):
     """Get a specific review by ID"""
@@ -64,15 +90,18 @@ def update_review(review_id):
     try:
         data = request.get_json()
         
+        # Validate rating if provided: whole stars from 1 to 5
+        if 'rating' in data:
+            if isinstance(data['rating'], bool) or not isinstance(data['rating'], int):
+                return jsonify({'error': 'Rating must be an integer'}), 400
+            if not (1 <= data['rating'] <= 5):
+                return jsonify({'error': 'Rating must be between 1 and 5'}), 400
+        
         # Check if review exists
         existing_review = ReviewModel.get_review_by_id(review_id)
         if not existing_review:
             return jsonify({'error': 'Review not found'}), 404
         
-        # Validate rating range if provided
-        if 'rating' in data and not (1 <= data['rating'] <= 5):
-            return jsonify({'error': 'Rating must be between 1 and 5'}), 400
-        
         success = ReviewModel.update_review(review_id, data)
         if success:
             updated_review = ReviewModel.get_review_by_id(review_id)
@@ -103,9 +132,12 @@ def delete_review(review_id):
 def get_user_reviews(user_id):
     """Get all reviews by a specific user"""
     try:
-        limit = request.args.get('limit', type=int)
-        reviews = ReviewModel.get_reviews_by_user(user_id, limit)
-        return jsonify({'reviews': reviews, 'count': len(reviews)}), 200
+        # ?page_size= and/or ?cursor= switch to keyset pagination, newest first
+        feed = review_feed(request.args, ReviewModel.USER_FEED_COLUMNS,
+                           partial(ReviewModel.get_reviews_by_user, user_id))
+        return jsonify(feed), 200
+    except (InvalidCursor, InvalidFields) as e:
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -118,9 +150,12 @@ def get_wine_reviews(wine_id):
         if not wine:
             return jsonify({'error': 'Wine not found'}), 404
         
-        limit = request.args.get('limit', type=int)
-        reviews = ReviewModel.get_reviews_by_wine(wine_id, limit)
-        return jsonify({'reviews': reviews, 'count': len(reviews)}), 200
+        # ?page_size= and/or ?cursor= switch to keyset pagination, newest first
+        feed = review_feed(request.args, ReviewModel.PRODUCT_FEED_COLUMNS,
+                           partial(ReviewModel.get_reviews_by_wine, wine_id))
+        return jsonify(feed), 200
+    except (InvalidCursor, InvalidFields) as e:
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -133,9 +168,12 @@ def get_coffee_reviews(coffee_id):
         if not coffee:
             return jsonify({'error': 'Coffee not found'}), 404
         
-        limit = request.args.get('limit', type=int)
-        reviews = ReviewModel.get_reviews_by_coffee(coffee_id, limit)
-        return jsonify({'reviews': reviews, 'count': len(reviews)}), 200
+        # ?page_size= and/or ?cursor= switch to keyset pagination, newest first
+        feed = review_feed(request.args, ReviewModel.PRODUCT_FEED_COLUMNS,
+                           partial(ReviewModel.get_reviews_by_coffee, coffee_id))
+        return jsonify(feed), 200
+    except (InvalidCursor, InvalidFields) as e:
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -172,7 +210,7 @@ def get_top_rated_wines():
     """Get top rated wines"""
     try:
         limit = request.args.get('limit', 10, type=int)
-        wines = ReviewModel.get_top_rated_wines(limit)
+        wines = ReviewModel.get_top_rated_wines(limit, request.args.get('type'))
         return jsonify({'wines': wines, 'count': len(wines)}), 200
     except Exception as e:
         return jsonify({'error': str(e)}), 500
@@ -182,7 +220,7 @@ def get_top_rated_coffees():
     """Get top rated coffees"""
     try:
         limit = request.args.get('limit', 10, type=int)
-        coffees = ReviewModel.get_top_rated_coffees(limit)
+        coffees = ReviewModel.get_top_rated_coffees(limit, request.args.get('type'))
         return jsonify({'coffees': coffees, 'count': len(coffees)}), 200
     except Exception as e:
         return jsonify({'error': str(e)}), 500 
\ No newline at end of file
@@ -0,0 +1,49 @@
+from flask import Blueprint, request, jsonify
+from config import Config
+from models.search_model import SearchModel
+from utils.pagination import InvalidCursor, decode_cursor, get_page_size, paginate
+from utils.http_cache import conditional
+
+search_bp = Blueprint('search', __name__)
+
+@search_bp.route('/', methods=['GET'])
+@conditional('wines', 'coffees')
+def search_products():
+    """Relevance-ranked free-text search over wine and coffee names, places and descriptions"""
+    try:
+        query = (request.args.get('q') or '').strip()
+        if not query:
+            return jsonify({'error': 'Query parameter q is required'}), 400
+        
+        # ?type=wine or ?type=coffee restricts the search to one catalog
+        kinds = SearchModel.KINDS
+        if request.args.get('type'):
+            if request.args['type'] not in SearchModel.KINDS:
+                return jsonify({'error': f"type must be one of: {', '.join(SearchModel.KINDS)}"}), 400
+            kinds = (request.args['type'],)
+        
+        page_size = get_page_size(request.args)
+        after = decode_cursor(request.args['cursor'], 3) if request.args.get('cursor') else None
+        
+        # ?engine=mysql forces FULLTEXT; the in-process index is used otherwise
+        # and falls back to FULLTEXT while the catalog snapshot is unavailable
+        engine = request.args.get('engine') or Config.SEARCH_ENGINE
+        if engine not in ('index', 'mysql'):
+            return jsonify({'error': 'engine must be one of: index, mysql'}), 400
+        rows = SearchModel.search_index(query, kinds, after, page_size) if engine == 'index' else None
+        if rows is None:
+            engine = 'mysql'
+            rows = SearchModel.search_products(query, kinds, after, page_size)
+        results, next_cursor = paginate(rows, page_size, lambda r: (r['score'], r['kind'], r['id']))
+        
+        return jsonify({
+            'query': query,
+            'engine': engine,
+            'results': results,
+            'count': len(results),
+            'next_cursor': next_cursor
+        }), 200
+    except InvalidCursor as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
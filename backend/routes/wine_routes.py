@@ -1,37 +1,138 @@
+from functools import partial
 from flask import Blueprint, request, jsonify
 from models.wine_model import WineModel
 from models.review_model import ReviewModel
+from utils.streaming import STREAM_FORMATS, stream_response
+from utils.pagination import InvalidCursor, decode_cursor, get_page_size, is_paginated, paginate, review_feed
+from utils.fieldsets import InvalidFields, parse_fields
+from utils.filters import InvalidFilter, InvalidIds, parse_ids, parse_number, parse_values
+from utils.http_cache import conditional
+from config import Config
 
 wine_bp = Blueprint('wines', __name__)
 
+def _filters(args):
+    """Search filters from the query string.
+
+    Exact-match filters take comma-separated values (?type=white,rose)
+    matching any of them.
+    """
+    filters = {}
+    for column in WineModel.EQUALITY_FILTERS:
+        if args.get(column):
+            filters[column] = parse_values(args[column])
+    if args.get('region'):
+        filters['region'] = args.get('region')
+    if args.get('min_price'):
+        filters['min_price'] = parse_number(args.get('min_price'), 'min_price')
+    if args.get('max_price'):
+        filters['max_price'] = parse_number(args.get('max_price'), 'max_price')
+    if args.get('min_vintage'):
+        filters['min_vintage'] = parse_number(args.get('min_vintage'), 'min_vintage', int)
+    if args.get('max_vintage'):
+        filters['max_vintage'] = parse_number(args.get('max_vintage'), 'max_vintage', int)
+    return filters
+
 @wine_bp.route('/', methods=['GET'])
+@conditional('wines')
 def get_wines():
     """Get all wines or search wines with filters"""
     try:
-        filters = {}
+        filters = _filters(request.args)
+        
+        # ?fields=name,type,price narrows the SELECT list (id and sort keys always included)
+        required = ('id', 'name') if is_paginated(request.args) else ('id',)
+        fields = parse_fields(request.args.get('fields'), WineModel.FIELDS, required)
         
-        # Get query parameters for filtering
-        if request.args.get('type'):
-            filters['type'] = request.args.get('type')
-        if request.args.get('region'):
-            filters['region'] = request.args.get('region')
-        if request.args.get('country'):
-            filters['country'] = request.args.get('country')
-        if request.args.get('min_price'):
-            filters['min_price'] = float(request.args.get('min_price'))
-        if request.args.get('max_price'):
-            filters['max_price'] = float(request.args.get('max_price'))
+        # ?stream=ndjson|json streams the full catalog from a server-side cursor
+        stream_format = request.args.get('stream')
+        if stream_format:
+            if stream_format not in STREAM_FORMATS:
+                return jsonify({'error': f'stream must be one of: {", ".join(STREAM_FORMATS)}'}), 400
+            if filters:
+                return jsonify({'error': 'Streaming is only supported for the unfiltered catalog'}), 400
+            return stream_response(WineModel.stream_all_wines(fields=fields), 'wines', stream_format)
+        
+        # ?page_size= and/or ?cursor= switch to keyset pagination over (name, id)
+        if is_paginated(request.args):
+            page_size = get_page_size(request.args)
+            after = decode_cursor(request.args['cursor'], 2) if request.args.get('cursor') else None
+            rows = WineModel.get_wines_page(filters, after, page_size, fields)
+            wines, next_cursor = paginate(rows, page_size, lambda w: (w['name'], w['id']))
+            return jsonify({'wines': wines, 'count': len(wines), 'next_cursor': next_cursor}), 200
         
         if filters:
-            wines = WineModel.search_wines(filters)
+            wines = WineModel.search_wines(filters, fields)
         else:
-            wines = WineModel.get_all_wines()
+            wines = WineModel.get_all_wines(fields)
         
         return jsonify({'wines': wines, 'count': len(wines)}), 200
+    except (InvalidCursor, InvalidFields, InvalidFilter) as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@wine_bp.route('/facets', methods=['GET'])
+@conditional('wines')
+def get_wines_facets():
+    """Get one page of wines plus filter counts (type, country, price buckets, ...) for all matches"""
+    try:
+        filters = _filters(request.args)
+        fields = parse_fields(request.args.get('fields'), WineModel.FIELDS, ('id', 'name'))
+        page_size = get_page_size(request.args)
+        after = decode_cursor(request.args['cursor'], 2) if request.args.get('cursor') else None
+        
+        rows, facets = WineModel.get_wines_faceted(filters, after, page_size, fields)
+        wines, next_cursor = paginate(rows, page_size, lambda r: (r['name'], r['id']))
+        return jsonify({
+            'wines': wines,
+            'count': len(wines),
+            'next_cursor': next_cursor,
+            'facets': facets
+        }), 200
+    except (InvalidCursor, InvalidFields, InvalidFilter) as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+def _batch_response(ids, fields):
+    """Wines (with rating_info) for an id list, plus the ids that don't exist"""
+    wine_ids = parse_ids(ids)
+    wines = WineModel.get_wines_by_ids(wine_ids, parse_fields(fields, WineModel.FIELDS))
+    ratings = ReviewModel.get_average_ratings_wines([wine['id'] for wine in wines])
+    for wine in wines:
+        wine['rating_info'] = ratings[wine['id']]
+    found = {wine['id'] for wine in wines}
+    return jsonify({
+        'wines': wines,
+        'count': len(wines),
+        'missing': [wine_id for wine_id in wine_ids if wine_id not in found]
+    }), 200
+
+@wine_bp.route('/batch', methods=['GET'])
+@conditional('wines', 'reviews')
+def get_wines_batch():
+    """Get several wines by ?ids=1,2,3 in one round trip"""
+    try:
+        return _batch_response(request.args.get('ids') or '', request.args.get('fields'))
+    except (InvalidIds, InvalidFields) as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@wine_bp.route('/batch', methods=['POST'])
+def post_wines_batch():
+    """Get several wines by a JSON body {"ids": [...]}, for lists too long for a URL"""
+    try:
+        data = request.get_json(silent=True) or {}
+        return _batch_response(data.get('ids'), request.args.get('fields'))
+    except (InvalidIds, InvalidFields) as e:
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
 @wine_bp.route('/<int:wine_id>', methods=['GET'])
+@conditional('wines', 'reviews')
 def get_wine(wine_id):
     """Get a specific wine by ID"""
     try:
@@ -68,6 +169,28 @@ def create_wine():
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+@wine_bp.route('/bulk', methods=['POST'])
+def bulk_upsert_wines():
+    """Create or update many wines at once from a JSON list (or {"wines": [...]}).
+    
+    Rows with an existing id are updated, the rest are created. ?chunk_size=
+    sets rows per INSERT and transaction. Rows that fail are listed under
+    errors by their index and do not stop the others.
+    """
+    try:
+        data = request.get_json(silent=True)
+        rows = data.get('wines') if isinstance(data, dict) else data
+        if not isinstance(rows, list) or not rows:
+            return jsonify({'error': 'Body must be a non-empty list of wines'}), 400
+        if len(rows) > Config.BULK_MAX_ROWS:
+            return jsonify({'error': f'At most {Config.BULK_MAX_ROWS} rows per request'}), 400
+        chunk_size = request.args.get('chunk_size', type=int)
+        
+        result = WineModel.bulk_upsert_wines(rows, chunk_size)
+        return jsonify(result), 200
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
 @wine_bp.route('/<int:wine_id>', methods=['PUT'])
 def update_wine(wine_id):
     """Update an existing wine"""
@@ -106,6 +229,7 @@ def delete_wine(wine_id):
         return jsonify({'error': str(e)}), 500
 
 @wine_bp.route('/<int:wine_id>/reviews', methods=['GET'])
+@conditional('wines', 'reviews')
 def get_wine_reviews(wine_id):
     """Get all reviews for a specific wine"""
     try:
@@ -114,13 +238,17 @@ def get_wine_reviews(wine_id):
         if not wine:
             return jsonify({'error': 'Wine not found'}), 404
         
-        limit = request.args.get('limit', type=int)
-        reviews = ReviewModel.get_reviews_by_wine(wine_id, limit)
-        return jsonify({'reviews': reviews, 'count': len(reviews)}), 200
+        # ?page_size= and/or ?cursor= switch to keyset pagination, newest first
+        feed = review_feed(request.args, ReviewModel.PRODUCT_FEED_COLUMNS,
+                           partial(ReviewModel.get_reviews_by_wine, wine_id))
+        return jsonify(feed), 200
+    except (InvalidCursor, InvalidFields) as e:
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
 @wine_bp.route('/types', methods=['GET'])
+@conditional('wines')
 def get_wine_types():
     """Get all unique wine types"""
     try:
@@ -130,6 +258,7 @@ def get_wine_types():
         return jsonify({'error': str(e)}), 500
 
 @wine_bp.route('/regions', methods=['GET'])
+@conditional('wines')
 def get_wine_regions():
     """Get all unique wine regions"""
     try:
@@ -139,11 +268,12 @@ def get_wine_regions():
         return jsonify({'error': str(e)}), 500
 
 @wine_bp.route('/top-rated', methods=['GET'])
+@conditional('wines', 'reviews')
 def get_top_rated_wines():
     """Get top rated wines"""
     try:
         limit = request.args.get('limit', 10, type=int)
-        wines = ReviewModel.get_top_rated_wines(limit)
+        wines = ReviewModel.get_top_rated_wines(limit, request.args.get('type'))
         return jsonify({'wines': wines, 'count': len(wines)}), 200
     except Exception as e:
         return jsonify({'error': str(e)}), 500 
\ No newline at end of file
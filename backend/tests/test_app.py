@@ -0,0 +1,49 @@
+import pytest
+import sys
+import os
+
+# Add the parent directory to the path so we can import our modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import create_app
+from config import Config
+from models.review_queue_model import ReviewQueueModel
+from models.search_model import SearchModel
+
+class TestCatalogWarmup:
+    def setup_method(self):
+        """Count warm-ups and queue starts instead of loading the snapshots
+        from MySQL or starting the drain thread"""
+        self.warmed = self.started = 0
+        self._original = SearchModel.warm, ReviewQueueModel.start, Config.REVIEW_QUEUE_ENABLED
+        SearchModel.warm = staticmethod(self.warm)
+        ReviewQueueModel.start = staticmethod(self.start)
+        Config.REVIEW_QUEUE_ENABLED = True
+
+    def teardown_method(self):
+        SearchModel.warm, ReviewQueueModel.start, Config.REVIEW_QUEUE_ENABLED = self._original
+
+    def warm(self):
+        self.warmed += 1
+
+    def start(self):
+        self.started += 1
+
+    def test_warms_on_first_request_only(self):
+        """Test create_app() itself loads and starts nothing; the first
+        request warms the catalog and starts the review queue once"""
+        app = create_app()
+        assert (self.warmed, self.started) == (0, 0)
+        client = app.test_client()
+        client.get('/health')
+        client.get('/health')
+        assert (self.warmed, self.started) == (1, 1)
+
+    def test_testing_app_never_warms(self):
+        app = create_app()
+        app.testing = True
+        app.test_client().get('/health')
+        assert (self.warmed, self.started) == (0, 0)
+
+if __name__ == '__main__':
+    pytest.main([__file__])
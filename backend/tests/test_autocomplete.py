@@ -0,0 +1,98 @@
+import pytest
+import sys
+import os
+
+# Add the parent directory to the path so we can import our modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.autocomplete import AutocompleteIndex, SuggestionSource, edit_distance
+
+class FakeSnapshot:
+    def __init__(self):
+        self.listeners = []
+
+    def subscribe(self, listener):
+        self.listeners.append(listener)
+
+class TestAutocomplete:
+    def setup_method(self):
+        """Setup an index fed by a wine and a coffee snapshot"""
+        self.index = AutocompleteIndex()
+        self.wines = FakeSnapshot()
+        self.coffees = FakeSnapshot()
+        SuggestionSource(self.index, self.wines, 'wine', ('name', 'region'))
+        SuggestionSource(self.index, self.coffees, 'coffee', ('name', 'origin'))
+        self.wines.listeners[0].reset([
+            {'id': 1, 'name': 'Chablis Premier Cru', 'region': 'Chablis'},
+            {'id': 2, 'name': 'Petit Chablis', 'region': 'Chablis'},
+            {'id': 3, 'name': 'Opus One', 'region': 'Napa Valley'},
+            {'id': 4, 'name': 'Dom Pérignon', 'region': 'Champagne'},
+        ])
+        self.coffees.listeners[0].reset([
+            {'id': 1, 'name': 'Ethiopian Yirgacheffe', 'origin': 'Yirgacheffe'},
+            {'id': 2, 'name': 'Chiapas Organic', 'origin': None},
+        ])
+
+    def texts(self, query, **kwargs):
+        return [s['text'] for s in self.index.suggest(query, **kwargs)[0]]
+
+    def test_edit_distance(self):
+        """Test adjacent transpositions count as one edit"""
+        assert edit_distance('chabils', 'chablis', 2) == 1
+        assert edit_distance('kitten', 'sitting', 3) == 3
+        assert edit_distance('abc', 'abcdef', 1) == 2
+
+    def test_prefix_ranked_by_count(self):
+        """Test prefix matches on any word, most common first"""
+        assert self.texts('cha') == ['Chablis', 'Chablis Premier Cru', 'Champagne', 'Petit Chablis']
+        assert self.texts('cha', limit=2) == ['Chablis', 'Chablis Premier Cru']
+        assert self.index.suggest('cha')[0][0] == {'text': 'Chablis', 'kind': 'wine', 'field': 'region', 'count': 2}
+
+    def test_multiple_words(self):
+        """Test earlier words must match whole, the last one as a prefix"""
+        assert self.texts('napa va') == ['Napa Valley']
+        assert self.texts('petit ch') == ['Petit Chablis']
+        assert self.texts('perignon') == ['Dom Pérignon']
+        assert self.texts('napa ') == ['Napa Valley']
+        assert self.texts('nap ') == []
+
+    def test_kind_filter(self):
+        """Test suggestions can be limited to one catalog"""
+        assert self.texts('ch', kinds={'coffee'}) == ['Chiapas Organic']
+        assert 'Chiapas Organic' not in self.texts('ch', kinds={'wine'})
+
+    def test_typo_correction(self):
+        """Test misspelled words are corrected against the vocabulary"""
+        suggestions, corrected = self.index.suggest('Chabils')
+        assert corrected == 'chablis'
+        assert [s['text'] for s in suggestions][0] == 'Chablis'
+        assert self.index.suggest('yirgachefe')[1] == 'yirgacheffe'
+        assert self.texts('napa valey') == ['Napa Valley']
+        assert self.index.suggest('cha')[1] is None
+        assert self.index.suggest('zzzzzz') == ([], None)
+
+    def test_short_words_not_corrected(self):
+        """Test very short words are not fuzzily matched"""
+        assert self.texts('opx') == []
+
+    def test_updates(self):
+        """Test counts follow upserts and deletes"""
+        wines = self.wines.listeners[0]
+        wines.upsert({'id': 3, 'name': 'Opus One', 'region': 'Chablis'})
+        assert self.index.suggest('chablis')[0][0]['count'] == 3
+        assert self.texts('napa') == []
+        wines.delete(1)
+        wines.delete(2)
+        assert self.texts('cha') == ['Chablis', 'Champagne']
+        assert self.index.suggest('chablis')[0][0]['count'] == 1
+        wines.upsert({'id': 5, 'name': 'Napa Cabernet', 'region': 'Napa Valley'})
+        assert self.texts('napa') == ['Napa Cabernet', 'Napa Valley']
+
+    def test_reset_replaces_only_its_source(self):
+        """Test reloading the wine snapshot leaves coffee suggestions alone"""
+        self.wines.listeners[0].reset([{'id': 9, 'name': 'Rioja Reserva', 'region': 'Rioja'}])
+        assert self.texts('cha') == []
+        assert self.texts('yirga') == ['Ethiopian Yirgacheffe', 'Yirgacheffe']
+
+if __name__ == '__main__':
+    pytest.main([__file__])
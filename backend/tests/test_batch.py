@@ -0,0 +1,45 @@
+import pytest
+import sys
+import os
+
+# Add the parent directory to the path so we can import our modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from models.wine_model import WineModel
+from models.review_model import ReviewModel
+from utils.filters import InvalidIds, parse_ids
+
+class TestBatch:
+    def setup_method(self):
+        """Setup the wine snapshot with a few wines"""
+        WineModel.SNAPSHOT._install(1, [
+            {'id': 1, 'name': 'Sancerre', 'type': 'white', 'price': 27},
+            {'id': 2, 'name': 'Tavel', 'type': 'rose', 'price': 19},
+            {'id': 3, 'name': 'Barolo', 'type': 'red', 'price': 45},
+        ])
+
+    def teardown_method(self):
+        WineModel.SNAPSHOT._install(None, [])
+
+    def test_parse_ids(self):
+        """Test ids from a query string or JSON list, de-duplicated in order"""
+        assert parse_ids('3, 1,3') == [3, 1]
+        assert parse_ids([2, '5']) == [2, 5]
+        for bad in ('', 'a,b', [], [True], [1.5], {'ids': 1}, None):
+            with pytest.raises(InvalidIds):
+                parse_ids(bad)
+        with pytest.raises(InvalidIds):
+            parse_ids(list(range(11)), limit=10)
+
+    def test_get_by_ids(self):
+        """Test rows come back in request order and unknown ids are skipped"""
+        wines = WineModel.get_wines_by_ids([3, 99, 1], fields=['id', 'name'])
+        assert wines == [{'id': 3, 'name': 'Barolo'}, {'id': 1, 'name': 'Sancerre'}]
+        assert WineModel.get_wines_by_ids([]) == []
+
+    def test_no_ratings_query_without_ids(self):
+        """Test an empty id list needs no rating query"""
+        assert ReviewModel.get_average_ratings_wines([]) == {}
+
+if __name__ == '__main__':
+    pytest.main([__file__])
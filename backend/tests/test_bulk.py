@@ -0,0 +1,98 @@
+import pytest
+import sys
+import os
+
+# Add the parent directory to the path so we can import our modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pymysql
+import utils.bulk as bulk
+from models.wine_model import WineModel
+from utils.bulk import bulk_upsert, upsert_sql
+
+class FakeCursor:
+    """Records statements; any row named 'bad' fails like a constraint violation"""
+    def __init__(self, conn):
+        self.conn = conn
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        pass
+
+    def execute(self, sql, params):
+        if 'bad' in params:
+            raise pymysql.err.DataError(1406, 'Data too long for column name')
+        self.conn.pending.append(len(params) // 2)
+
+class FakeConnection:
+    """Stand-in for a pooled pymysql connection"""
+    def __init__(self):
+        self.pending = []
+        self.committed = []
+        self.closed = False
+
+    def cursor(self):
+        return FakeCursor(self)
+
+    def commit(self):
+        self.committed.append(sum(self.pending))
+        self.pending = []
+
+    def rollback(self):
+        self.pending = []
+
+    def close(self):
+        self.closed = True
+
+class FakePool:
+    def __init__(self, conn):
+        self.conn = conn
+
+    def get_connection(self):
+        return self.conn
+
+class TestBulkUpsert:
+    def setup_method(self):
+        """Setup bulk writes against a fake connection"""
+        self.conn = FakeConnection()
+        self._get_pool = bulk.get_pool
+        bulk.get_pool = lambda: FakePool(self.conn)
+
+    def teardown_method(self):
+        bulk.get_pool = self._get_pool
+
+    def test_upsert_sql(self):
+        """Test one multi-row statement updating every column but id"""
+        assert upsert_sql('wines', ('id', 'name', 'price'), 2) == (
+            "INSERT INTO wines (id, name, price) VALUES (%s, %s, %s), (%s, %s, %s) "
+            "ON DUPLICATE KEY UPDATE name = VALUES(name), price = VALUES(price)")
+
+    def test_validation(self):
+        """Test rows are checked before anything is written"""
+        validate = WineModel._validate_bulk_row
+        assert validate({'name': 'Tavel', 'type': 'rose', 'price': '19.50', 'vintage': 2021}) is None
+        assert validate({'name': 'Tavel'}) == 'Missing required field: type'
+        assert validate({'name': 'Tavel', 'type': 'rose', 'sweetness_level': 'very'}).startswith('sweetness_level must be')
+        assert validate({'name': 'Tavel', 'type': 'rose', 'vintage': '2021'}) == 'vintage must be an integer'
+        assert validate({'name': 'Tavel', 'type': 'rose', 'price': 'cheap'}) == 'price must be a number'
+        assert validate(['Tavel']) == 'Row must be an object'
+
+    def test_chunks_and_per_row_errors(self):
+        """Test one transaction per chunk, with failing rows replayed one by one"""
+        rows = [{'name': f'Wine {i}', 'type': 'red'} for i in range(7)]
+        rows[2] = {'name': 'No type'}
+        rows[4] = {'name': 'bad', 'type': 'red'}
+        result = bulk_upsert('wines', ('name', 'type'), rows, WineModel._validate_bulk_row, chunk_size=3)
+        assert result['received'] == 7
+        assert result['written'] == 5
+        assert result['chunks'] == 2
+        assert [e['index'] for e in result['errors']] == [2, 4]
+        assert 'Data too long' in result['errors'][1]['error']
+        # Chunk 1: rows 0, 1, 3 in one statement; chunk 2: 5, 6 replayed after row 4 failed
+        assert self.conn.committed == [3, 2]
+        assert self.conn.closed
+
+if __name__ == '__main__':
+    pytest.main([__file__])
@@ -0,0 +1,206 @@
+import pytest
+import sys
+import os
+from decimal import Decimal
+
+# Add the parent directory to the path so we can import our modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from flask import Flask
+from pymysql.constants import SERVER_STATUS
+from config import Config
+import db.connection as connection
+from db.connection import init_app
+from db.pool import ConnectionPool
+from db.replicas import ReplicaRouter
+from models.wine_model import WineModel
+from routes.wine_routes import wine_bp
+from utils.catalog_snapshot import CatalogSnapshot
+
+class TestCatalogSnapshot:
+    def setup_method(self):
+        """Setup a snapshot whose loads come from an in-memory 'table'"""
+        self.version = 3
+        self.loads = 0
+        self.table = [
+            {'id': 1, 'name': 'Chianti', 'type': 'Red', 'country': 'Italy', 'region': 'Tuscany', 'price': Decimal('18.00')},
+            {'id': 2, 'name': 'barolo', 'type': 'Red', 'country': 'Italy', 'region': 'Piedmont', 'price': Decimal('45.00')},
+            {'id': 3, 'name': 'Sancerre', 'type': 'White', 'country': 'France', 'region': 'Loire Valley', 'price': Decimal('27.50')},
+        ]
+        self.snapshot = CatalogSnapshot('wines', indexed=('type', 'country', 'region'))
+        self.snapshot._fetch = self.fetch
+        self.snapshot._read_version = lambda: self.version
+        self._staleness = Config.CATALOG_SNAPSHOT_MAX_STALENESS
+        Config.CATALOG_SNAPSHOT_MAX_STALENESS = 0
+        assert self.snapshot.ready()
+
+    def teardown_method(self):
+        Config.CATALOG_SNAPSHOT_MAX_STALENESS = self._staleness
+
+    def fetch(self):
+        self.loads += 1
+        return self.version, [dict(row) for row in self.table]
+
+    def test_reads(self):
+        """Test all/get/distinct answer like the SQL they replace"""
+        assert [w['name'] for w in self.snapshot.all()] == ['barolo', 'Chianti', 'Sancerre']
+        assert self.snapshot.get(3)['region'] == 'Loire Valley'
+        assert self.snapshot.get(99) is None
+        assert self.snapshot.distinct('type') == ['Red', 'White']
+        assert self.snapshot.all(['id', 'name'])[0] == {'id': 2, 'name': 'barolo'}
+
+    def test_search(self):
+        """Test equality, LIKE and price-range filters"""
+        rows = self.snapshot.search(equals={'type': 'red'}, contains={'region': 'mont'})
+        assert [w['id'] for w in rows] == [2]
+        rows = self.snapshot.search(ranges={'price': ('20', None)})
+        assert [w['id'] for w in rows] == [2, 3]
+        assert self.snapshot.search(ranges={'price': ('cheap', None)}) is None
+
+    def test_own_writes_do_not_reload(self):
+        """Test patched writes keep the snapshot current without a reload"""
+        self.snapshot.upsert({'id': 4, 'name': 'Rioja', 'type': 'Red', 'country': 'Spain',
+                              'region': 'Rioja', 'price': Decimal('22.00')})
+        self.snapshot.delete(3)
+        self.version += 2
+        assert self.snapshot.ready()
+        assert self.loads == 1
+        assert self.snapshot.distinct('country') == ['Italy', 'Spain']
+
+    def test_external_writes_reload(self):
+        """Test a version bump not explained by our own writes triggers a reload"""
+        self.table.append({'id': 5, 'name': 'Muscadet', 'type': 'White', 'country': 'France',
+                           'region': 'Loire Valley', 'price': Decimal('12.00')})
+        self.version += 1
+        assert self.snapshot.ready()
+        assert self.loads == 2
+        assert self.snapshot.get(5)['name'] == 'Muscadet'
+
+class TestVersionLabels:
+    def setup_method(self):
+        """A loaded snapshot that would otherwise not re-check for a minute"""
+        self.version = 3
+        self.table = [{'id': 1, 'name': 'Chianti', 'type': 'Red'}]
+        self.snapshot = CatalogSnapshot('wines', indexed=('type',))
+        self.snapshot._fetch = lambda: (self.version, [dict(row) for row in self.table])
+        self.snapshot._read_version = lambda: self.version
+        self._staleness = Config.CATALOG_SNAPSHOT_MAX_STALENESS
+        Config.CATALOG_SNAPSHOT_MAX_STALENESS = 60
+        assert self.snapshot.ready()
+
+    def teardown_method(self):
+        Config.CATALOG_SNAPSHOT_MAX_STALENESS = self._staleness
+
+    def test_newer_etag_version_forces_catch_up(self):
+        """Test a body is never older than the version its ETag was built from"""
+        self.table[0]['name'] = 'Chianti Classico'
+        self.version += 1
+        assert self.snapshot.ready()
+        assert self.snapshot.get(1)['name'] == 'Chianti'  # within the staleness bound
+        self.snapshot.require_version(self.version)
+        assert self.snapshot.ready()
+        assert self.snapshot.get(1)['name'] == 'Chianti Classico'
+
+    def test_own_writes_satisfy_etag_version(self):
+        """Test versions explained by our own patched writes don't reload"""
+        self.snapshot.upsert({'id': 2, 'name': 'Rioja', 'type': 'Red'})
+        self.version += 1
+        self.snapshot._fetch = None  # a reload would fail
+        self.snapshot.require_version(self.version)
+        assert self.snapshot.ready()
+        assert self.snapshot.get(2)['name'] == 'Rioja'
+
+class FakeWinesCursor:
+    """Just enough of the wines table for create_wine/update_wine and sync()"""
+    COLUMNS = ('name', 'type', 'region', 'country', 'vintage', 'price',
+               'alcohol_content', 'acidity_level', 'sweetness_level')
+
+    def __init__(self, conn):
+        self.conn = conn
+        self.lastrowid = None
+        self.rowcount = 0
+        self.result = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        pass
+
+    def execute(self, sql, params=None):
+        sql = ' '.join(sql.split())
+        table = self.conn.table
+        if sql.startswith('INSERT INTO wines'):
+            self.lastrowid = max(table, default=0) + 1
+            table[self.lastrowid] = {'id': self.lastrowid, **dict(zip(self.COLUMNS, params))}
+            self.conn.server_status = SERVER_STATUS.SERVER_STATUS_IN_TRANS
+        elif sql.startswith('UPDATE wines'):
+            self.rowcount = int(params[-1] in table)
+            if self.rowcount:
+                table[params[-1]].update(zip(self.COLUMNS, params[:-1]))
+            self.conn.server_status = SERVER_STATUS.SERVER_STATUS_IN_TRANS
+        elif sql.startswith('SELECT') and sql.endswith('FROM wines WHERE id = %s'):
+            row = table.get(params[0])
+            self.result = dict(row) if row else None
+        else:
+            raise AssertionError(f'Unexpected SQL: {sql}')
+
+    def fetchone(self):
+        return self.result
+
+class FakeWinesConnection:
+    def __init__(self, table):
+        self.table = table
+        self.server_status = 0
+        self.commits = 0
+
+    def cursor(self):
+        return FakeWinesCursor(self)
+
+    def commit(self):
+        self.commits += 1
+        self.server_status = 0
+
+    def rollback(self):
+        self.server_status = 0
+
+    def close(self):
+        pass
+
+class TestWriteReadBack:
+    def setup_method(self):
+        """Route wine writes to a fake table behind a loaded snapshot"""
+        self.table = {1: {'id': 1, 'name': 'Chianti', 'type': 'Red'}}
+        connection._pool = ConnectionPool(lambda: FakeWinesConnection(self.table), min_size=0, max_size=2)
+        connection._router = ReplicaRouter([])
+        self._snapshot = WineModel.SNAPSHOT
+        WineModel.SNAPSHOT = CatalogSnapshot('wines', indexed=('type',))
+        WineModel.SNAPSHOT._fetch = lambda: (1, [dict(row) for row in self.table.values()])
+        WineModel.SNAPSHOT._read_version = lambda: 1
+        assert WineModel.SNAPSHOT.ready()
+
+        app = Flask(__name__)
+        init_app(app)
+        app.register_blueprint(wine_bp, url_prefix='/api/wines')
+        self.client = app.test_client()
+
+    def teardown_method(self):
+        WineModel.SNAPSHOT = self._snapshot
+        connection._pool = None
+        connection._router = None
+
+    def test_create_then_update_reads_back_own_write(self):
+        """Test POST and PUT answer with the row they wrote, before the request commits"""
+        response = self.client.post('/api/wines/', json={'name': 'Rioja', 'type': 'Red'})
+        assert response.status_code == 201
+        assert response.get_json()['name'] == 'Rioja'
+        wine_id = response.get_json()['id']
+        assert WineModel.SNAPSHOT.get(wine_id)['name'] == 'Rioja'
+
+        response = self.client.put(f'/api/wines/{wine_id}', json={'name': 'Rioja Reserva', 'type': 'Red'})
+        assert response.status_code == 200
+        assert response.get_json()['name'] == 'Rioja Reserva'
+        assert WineModel.SNAPSHOT.get(wine_id)['name'] == 'Rioja Reserva'
+
+if __name__ == '__main__':
+    pytest.main([__file__])
@@ -0,0 +1,60 @@
+import pytest
+import sys
+import os
+import random
+from decimal import Decimal
+
+# Add the parent directory to the path so we can import our modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+pytest.importorskip('numpy')
+
+from utils.columnar import ColumnarCatalog
+from utils.catalog_snapshot import CatalogSnapshot
+
+class TestColumnarCatalog:
+    def setup_method(self):
+        """Setup a random catalog with NULLs in every filterable column"""
+        rng = random.Random(7)
+        self.rows = [{
+            'id': i,
+            'name': f'Wine {i:04d}',
+            'type': rng.choice(['Red', 'White', 'Rosé', None]),
+            'region': rng.choice(['Napa Valley', 'Sonoma', 'Bordeaux', 'Rioja', None]),
+            'price': rng.choice([None, Decimal(f'{rng.randint(5, 200)}.{rng.randint(0, 99):02d}')]),
+            'vintage': rng.choice([None, rng.randint(1990, 2023)]),
+        } for i in range(500)]
+        self.columnar = ColumnarCatalog(self.rows, ('price', 'vintage'), ('type', 'region'))
+
+    def expected(self, predicate):
+        return [row['id'] for row in self.rows if predicate(row)]
+
+    def test_matches_row_by_row_filtering(self):
+        """Test masks agree with plain Python filtering, NULLs excluded"""
+        rows = self.columnar.search(equals={'type': 'red'}, contains={'region': 'valley'},
+                                    ranges={'price': ('20', '150.50')})
+        assert [r['id'] for r in rows] == self.expected(
+            lambda r: r['type'] == 'Red' and r['region'] == 'Napa Valley'
+            and r['price'] is not None and Decimal('20') <= r['price'] <= Decimal('150.50'))
+
+    def test_multi_value_equality(self):
+        """Test a list of values behaves like SQL IN"""
+        rows = self.columnar.search(equals={'vintage': [2000, 2001]})
+        assert [r['id'] for r in rows] == self.expected(lambda r: r['vintage'] in (2000, 2001))
+
+    def test_unsupported_filters_fall_back(self):
+        """Test unknown columns and non-numeric bounds return None"""
+        assert self.columnar.search(equals={'country': 'France'}) is None
+        assert self.columnar.search(ranges={'price': ('cheap', None)}) is None
+
+    def test_snapshot_uses_columns(self):
+        """Test CatalogSnapshot answers searches from the column arrays"""
+        snapshot = CatalogSnapshot('wines', indexed=('type',), numeric=('price',),
+                                   categorical=('type', 'region'))
+        snapshot._install(1, self.rows)
+        rows = snapshot.search(equals={'type': 'White'}, fields=['id'])
+        assert snapshot._columnar is not None
+        assert [r['id'] for r in rows] == self.expected(lambda r: r['type'] == 'White')
+
+if __name__ == '__main__':
+    pytest.main([__file__])
@@ -0,0 +1,81 @@
+import pytest
+import sys
+import os
+import gzip
+import json
+
+# Add the parent directory to the path so we can import our modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from flask import Flask, Response, jsonify
+from utils import compression
+
+class TestCompression:
+    def setup_method(self):
+        """Setup an app with a large, a small, a cacheable and a streamed endpoint"""
+        self.app = Flask(__name__)
+        self.app.config['COMPRESS_MIN_SIZE'] = 500
+        compression.init_app(self.app)
+        self.cache = self.app.extensions['compression_cache']
+        self.wines = [{'id': i, 'name': f'Wine {i}', 'type': 'Red'} for i in range(200)]
+
+        @self.app.route('/large')
+        def large():
+            return jsonify({'wines': self.wines})
+
+        @self.app.route('/small')
+        def small():
+            return jsonify({'status': 'healthy'})
+
+        @self.app.route('/cached')
+        def cached():
+            response = jsonify({'wines': self.wines})
+            response.set_etag('wines.12', weak=True)
+            return response
+
+        @self.app.route('/stream')
+        def stream():
+            return Response((json.dumps(w) + '\n' for w in self.wines),
+                            mimetype='application/x-ndjson')
+
+        self.client = self.app.test_client()
+
+    def test_gzip_negotiated(self):
+        """Test large JSON is gzipped when the client accepts it"""
+        response = self.client.get('/large', headers={'Accept-Encoding': 'gzip, deflate'})
+        assert response.headers['Content-Encoding'] == 'gzip'
+        assert 'Accept-Encoding' in response.headers['Vary']
+        assert json.loads(gzip.decompress(response.data))['wines'] == self.wines
+
+    def test_identity_without_accept_encoding(self):
+        """Test clients that do not ask for compression get plain JSON"""
+        response = self.client.get('/large')
+        assert 'Content-Encoding' not in response.headers
+        assert response.json['wines'] == self.wines
+
+    def test_small_and_streamed_untouched(self):
+        """Test bodies under the threshold and streamed bodies are not compressed"""
+        headers = {'Accept-Encoding': 'gzip'}
+        assert 'Content-Encoding' not in self.client.get('/small', headers=headers).headers
+        assert 'Content-Encoding' not in self.client.get('/stream', headers=headers).headers
+
+    def test_etag_responses_reuse_cache(self):
+        """Test a response with an ETag is compressed once and then served from cache"""
+        headers = {'Accept-Encoding': 'gzip'}
+        first = self.client.get('/cached', headers=headers)
+        second = self.client.get('/cached', headers=headers)
+        assert first.data == second.data
+        assert self.cache.misses == 1 and self.cache.hits == 1
+        assert second.headers['ETag'] == 'W/"wines.12"'
+
+    def test_cache_evicts_by_size(self):
+        """Test the cache stays within its byte budget"""
+        cache = compression.CompressionCache(10)
+        cache.put('a', b'12345')
+        cache.put('b', b'12345')
+        cache.put('c', b'12345')
+        assert cache.get('a') is None
+        assert cache.get('c') == b'12345'
+
+if __name__ == '__main__':
+    pytest.main([__file__])
@@ -0,0 +1,164 @@
+import pytest
+import sys
+import os
+
+# Add the parent directory to the path so we can import our modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from flask import Flask, jsonify
+from pymysql.constants import SERVER_STATUS
+
+import db.connection as connection
+from db.connection import get_db_connection, init_app
+from db.pool import ConnectionPool
+from db.replicas import Replica, ReplicaRouter
+
+class FakeConnection:
+    """Stand-in for a pymysql connection that records transaction calls"""
+    def __init__(self):
+        self.open = True
+        self.server_status = 0
+        self.commits = 0
+        self.rollbacks = 0
+
+    def write(self):
+        self.server_status = SERVER_STATUS.SERVER_STATUS_IN_TRANS
+
+    def commit(self):
+        self.commits += 1
+        self.server_status = 0
+
+    def rollback(self):
+        self.rollbacks += 1
+        self.server_status = 0
+
+    def close(self):
+        self.open = False
+
+class TestRequestConnection:
+    def setup_method(self):
+        """Setup an app whose connections come from a fake pool"""
+        self.created = []
+        connection._pool = ConnectionPool(self.connect, min_size=0, max_size=5)
+        connection._router = ReplicaRouter([])
+
+        app = Flask(__name__)
+        init_app(app)
+
+        @app.route('/write/<int:status>')
+        def write(status):
+            first = get_db_connection()
+            second = get_db_connection()
+            assert first is second
+            first.write()
+            first.commit()  # deferred
+            first.close()  # deferred
+            assert first.raw.commits == 0
+            return jsonify({}), status
+
+        @app.route('/boom')
+        def boom():
+            get_db_connection().write()
+            raise RuntimeError("boom")
+
+        self.client = app.test_client()
+
+    def teardown_method(self):
+        connection._pool = None
+        connection._router = None
+
+    def connect(self):
+        conn = FakeConnection()
+        self.created.append(conn)
+        return conn
+
+    def test_one_connection_one_commit(self):
+        """Test model calls in one request share a connection committed once"""
+        response = self.client.get('/write/200')
+        assert response.status_code == 200
+        assert len(self.created) == 1
+        assert self.created[0].commits == 1
+        assert connection._pool.idle_count == 1
+
+    def test_error_response_rolls_back(self):
+        """Test a 4xx/5xx response rolls the unit of work back"""
+        self.client.get('/write/500')
+        assert self.created[0].commits == 0
+        assert self.created[0].rollbacks == 1
+        assert connection._pool.idle_count == 1
+
+    def test_exception_rolls_back(self):
+        """Test an unhandled exception rolls the unit of work back"""
+        self.client.application.testing = False
+        self.client.get('/boom')
+        assert self.created[0].commits == 0
+        assert self.created[0].rollbacks == 1
+
+    def test_outside_request_uses_pool(self):
+        """Test scripts outside an app context get plain pooled connections"""
+        conn = get_db_connection()
+        conn.close()
+        assert connection._pool.idle_count == 1
+
+class TestReplicaRouting:
+    def setup_method(self):
+        """Setup an app with a fake primary and one stub replica"""
+        self.primary = []
+        self.replica = []
+        self.lag = 0
+        connection._pool = ConnectionPool(lambda: self.track(self.primary), min_size=0, max_size=5)
+        replica_pool = ConnectionPool(lambda: self.track(self.replica), min_size=0, max_size=5)
+        connection._router = ReplicaRouter([
+            Replica('stub', replica_pool, max_lag=5, check_interval=0, probe=lambda conn: self.lag)
+        ])
+
+        app = Flask(__name__)
+        init_app(app)
+
+        @app.route('/read', methods=['GET', 'POST'])
+        def read():
+            return jsonify({'replica': self.is_replica(get_db_connection(readonly=True))})
+
+        @app.route('/write-then-read', methods=['GET'])
+        def write_then_read():
+            get_db_connection().write()
+            return jsonify({'replica': self.is_replica(get_db_connection(readonly=True))})
+
+        self.client = app.test_client()
+
+    def teardown_method(self):
+        connection._pool = None
+        connection._router = None
+
+    def track(self, created):
+        conn = FakeConnection()
+        created.append(conn)
+        return conn
+
+    def is_replica(self, conn):
+        return conn.raw in self.replica
+
+    def test_get_reads_use_replica(self):
+        """Test read-only model calls in a GET go to the replica"""
+        assert self.client.get('/read').json['replica'] is True
+
+    def test_write_requests_read_primary(self):
+        """Test reads inside a write request stay on the primary"""
+        assert self.client.post('/read').json['replica'] is False
+
+    def test_reads_after_write_stay_on_primary(self):
+        """Test a request that touched the primary keeps reading from it"""
+        assert self.client.get('/write-then-read').json['replica'] is False
+
+    def test_lagging_replica_falls_back(self):
+        """Test a replica behind by more than max_lag is skipped"""
+        self.lag = 30
+        assert self.client.get('/read').json['replica'] is False
+
+    def test_broken_replication_falls_back(self):
+        """Test a replica reporting no lag value (replication stopped) is skipped"""
+        self.lag = None
+        assert self.client.get('/read').json['replica'] is False
+
+if __name__ == '__main__':
+    pytest.main([__file__])
@@ -0,0 +1,92 @@
+import pytest
+import sys
+import os
+import random
+from decimal import Decimal
+
+# Add the parent directory to the path so we can import our modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.catalog_snapshot import CatalogSnapshot
+from utils.facets import PRICE_EDGES, VINTAGE_EDGES, bucket_label, count_grouped, count_rows, facet_sql
+
+BUCKETS = {'price': PRICE_EDGES, 'vintage': VINTAGE_EDGES}
+
+class TestFacets:
+    def setup_method(self):
+        """Setup a random catalog with NULLs in every facet column"""
+        rng = random.Random(11)
+        self.rows = [{
+            'id': i,
+            'name': f'Wine {rng.randint(0, 50):02d}',
+            'type': rng.choice(['Red', 'White', 'Rosé', None]),
+            'country': rng.choice(['France', 'Italy', None]),
+            'price': rng.choice([None, Decimal(f'{rng.randint(5, 250)}.{rng.randint(0, 99):02d}'), Decimal('20.00')]),
+            'vintage': rng.choice([None, rng.randint(1965, 2023)]),
+        } for i in range(400)]
+
+    def snapshot(self, categorical):
+        snapshot = CatalogSnapshot('wines', indexed=('type', 'country'), numeric=('price', 'vintage'),
+                                   categorical=categorical)
+        snapshot._install(1, self.rows)
+        return snapshot
+
+    def test_bucket_labels(self):
+        """Test bucket labels for below, between and above the edges"""
+        assert [bucket_label(PRICE_EDGES, i) for i in (0, 1, len(PRICE_EDGES))] == ['<10', '10-20', '200+']
+
+    def test_count_rows(self):
+        """Test value and bucket counts, lower bounds inclusive and NULLs skipped"""
+        facets = count_rows(self.rows, ('type',), BUCKETS)
+        expected = sum(1 for r in self.rows if r['type'] == 'Red')
+        assert {'value': 'Red', 'count': expected} in facets['type']
+        assert sum(f['count'] for f in facets['type']) == sum(1 for r in self.rows if r['type'])
+        twenties = next(f for f in facets['price'] if f['value'] == '20-30')
+        assert twenties['min'] == 20 and twenties['max'] == 30
+        assert twenties['count'] == sum(1 for r in self.rows if r['price'] is not None and 20 <= r['price'] < 30)
+        counts = [f['count'] for f in facets['type']]
+        assert counts == sorted(counts, reverse=True)
+
+    def test_columnar_matches_python(self):
+        """Test the NumPy counts agree with the pure Python pass"""
+        pytest.importorskip('numpy')
+        filters = {'equals': {'country': 'France'}, 'ranges': {'price': ('15', None)}}
+        columnar = self.snapshot(('type', 'country'))
+        plain = self.snapshot(())
+        rows, facets = columnar.facet_search(facets=('type', 'country'), buckets=BUCKETS, **filters)
+        assert columnar._columnar is not None
+        assert (rows, facets) == plain.facet_search(facets=('type', 'country'), buckets=BUCKETS, **filters)
+        assert sum(f['count'] for f in facets['country']) == len(rows)
+
+    def test_pages(self):
+        """Test the page follows the (name, id) cursor while counts cover every match"""
+        snapshot = self.snapshot(('type', 'country'))
+        everything, facets = snapshot.facet_search(facets=('type',), buckets=BUCKETS)
+        first, first_facets = snapshot.facet_search(facets=('type',), buckets=BUCKETS, limit=7)
+        last = first[-1]
+        second, _ = snapshot.facet_search(facets=('type',), buckets=BUCKETS, limit=7,
+                                          after=(last['name'], last['id']), fields=['id', 'name'])
+        assert first == everything[:7]
+        assert second == [{'id': r['id'], 'name': r['name']} for r in everything[7:14]]
+        assert first_facets == facets
+
+    def test_grouped_sql(self):
+        """Test one GROUP BY query with INTERVAL() buckets, folded into the same shape"""
+        sql, params = facet_sql('wines', ('type', 'country'), {'price': (10, 20)}, " AND type = %s")
+        assert sql == ("SELECT type, country, INTERVAL(price, %s, %s) AS price_bucket, COUNT(*) AS facet_count "
+                       "FROM wines WHERE 1=1 AND type = %s GROUP BY 1, 2, 3")
+        assert params == [10, 20]
+        grouped = [
+            {'type': 'Red', 'country': 'France', 'price_bucket': 1, 'facet_count': 3},
+            {'type': 'Red', 'country': None, 'price_bucket': 2, 'facet_count': 2},
+            {'type': 'White', 'country': 'France', 'price_bucket': -1, 'facet_count': 1},
+        ]
+        assert count_grouped(grouped, ('type', 'country'), {'price': (10, 20)}) == {
+            'type': [{'value': 'Red', 'count': 5}, {'value': 'White', 'count': 1}],
+            'country': [{'value': 'France', 'count': 4}],
+            'price': [{'value': '10-20', 'min': 10, 'max': 20, 'count': 3},
+                      {'value': '20+', 'min': 20, 'max': None, 'count': 2}],
+        }
+
+if __name__ == '__main__':
+    pytest.main([__file__])
@@ -0,0 +1,42 @@
+import pytest
+import sys
+import os
+
+# Add the parent directory to the path so we can import our modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.fieldsets import InvalidFields, parse_fields, select_list
+from models.wine_model import WineModel
+from models.pairing_model import PairingModel
+
+class TestFieldsets:
+    def test_no_fields_selects_everything(self):
+        """Test an absent ?fields= selects every public column, not the rating aggregates"""
+        assert parse_fields(None, WineModel.FIELDS) is None
+        assert WineModel._select(None) == ', '.join(WineModel.FIELDS)
+        assert 'rating_sum' not in WineModel._select(None)
+
+    def test_required_fields_added(self):
+        """Test id and sort keys are always selected"""
+        fields = parse_fields('type,price', WineModel.FIELDS, ('id', 'name'))
+        assert fields == ['id', 'name', 'type', 'price']
+
+    def test_duplicates_removed(self):
+        """Test repeated fields are selected once"""
+        assert parse_fields('id,name,name', WineModel.FIELDS) == ['id', 'name']
+
+    def test_unknown_field_rejected(self):
+        """Test fields outside the whitelist (or SQL) are rejected"""
+        with pytest.raises(InvalidFields):
+            parse_fields('name,password_hash', WineModel.FIELDS)
+        with pytest.raises(InvalidFields):
+            parse_fields('name,(SELECT 1)', WineModel.FIELDS)
+
+    def test_select_list_aliases_joined_columns(self):
+        """Test joined columns are aliased to their public names"""
+        fields = parse_fields('wine_name,pairing_score', tuple(PairingModel.COLUMNS))
+        assert select_list(fields, PairingModel.COLUMNS) == \
+            'p.id AS id, w.name AS wine_name, p.pairing_score AS pairing_score'
+
+if __name__ == '__main__':
+    pytest.main([__file__])
@@ -0,0 +1,76 @@
+import pytest
+import sys
+import os
+from decimal import Decimal
+
+# Add the parent directory to the path so we can import our modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from models.wine_model import WineModel
+from models.coffee_model import CoffeeModel
+from utils.catalog_snapshot import CatalogSnapshot
+from werkzeug.datastructures import MultiDict
+from routes.wine_routes import _filters as wine_filters
+from utils.filters import InvalidFilter, equals_sql, parse_number, parse_values
+
+class TestFilters:
+    def setup_method(self):
+        """Setup a snapshot over a few wines"""
+        self.snapshot = CatalogSnapshot('wines', indexed=('type', 'country', 'region'))
+        self.snapshot._install(1, [
+            {'id': 1, 'name': 'Sancerre', 'type': 'white', 'vintage': 2019, 'acidity_level': 'high', 'price': Decimal('27.50')},
+            {'id': 2, 'name': 'Tavel', 'type': 'rose', 'vintage': 2021, 'acidity_level': 'medium', 'price': Decimal('19.00')},
+            {'id': 3, 'name': 'Barolo', 'type': 'red', 'vintage': 2015, 'acidity_level': 'high', 'price': Decimal('45.00')},
+            {'id': 4, 'name': 'Chablis', 'type': 'white', 'vintage': None, 'acidity_level': 'high', 'price': Decimal('31.00')},
+        ])
+
+    def test_parse_values(self):
+        """Test comma-separated values are split and trimmed"""
+        assert parse_values('white, rose,') == ['white', 'rose']
+
+    def test_equals_sql(self):
+        """Test a single value binds = %s and a list binds an IN list"""
+        assert equals_sql('type', 'red') == (" AND type = %s", ['red'])
+        assert equals_sql('type', ['red']) == (" AND type = %s", ['red'])
+        assert equals_sql('type', ['white', 'rose']) == (" AND type IN (%s, %s)", ['white', 'rose'])
+
+    def test_wine_filter_sql(self):
+        """Test multi-value, flavour and vintage filters reach the WHERE clause"""
+        sql, params = WineModel._filter_sql({
+            'type': ['white', 'rose'], 'acidity_level': 'high', 'body_level': 'light',
+            'min_vintage': 2016, 'max_price': 30
+        })
+        assert sql == (" AND type IN (%s, %s) AND acidity_level = %s"
+                       " AND price <= %s AND vintage >= %s")
+        assert params == ['white', 'rose', 'high', 30, 2016]
+
+    def test_coffee_filter_sql(self):
+        """Test roast and acidity filters on coffees"""
+        sql, params = CoffeeModel._filter_sql({'roast_level': ['light', 'medium'], 'acidity_level': 'low'})
+        assert sql == " AND roast_level IN (%s, %s) AND acidity_level = %s"
+        assert params == ['light', 'medium', 'low']
+
+    def test_snapshot_filters(self):
+        """Test the same filters evaluated in memory"""
+        filters = WineModel._snapshot_filters({'type': ['white', 'rose'], 'acidity_level': ['high'],
+                                               'min_vintage': 2016})
+        assert [r['id'] for r in self.snapshot.search(**filters)] == [1]
+        filters = WineModel._snapshot_filters({'type': ['white', 'red'], 'max_vintage': 2020})
+        assert [r['id'] for r in self.snapshot.search(**filters)] == [3, 1]
+
+    def test_parse_number(self):
+        """Test numeric filters parse, and bad values raise InvalidFilter (a 400)"""
+        assert parse_number('19.5', 'min_price') == 19.5
+        assert parse_number('2019', 'min_vintage', int) == 2019
+        for value, kind in (('abc', float), ('nan', float), ('2019.5', int)):
+            with pytest.raises(InvalidFilter):
+                parse_number(value, 'min_vintage', kind)
+
+    def test_route_filters_reject_bad_numbers(self):
+        assert wine_filters(MultiDict({'min_vintage': '2015', 'max_price': '40'})) == {
+            'max_price': 40.0, 'min_vintage': 2015}
+        with pytest.raises(InvalidFilter, match='min_vintage must be an integer'):
+            wine_filters(MultiDict({'min_vintage': 'abc'}))
+
+if __name__ == '__main__':
+    pytest.main([__file__])
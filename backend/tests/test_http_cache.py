@@ -0,0 +1,66 @@
+import pytest
+import sys
+import os
+from datetime import datetime
+
+# Add the parent directory to the path so we can import our modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from flask import Flask, jsonify
+from models.catalog_version_model import CatalogVersionModel
+from utils.http_cache import conditional
+
+class TestConditionalGet:
+    def setup_method(self):
+        """Setup an app whose view counts how often it actually runs"""
+        self.app = Flask(__name__)
+        self.calls = 0
+        self.versions = {
+            'wines': {'version': 12, 'updated_at': datetime(2024, 5, 1, 10, 0, 0)},
+            'reviews': {'version': 4, 'updated_at': datetime(2024, 5, 2, 9, 30, 0)},
+        }
+        self._original = CatalogVersionModel.get_versions
+        CatalogVersionModel.get_versions = staticmethod(
+            lambda tables: {t: self.versions[t] for t in tables if t in self.versions})
+
+        @self.app.route('/wines')
+        @conditional('wines', 'reviews')
+        def wines():
+            self.calls += 1
+            return jsonify({'wines': []})
+
+        self.client = self.app.test_client()
+
+    def teardown_method(self):
+        CatalogVersionModel.get_versions = self._original
+
+    def test_etag_from_versions(self):
+        """Test the ETag is built from the versions of every listed table"""
+        response = self.client.get('/wines')
+        assert response.status_code == 200
+        assert response.headers['ETag'] == 'W/"wines.12-reviews.4"'
+        assert response.headers['Last-Modified'] == 'Thu, 02 May 2024 09:30:00 GMT'
+
+    def test_matching_etag_skips_view(self):
+        """Test a matching If-None-Match returns 304 without running the view"""
+        etag = self.client.get('/wines').headers['ETag']
+        response = self.client.get('/wines', headers={'If-None-Match': etag})
+        assert response.status_code == 304
+        assert self.calls == 1
+
+    def test_write_changes_etag(self):
+        """Test a version bump invalidates the client's copy"""
+        etag = self.client.get('/wines').headers['ETag']
+        self.versions['reviews'] = {'version': 5, 'updated_at': datetime(2024, 5, 3)}
+        response = self.client.get('/wines', headers={'If-None-Match': etag})
+        assert response.status_code == 200
+        assert self.calls == 2
+
+    def test_if_modified_since(self):
+        """Test Last-Modified round-trips through If-Modified-Since"""
+        last_modified = self.client.get('/wines').headers['Last-Modified']
+        response = self.client.get('/wines', headers={'If-Modified-Since': last_modified})
+        assert response.status_code == 304
+
+if __name__ == '__main__':
+    pytest.main([__file__])
@@ -0,0 +1,49 @@
+import pytest
+import sys
+import os
+import json
+from datetime import date, datetime
+from decimal import Decimal
+
+# Add the parent directory to the path so we can import our modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from flask import Flask
+from flask.json.provider import DefaultJSONProvider
+from app import create_app
+from utils.json_provider import FastJSONProvider
+
+class TestFastJSONProvider:
+    def setup_method(self):
+        """Setup both providers on one app"""
+        self.app = Flask(__name__)
+        self.default = DefaultJSONProvider(self.app)
+        self.fast = FastJSONProvider(self.app)
+        self.row = {'id': 7, 'name': 'Château Margaux', 'price': Decimal('499.99'),
+                    'vintage': 2015, 'created_at': datetime(2024, 3, 9, 14, 5, 1),
+                    'harvested': date(2015, 9, 20), 'region': None}
+
+    def test_same_wire_format_as_default(self):
+        """Test Decimal and dates encode exactly as Flask's provider does"""
+        assert json.loads(self.fast.dumps(self.row)) == json.loads(self.default.dumps(self.row))
+
+    def test_iso_datetimes(self):
+        """Test JSON_DATETIME_FORMAT = 'iso' switches to ISO 8601"""
+        self.app.config['JSON_DATETIME_FORMAT'] = 'iso'
+        data = json.loads(self.fast.dumps(self.row))
+        assert data['created_at'] == '2024-03-09T14:05:01'
+        assert data['price'] == '499.99'
+
+    def test_response(self):
+        """Test jsonify() output goes through the fast encoder"""
+        with self.app.app_context():
+            response = self.fast.response(wines=[self.row], count=1)
+        assert response.mimetype == 'application/json'
+        assert json.loads(response.data)['wines'][0]['created_at'] == 'Sat, 09 Mar 2024 14:05:01 GMT'
+
+    def test_registered_in_app_factory(self):
+        """Test create_app() installs the provider"""
+        assert isinstance(create_app().json, FastJSONProvider)
+
+if __name__ == '__main__':
+    pytest.main([__file__])
@@ -0,0 +1,60 @@
+import pytest
+import sys
+import os
+
+# Add the parent directory to the path so we can import our modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.leaderboard import Leaderboard, bayesian_score
+
+class TestLeaderboard:
+    def setup_method(self):
+        """Three rated wines; the catalog-wide mean rating is 4.0"""
+        self.board = Leaderboard(10)
+        self.board.load([
+            {'id': 1, 'type': 'Red', 'rating_sum': 5, 'rating_count': 1},
+            {'id': 2, 'type': 'Red', 'rating_sum': 960, 'rating_count': 200},
+            {'id': 3, 'type': 'White', 'rating_sum': 235, 'rating_count': 99},
+        ])
+
+    def _ids(self, limit=10, product_type=None):
+        return [product_id for product_id, _, _, _ in self.board.top(limit, product_type)]
+
+    def test_bayesian_ordering(self):
+        """Test a single 5-star review ranks below 4.8 from 200 reviews"""
+        assert self.board.prior_mean == 4.0
+        assert self._ids() == [2, 1, 3]
+        product_id, score, average, count = self.board.top(1)[0]
+        assert (product_id, average, count) == (2, 4.8, 200)
+        assert score == pytest.approx(bayesian_score(960, 200, 4.0, 10))
+
+    def test_top_is_a_prefix(self):
+        assert self._ids(limit=2) == [2, 1]
+        assert self._ids(limit=0) == []
+
+    def test_apply_moves_product(self):
+        """Test rating deltas re-rank incrementally"""
+        for _ in range(60):
+            self.board.apply(1, 5, 1)
+        assert self._ids() == [1, 2, 3]
+        self.board.apply(1, -305, -61)
+        assert self._ids() == [2, 3]
+
+    def test_new_product_uses_given_type(self):
+        self.board.apply(4, 4, 1, 'White')
+        assert self._ids(product_type='White') == [4, 3]
+
+    def test_per_type_boards(self):
+        assert self._ids(product_type='Red') == [2, 1]
+        assert self._ids(product_type='Rosé') == []
+        self.board.set_type(2, 'White')
+        assert self._ids(product_type='Red') == [1]
+        assert self._ids(product_type='White') == [2, 3]
+
+    def test_remove(self):
+        self.board.remove(2)
+        assert self._ids() == [1, 3]
+        assert self._ids(product_type='Red') == [1]
+
+if __name__ == '__main__':
+    pytest.main([__file__])
@@ -0,0 +1,125 @@
+import pytest
+import sys
+import os
+
+# Add the parent directory to the path so we can import our modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from load_catalog import (read_rows, coerce_csv_row, infile_columns, create_indexes,
+                          load_batches, load_infile)
+from models.wine_model import WineModel
+
+class FakeCursor:
+    def __init__(self, conn):
+        self.conn = conn
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        pass
+
+    def execute(self, sql, params=None):
+        self.conn.statements.append((sql, params))
+        self.rowcount = self.conn.rowcount
+
+    def fetchone(self):
+        return {'COUNT(*)': 0}
+
+class FakeConnection:
+    """Records statements and commits instead of talking to MySQL"""
+    def __init__(self):
+        self.statements = []
+        self.commits = 0
+        self.rowcount = 0
+
+    def cursor(self):
+        return FakeCursor(self)
+
+    def commit(self):
+        self.commits += 1
+
+class TestLoadCatalog:
+    def setup_method(self):
+        """Set up test fixtures"""
+        self.columns = WineModel.BULK_COLUMNS
+
+    def test_csv_rows_are_coerced(self, tmp_path):
+        """Empty CSV fields become NULL and integer columns are parsed"""
+        path = tmp_path / 'wines.csv'
+        path.write_text('id,name,type,vintage,price\n'
+                        '7,Chablis,white,2019,24.50\n'
+                        ',"Rioja, Reserva",red,,\n', encoding='utf-8')
+        rows = list(read_rows(str(path)))
+        assert rows[0] == {'id': 7, 'name': 'Chablis', 'type': 'white', 'vintage': 2019, 'price': '24.50'}
+        assert rows[1] == {'id': None, 'name': 'Rioja, Reserva', 'type': 'red', 'vintage': None, 'price': None}
+
+    def test_unparseable_integer_left_for_validation(self):
+        row = coerce_csv_row({'name': 'X', 'type': 'red', 'vintage': 'old'})
+        assert row['vintage'] == 'old'
+        assert WineModel._validate_bulk_row(row) == 'vintage must be an integer'
+
+    def test_jsonl_rows(self, tmp_path):
+        path = tmp_path / 'wines.jsonl'
+        path.write_text('{"name": "Barolo", "type": "red"}\n\n{"name": "Cava", "type": "sparkling"}\n')
+        assert [row['name'] for row in read_rows(str(path))] == ['Barolo', 'Cava']
+
+    def test_unknown_extension_rejected(self):
+        with pytest.raises(ValueError):
+            list(read_rows('wines.xlsx'))
+
+    def test_infile_columns(self):
+        """Unknown header columns are read into a throwaway variable"""
+        variables, assignments = infile_columns(['name', 'type', 'notes'], self.columns)
+        assert variables == '@name, @type, @unused'
+        assert assignments == "name = NULLIF(@name, ''), type = NULLIF(@type, '')"
+
+    def test_create_indexes(self):
+        """Regular indexes are rebuilt in one ALTER, FULLTEXT ones separately"""
+        conn = FakeConnection()
+        create_indexes(FakeCursor(conn), 'wines', {
+            'idx_wines_type_price': ('INDEX', ['type', 'price']),
+            'uq_wines_name': ('UNIQUE INDEX', ['name(100)']),
+            'ft_wines_name': ('FULLTEXT INDEX', ['name', 'region']),
+        })
+        sql = [statement for statement, _ in conn.statements]
+        assert sql == [
+            'ALTER TABLE wines ADD INDEX idx_wines_type_price (type, price), '
+            'ADD UNIQUE INDEX uq_wines_name (name(100))',
+            'ALTER TABLE wines ADD FULLTEXT INDEX ft_wines_name (name, region)',
+        ]
+
+    def test_load_batches(self, tmp_path, capsys):
+        """Valid rows are written in batches, one commit each; invalid rows are reported"""
+        path = tmp_path / 'wines.jsonl'
+        lines = ['{"name": "Wine %d", "type": "red"}' % i for i in range(5)]
+        lines.insert(2, '{"name": "Broken", "type": "red", "sweetness_level": "very"}')
+        path.write_text('\n'.join(lines))
+        conn = FakeConnection()
+        written, rejected = load_batches(conn, 'wines', WineModel, [str(path)], batch_size=2)
+        assert (written, rejected) == (5, 1)
+        assert conn.commits == 3
+        assert 'row 3: sweetness_level must be one of' in capsys.readouterr().out
+
+    def test_load_infile_merges_through_staging(self, tmp_path):
+        """LOAD DATA goes into a staging table that is upserted into the
+        catalog table, never straight into it (which would skip existing ids)"""
+        path = tmp_path / 'wines.csv'
+        path.write_text('id,name,type\n7,Chablis,white\n,Rioja,red\n', encoding='utf-8')
+        conn = FakeConnection()
+        conn.rowcount = 2
+        written, warnings = load_infile(conn, 'wines', WineModel, [str(path)])
+        assert (written, warnings) == (2, 0)
+        sql = [' '.join(statement.split()) for statement, _ in conn.statements]
+        assert sql[0] == ('CREATE TEMPORARY TABLE wines_staging SELECT ' + ', '.join(self.columns) +
+                          ' FROM wines LIMIT 0')
+        assert sql[1] == 'ALTER TABLE wines_staging MODIFY id INT NULL'
+        assert sql[2].startswith('LOAD DATA LOCAL INFILE %s INTO TABLE wines_staging ')
+        assert sql[4].startswith('INSERT INTO wines (' + ', '.join(self.columns) + ') SELECT ')
+        assert 'FROM wines_staging ON DUPLICATE KEY UPDATE name = VALUES(name)' in sql[4]
+        assert 'REPLACE' not in ' '.join(sql)
+        assert sql[-1] == 'DROP TEMPORARY TABLE IF EXISTS wines_staging'
+        assert conn.commits == 1
+
+if __name__ == '__main__':
+    pytest.main([__file__])
@@ -0,0 +1,124 @@
+import pytest
+import sys
+import os
+from datetime import datetime
+from decimal import Decimal
+
+# Add the parent directory to the path so we can import our modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from werkzeug.datastructures import MultiDict
+from config import Config
+from utils.pagination import InvalidCursor, decode_cursor, encode_cursor, get_page_size, paginate, review_feed
+import models.pairing_model as pairing_model
+from models.pairing_model import PairingModel
+
+class TestPagination:
+    def test_cursor_round_trip(self):
+        """Test cursors decode back to the sort-key values they were built from"""
+        token = encode_cursor(('Château Margaux', 42))
+        assert '=' not in token
+        assert decode_cursor(token, 2) == ['Château Margaux', 42]
+
+    def test_decimal_cursor(self):
+        """Test Decimal sort keys survive as exact strings"""
+        token = encode_cursor((Decimal('7.35'), 9))
+        assert decode_cursor(token, 2) == ['7.35', 9]
+
+    def test_datetime_cursor(self):
+        """Test timestamps (review feeds) encode as MySQL-comparable strings"""
+        token = encode_cursor((datetime(2024, 5, 1, 18, 30, 5), 77))
+        assert decode_cursor(token, 2) == ['2024-05-01 18:30:05', 77]
+
+    def test_invalid_cursor(self):
+        """Test garbage and wrong-length cursors are rejected"""
+        with pytest.raises(InvalidCursor):
+            decode_cursor('not-a-cursor!', 2)
+        with pytest.raises(InvalidCursor):
+            decode_cursor(encode_cursor((1, 2, 3)), 2)
+
+    def test_page_size_cap(self):
+        """Test page_size defaults and is clamped to MAX_PAGE_SIZE"""
+        assert get_page_size(MultiDict()) == Config.DEFAULT_PAGE_SIZE
+        assert get_page_size(MultiDict({'page_size': '100000'})) == Config.MAX_PAGE_SIZE
+        assert get_page_size(MultiDict({'page_size': '0'})) == 1
+
+    def test_paginate(self):
+        """Test the extra lookahead row is trimmed and produces the next cursor"""
+        rows = [{'name': f'Wine {i}', 'id': i} for i in range(4)]
+        page, next_cursor = paginate(rows, 3, lambda w: (w['name'], w['id']))
+        assert len(page) == 3
+        assert decode_cursor(next_cursor, 2) == ['Wine 2', 2]
+
+        page, next_cursor = paginate(rows[:3], 3, lambda w: (w['name'], w['id']))
+        assert len(page) == 3
+        assert next_cursor is None
+
+    def test_review_feed(self):
+        """Test review feeds page over (created_at, id) and keep the plain ?limit= list"""
+        calls = []
+        rows = [{'id': i, 'created_at': datetime(2024, 5, 1, 12, 0, i)} for i in (9, 8, 7)]
+        def fetch(limit, fields, after=None):
+            calls.append((limit, fields, after))
+            return rows[:limit] if limit else rows
+
+        columns = {'id': 'r.id', 'rating': 'r.rating', 'created_at': 'r.created_at'}
+        feed = review_feed(MultiDict({'page_size': '2', 'fields': 'rating'}), columns, fetch)
+        assert calls[-1] == (3, ['id', 'created_at', 'rating'], None)
+        assert feed['count'] == 2
+        assert decode_cursor(feed['next_cursor'], 2) == ['2024-05-01 12:00:08', 8]
+
+        review_feed(MultiDict({'cursor': feed['next_cursor']}), columns, fetch)
+        assert calls[-1][2] == ['2024-05-01 12:00:08', 8]
+
+        assert review_feed(MultiDict({'limit': '5'}), columns, fetch) == {'reviews': rows, 'count': 3}
+        assert calls[-1] == (5, None, None)
+
+class RecordingConnection:
+    """Records the statements a model runs and returns no rows"""
+    def __init__(self):
+        self.statements = []
+
+    def cursor(self):
+        return self
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        pass
+
+    def execute(self, sql, params=None):
+        self.statements.append((' '.join(sql.split()), params))
+
+    def fetchall(self):
+        return []
+
+    def close(self):
+        pass
+
+class TestPairingPages:
+    def setup_method(self):
+        self.conn = RecordingConnection()
+        self._original = pairing_model.get_db_connection
+        pairing_model.get_db_connection = lambda readonly=False: self.conn
+
+    def teardown_method(self):
+        pairing_model.get_db_connection = self._original
+
+    def test_scored_cursor_continues_into_unscored(self):
+        """Test pages after a scored pairing still reach the NULL-score ones"""
+        PairingModel.get_pairings_page({}, ['7.50', 12], 10)
+        sql, params = self.conn.statements[0]
+        assert 'OR p.pairing_score IS NULL' in sql
+        assert params == ['7.50', '7.50', 12, 11]
+
+    def test_unscored_cursor(self):
+        """Test a page ending on a NULL score continues by id among NULL scores"""
+        PairingModel.get_pairings_page({}, [None, 12], 10)
+        sql, params = self.conn.statements[0]
+        assert 'AND p.pairing_score IS NULL AND p.id < %s' in sql
+        assert params == [12, 11]
+
+if __name__ == '__main__':
+    pytest.main([__file__])
@@ -0,0 +1,136 @@
+import pytest
+import sys
+import os
+import threading
+import time
+
+# Add the parent directory to the path so we can import our modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from db.pool import ConnectionPool, PoolTimeout
+from pymysql.constants import SERVER_STATUS
+
+class FakeConnection:
+    """Stand-in for a pymysql connection"""
+    def __init__(self):
+        self.open = True
+        self.alive = True
+        self.server_status = 0
+        self.rollbacks = 0
+        self.pings = 0
+
+    def ping(self, reconnect=False):
+        self.pings += 1
+        if not self.alive:
+            raise ConnectionError("gone away")
+
+    def rollback(self):
+        self.rollbacks += 1
+        self.server_status = 0
+
+    def close(self):
+        self.open = False
+
+class TestConnectionPool:
+    def setup_method(self):
+        """Setup a pool backed by fake connections"""
+        self.created = []
+        self.pool = ConnectionPool(self.connect, min_size=1, max_size=2, timeout=0.2,
+                                   idle_timeout=60, ping_interval=60)
+
+    def connect(self):
+        conn = FakeConnection()
+        self.created.append(conn)
+        return conn
+
+    def test_prefills_min_size(self):
+        """Test the pool opens min_size connections up front"""
+        assert len(self.created) == 1
+        assert self.pool.idle_count == 1
+
+    def test_close_returns_connection(self):
+        """Test close() hands the same connection to the next borrower"""
+        conn = self.pool.get_connection()
+        raw = conn.raw
+        conn.close()
+        conn.close()  # idempotent
+
+        again = self.pool.get_connection()
+        assert again.raw is raw
+        assert len(self.created) == 1
+        again.close()
+
+    def test_borrow_timeout(self):
+        """Test borrowing past max_size waits and then times out"""
+        first = self.pool.get_connection()
+        second = self.pool.get_connection()
+
+        start = time.monotonic()
+        with pytest.raises(PoolTimeout):
+            self.pool.get_connection()
+        assert time.monotonic() - start >= 0.2
+
+        first.close()
+        second.close()
+
+    def test_waiter_gets_released_connection(self):
+        """Test a blocked borrower is woken up by a release"""
+        first = self.pool.get_connection()
+        second = self.pool.get_connection()
+
+        timer = threading.Timer(0.05, first.close)
+        timer.start()
+        third = self.pool.get_connection(timeout=1)
+        assert third.raw is not None
+
+        timer.join()
+        second.close()
+        third.close()
+
+    def test_rolls_back_open_transaction(self):
+        """Test an uncommitted transaction is rolled back on release"""
+        conn = self.pool.get_connection()
+        conn.raw.server_status = SERVER_STATUS.SERVER_STATUS_IN_TRANS
+        raw = conn.raw
+        conn.close()
+        assert raw.rollbacks == 1
+
+    def test_dead_connection_replaced(self):
+        """Test a connection that fails its liveness check is replaced"""
+        self.pool.ping_interval = 0
+        conn = self.pool.get_connection()
+        dead = conn.raw
+        conn.close()
+        dead.alive = False
+
+        conn = self.pool.get_connection()
+        assert conn.raw is not dead
+        assert dead.open is False
+        assert self.pool.size == 1
+        conn.close()
+
+    def test_idle_reaping_keeps_min_size(self):
+        """Test idle connections beyond min_size are closed"""
+        first = self.pool.get_connection()
+        second = self.pool.get_connection()
+        first.close()
+        second.close()
+        assert self.pool.size == 2
+
+        self.pool.idle_timeout = 0
+        conn = self.pool.get_connection()
+        assert self.pool.size == 1
+        conn.close()
+
+    def test_failed_connect_frees_slot(self):
+        """Test a failing connect does not permanently consume a slot"""
+        def broken():
+            raise ConnectionError("refused")
+        pool = ConnectionPool(broken, min_size=0, max_size=1, timeout=0.1)
+        for _ in range(3):
+            with pytest.raises(ConnectionError):
+                pool.get_connection()
+        assert pool.size == 0
+
+if __name__ == '__main__':
+    pytest.main([__file__])
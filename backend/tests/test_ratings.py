@@ -0,0 +1,231 @@
+import pytest
+import sys
+import os
+
+# Add the parent directory to the path so we can import our modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import models.review_model as review_model
+from config import Config
+from models.review_model import ReviewModel
+from flask import Flask
+from routes.review_routes import review_bp
+
+class FakeCursor:
+    """Answers the FOR UPDATE lookup of review 7 and records everything else"""
+    def __init__(self, conn):
+        self.conn = conn
+        self.lastrowid = 42
+        self.rowcount = 1
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        pass
+
+    def execute(self, sql, params=None):
+        self.conn.statements.append((' '.join(sql.split()), params))
+
+    def fetchone(self):
+        return {'wine_id': 3, 'coffee_id': None, 'rating': 2}
+
+    def fetchall(self):
+        return [{'tracking_id': tracking_id} for tracking_id in self.conn.written]
+
+class FakeConnection:
+    def __init__(self):
+        self.statements = []
+        self.committed_after = None
+        self.written = []  # tracking ids already in reviews
+        self.discarded = False
+
+    def cursor(self):
+        return FakeCursor(self)
+
+    def commit(self):
+        self.committed_after = len(self.statements)
+
+    def discard(self):
+        self.discarded = True
+
+    def close(self):
+        pass
+
+class TestRatingAggregates:
+    def setup_method(self):
+        """Route the review model's connections to a fake"""
+        self.conn = FakeConnection()
+        self._original = review_model.get_db_connection
+        review_model.get_db_connection = lambda readonly=False: self.conn
+        self._leaderboard = Config.LEADERBOARD_ENABLED
+        Config.LEADERBOARD_ENABLED = False
+
+    def teardown_method(self):
+        review_model.get_db_connection = self._original
+        Config.LEADERBOARD_ENABLED = self._leaderboard
+
+    def _aggregate_updates(self):
+        return [params for sql, params in self.conn.statements if sql.startswith('UPDATE wines SET rating_sum')]
+
+    def test_rating_changes(self):
+        """Test the deltas for creating, re-rating and deleting a review"""
+        review = {'wine_id': 3, 'coffee_id': None, 'rating': 4}
+        assert ReviewModel._rating_changes(None, review) == [('wine_id', 3, 4, 1, (0, 0, 0, 1, 0))]
+        assert ReviewModel._rating_changes(review, {**review, 'rating': 5}) == \
+            [('wine_id', 3, 1, 0, (0, 0, 0, -1, 1))]
+        assert ReviewModel._rating_changes(review, review) == []
+        assert ReviewModel._rating_changes(review, None) == [('wine_id', 3, -4, -1, (0, 0, 0, -1, 0))]
+        coffee = {'wine_id': None, 'coffee_id': 8, 'rating': 3}
+        assert ReviewModel._rating_changes(None, coffee) == [('coffee_id', 8, 3, 1, (0, 0, 1, 0, 0))]
+
+    def test_create_updates_aggregates_before_commit(self):
+        """Test the aggregate update is part of the review's transaction"""
+        review_id = ReviewModel.create_review({'user_id': 1, 'wine_id': 3, 'rating': 5})
+        assert review_id == 42
+        assert self._aggregate_updates() == [(5, 1, 0, 0, 0, 0, 1, 3)]
+        assert self.conn.committed_after == len(self.conn.statements)
+
+    def test_update_applies_difference(self):
+        assert ReviewModel.update_review(7, {'rating': 5, 'comment': 'better'})
+        assert self.conn.statements[0][0].endswith('FOR UPDATE')
+        assert self._aggregate_updates() == [(3, 0, 0, -1, 0, 0, 1, 3)]
+
+    def test_delete_removes_rating(self):
+        assert ReviewModel.delete_review(7)
+        assert self._aggregate_updates() == [(-2, -1, 0, -1, 0, 0, 0, 3)]
+
+    def test_rating_info_histogram(self):
+        """Test rating_info carries the star histogram, zeros for unrated products"""
+        row = {'avg_rating': 4.5, 'rating_count': 2, 'rating_1': 0, 'rating_2': 0,
+               'rating_3': 0, 'rating_4': 1, 'rating_5': 1}
+        assert ReviewModel._rating_info(row)['histogram'] == {'1': 0, '2': 0, '3': 0, '4': 1, '5': 1}
+        assert ReviewModel._rating_info(None)['histogram'] == {'1': 0, '2': 0, '3': 0, '4': 0, '5': 0}
+
+    def test_reads_use_aggregate_columns(self):
+        """Test rating reads query the product table, never reviews"""
+        ReviewModel.get_average_ratings_wines([1, 2])
+        ReviewModel.get_top_rated_coffees(5)
+        sql = [statement for statement, _ in self.conn.statements]
+        assert sql[0].startswith('SELECT id, avg_rating, rating_count, rating_1, rating_2')
+        assert 'FROM coffees CROSS JOIN' in sql[1] and 'WHERE rating_count > 0' in sql[1]
+        assert not any('reviews' in statement for statement in sql)
+
+class FakePool:
+    def __init__(self, conn):
+        self.conn = conn
+
+    def get_connection(self):
+        return self.conn
+
+class TestBatchedReviews:
+    def setup_method(self):
+        self.conn = FakeConnection()
+        self._original = review_model.get_pool
+        review_model.get_pool = lambda: FakePool(self.conn)
+
+    def teardown_method(self):
+        review_model.get_pool = self._original
+
+    def test_batch_updates_aggregates_once(self):
+        """Test a queued batch is one INSERT, one aggregate update per product and one version bump"""
+        reviews = [{'user_id': 1, 'wine_id': 3, 'rating': 5},
+                   {'user_id': 2, 'wine_id': 3, 'rating': 3},
+                   {'user_id': 3, 'coffee_id': 8, 'rating': 4}]
+        assert ReviewModel.create_reviews(reviews) == [None, None, None]
+        sql = [statement for statement, _ in self.conn.statements]
+        inserts = [statement for statement in sql if statement.startswith('INSERT INTO reviews')]
+        assert len(inserts) == 1 and inserts[0].count('(%s, %s, %s, %s, %s, %s)') == 3
+        assert [params for statement, params in self.conn.statements
+                if 'SET rating_sum' in statement] == [(4, 1, 0, 0, 0, 1, 0, 8), (8, 2, 0, 0, 1, 0, 1, 3)]
+        assert sum('catalog_versions' in statement for statement in sql) == 1
+        # Same lock order as the single-review writes: reviews, catalog_versions, products
+        bump = next(i for i, statement in enumerate(sql) if 'catalog_versions' in statement)
+        assert sql.index(inserts[0]) < bump < min(i for i, statement in enumerate(sql) if 'SET rating_sum' in statement)
+        assert sql[-1] == 'SET @skip_catalog_version = NULL'
+        assert self.conn.committed_after == len(sql) - 1
+
+    def test_retried_batch_skips_written_reviews(self):
+        """Test reviews whose tracking id is already in reviews are reported
+        written but neither inserted again nor counted in the aggregates"""
+        self.conn.written = ['a' * 32]
+        reviews = [{'user_id': 1, 'wine_id': 3, 'rating': 5, 'tracking_id': 'a' * 32},
+                   {'user_id': 2, 'wine_id': 3, 'rating': 3, 'tracking_id': 'b' * 32}]
+        assert ReviewModel.create_reviews(reviews) == [None, None]
+        lookup = self.conn.statements[1]
+        assert 'WHERE tracking_id IN (%s, %s) FOR UPDATE' in lookup[0]
+        assert lookup[1] == ['a' * 32, 'b' * 32]
+        inserts = [(statement, params) for statement, params in self.conn.statements
+                   if statement.startswith('INSERT INTO reviews')]
+        assert len(inserts) == 1
+        assert inserts[0][0].endswith('ON DUPLICATE KEY UPDATE tracking_id = tracking_id')
+        assert inserts[0][1] == [2, 3, None, 3, None, 'b' * 32]
+        assert [params for statement, params in self.conn.statements
+                if 'SET rating_sum' in statement] == [(3, 1, 0, 0, 1, 0, 0, 3)]
+
+    def test_fully_written_batch_changes_nothing(self):
+        self.conn.written = ['a' * 32]
+        assert ReviewModel.create_reviews([{'user_id': 1, 'wine_id': 3, 'rating': 5,
+                                            'tracking_id': 'a' * 32}]) == [None]
+        sql = [statement for statement, _ in self.conn.statements]
+        assert not any(statement.startswith(('INSERT', 'UPDATE')) for statement in sql)
+
+    def test_failure_after_commit_is_not_raised(self):
+        """Test a committed batch is never reported as failed (the queue
+        would write it again), and its connection is not reused"""
+        execute = FakeCursor.execute
+        def failing_execute(cursor, sql, params=None):
+            if sql == 'SET @skip_catalog_version = NULL':
+                raise RuntimeError('connection lost')
+            execute(cursor, sql, params)
+        FakeCursor.execute = failing_execute
+        try:
+            assert ReviewModel.create_reviews([{'user_id': 1, 'wine_id': 3, 'rating': 5}]) == [None]
+        finally:
+            FakeCursor.execute = execute
+        assert self.conn.committed_after is not None
+        assert self.conn.discarded
+
+class TestReviewFeeds:
+    def setup_method(self):
+        self.conn = FakeConnection()
+        self._original = review_model.get_db_connection
+        review_model.get_db_connection = lambda readonly=False: self.conn
+
+    def teardown_method(self):
+        review_model.get_db_connection = self._original
+
+    def test_feed_follows_index_order(self):
+        """Test feeds sort by (created_at, id) and bind LIMIT as a parameter"""
+        ReviewModel.get_reviews_by_wine(3, 10)
+        sql, params = self.conn.statements[0]
+        assert sql.endswith('WHERE r.wine_id = %s ORDER BY r.created_at DESC, r.id DESC LIMIT %s')
+        assert params == [3, 10]
+
+    def test_feed_after_cursor(self):
+        """Test a cursor continues strictly after the previous page's last review"""
+        ReviewModel.get_reviews_by_user(5, 21, None, ['2024-05-01 18:30:05', 77])
+        sql, params = self.conn.statements[0]
+        assert 'AND (r.created_at < %s OR (r.created_at = %s AND r.id < %s))' in sql
+        assert params == [5, '2024-05-01 18:30:05', '2024-05-01 18:30:05', 77, 21]
+
+class TestRatingValidation:
+    def setup_method(self):
+        app = Flask(__name__)
+        app.register_blueprint(review_bp, url_prefix='/api/reviews')
+        self.client = app.test_client()
+
+    def test_create_rejects_non_integer_rating(self):
+        """Test fractional, boolean and string ratings are refused before any write"""
+        for rating in (4.5, True, '5'):
+            response = self.client.post('/api/reviews/', json={'user_id': 1, 'wine_id': 3, 'rating': rating})
+            assert response.status_code == 400
+            assert response.get_json() == {'error': 'Rating must be an integer'}
+
+    def test_update_rejects_non_integer_rating(self):
+        response = self.client.put('/api/reviews/7', json={'rating': 3.5})
+        assert response.status_code == 400
+        assert response.get_json() == {'error': 'Rating must be an integer'}
+
+if __name__ == '__main__':
+    pytest.main([__file__])
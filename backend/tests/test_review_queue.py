@@ -0,0 +1,98 @@
+import pytest
+import sys
+import os
+import shutil
+import tempfile
+
+# Add the parent directory to the path so we can import our modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from models.review_model import ReviewModel
+from models.review_queue_model import ReviewQueueModel
+from utils.review_queue import ReviewQueue
+
+class TestReviewQueue:
+    def setup_method(self):
+        self.dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.dir, 'review_queue.sqlite3')
+        self.queue = ReviewQueue(self.path)
+
+    def teardown_method(self):
+        self.queue.close()
+        shutil.rmtree(self.dir)
+
+    def test_fifo_claim_and_finish(self):
+        """Test reviews are claimed oldest first, once, and finish as written/failed"""
+        first = self.queue.put({'user_id': 1, 'wine_id': 3, 'rating': 5})
+        second = self.queue.put({'user_id': 2, 'wine_id': 3, 'rating': 4})
+        batch = self.queue.take(10)
+        assert [review['user_id'] for _, review in batch] == [1, 2]
+        assert self.queue.take(10) == []
+        assert self.queue.status(first)['status'] == 'writing'
+        self.queue.finish([(batch[0][0], None), (batch[1][0], 'Cannot add or update a child row')])
+        assert self.queue.status(first)['status'] == 'written'
+        assert self.queue.status(second)['error'] == 'Cannot add or update a child row'
+        assert self.queue.pending() == 0
+        assert self.queue.status('unknown') is None
+
+    def test_survives_restart(self):
+        """Test queued and claimed-but-unwritten reviews are delivered after reopening"""
+        tracking_id = self.queue.put({'user_id': 1, 'coffee_id': 8, 'rating': 3})
+        self.queue.take(10)
+        self.queue.close()
+        self.queue = ReviewQueue(self.path)
+        assert self.queue.requeue_claimed() == 1
+        assert [review for _, review in self.queue.take(10)] == [{'user_id': 1, 'coffee_id': 8, 'rating': 3,
+                                                                 'tracking_id': tracking_id}]
+        assert self.queue.status(tracking_id)['status'] == 'writing'
+
+    def test_purge_keeps_recent_and_pending(self):
+        self.queue.put({'user_id': 1, 'wine_id': 3, 'rating': 5})
+        self.queue.put({'user_id': 2, 'wine_id': 3, 'rating': 4})
+        seq, _ = self.queue.take(1)[0]
+        self.queue.finish([(seq, None)])
+        assert self.queue.purge(3600) == 0
+        assert self.queue.purge(-1) == 1
+        assert self.queue.pending() == 1
+
+class TestReviewQueueDrain:
+    def setup_method(self):
+        self.dir = tempfile.mkdtemp()
+        ReviewQueueModel._queue = ReviewQueue(os.path.join(self.dir, 'review_queue.sqlite3'))
+        self._original = ReviewModel.create_reviews
+        self.batches = []
+
+    def teardown_method(self):
+        ReviewModel.create_reviews = self._original
+        ReviewQueueModel._queue.close()
+        ReviewQueueModel._queue = None
+        shutil.rmtree(self.dir)
+
+    def test_drain_writes_one_batch(self):
+        """Test a drain writes queued reviews with one create_reviews call"""
+        def create_reviews(reviews):
+            self.batches.append(reviews)
+            return [None, 'Coffee not found']
+        ReviewModel.create_reviews = staticmethod(create_reviews)
+        written = ReviewQueueModel.enqueue({'user_id': 1, 'wine_id': 3, 'rating': 5, 'extra': 'dropped'})
+        failed = ReviewQueueModel.enqueue({'user_id': 1, 'coffee_id': 99, 'rating': 4})
+        assert ReviewQueueModel.drain(10) == 2
+        assert len(self.batches) == 1
+        assert self.batches[0][0] == {'user_id': 1, 'wine_id': 3, 'coffee_id': None, 'rating': 5, 'comment': None,
+                                      'tracking_id': written}
+        assert ReviewQueueModel.status(written)['status'] == 'written'
+        assert ReviewQueueModel.status(failed)['status'] == 'failed'
+        assert ReviewQueueModel.drain(10) == 0
+
+    def test_failed_batch_is_retried(self):
+        """Test a batch whose transaction failed goes back on the queue"""
+        def create_reviews(reviews):
+            raise RuntimeError('MySQL unavailable')
+        ReviewModel.create_reviews = staticmethod(create_reviews)
+        tracking_id = ReviewQueueModel.enqueue({'user_id': 1, 'wine_id': 3, 'rating': 5})
+        with pytest.raises(RuntimeError):
+            ReviewQueueModel.drain(10)
+        assert ReviewQueueModel.status(tracking_id)['status'] == 'queued'
+
+if __name__ == '__main__':
+    pytest.main([__file__])
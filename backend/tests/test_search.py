@@ -0,0 +1,39 @@
+import pytest
+import sys
+import os
+
+# Add the parent directory to the path so we can import our modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from models.search_model import SearchModel
+from models.wine_model import WineModel
+
+class TestSearchModel:
+    def setup_method(self):
+        """Setup test data"""
+        self.test_wine_data = {
+            'name': 'Zanzibarolo Riserva',
+            'type': 'red',
+            'region': 'Langhe',
+            'country': 'Italy',
+            'vintage': 2016,
+            'price': 61.00
+        }
+    
+    def test_search_finds_wine_by_name(self):
+        """Test FULLTEXT search ranks a wine by a word in its name"""
+        wine_id = WineModel.create_wine(self.test_wine_data)
+        try:
+            results = SearchModel.search_products('Zanzibarolo', kinds=('wine',))
+            assert any(r['kind'] == 'wine' and r['id'] == wine_id for r in results)
+            assert all(r['score'] > 0 for r in results)
+        finally:
+            WineModel.delete_wine(wine_id)
+    
+    def test_search_page_size(self):
+        """Test one extra row at most is fetched for the next cursor"""
+        results = SearchModel.search_products('wine', page_size=2)
+        assert len(results) <= 3
+
+if __name__ == '__main__':
+    pytest.main([__file__])
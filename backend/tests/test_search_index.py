@@ -0,0 +1,78 @@
+import pytest
+import sys
+import os
+import random
+
+# Add the parent directory to the path so we can import our modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.catalog_snapshot import CatalogSnapshot
+from utils.search_index import CatalogSearchIndex, InvertedIndex, tokenize
+
+WORDS = ['chablis', 'reserve', 'grand', 'cru', 'estate', 'old', 'vine', 'rouge', 'blanc', 'brut']
+
+class TestInvertedIndex:
+    def setup_method(self):
+        """Setup an index over random products with lots of tied scores"""
+        rng = random.Random(3)
+        self.index = InvertedIndex({'name': 2})
+        self.index.rebuild((i, {
+            'name': ' '.join(rng.choice(WORDS) for _ in range(rng.randint(1, 3))),
+            'region': rng.choice(['Napa Valley', 'Burgundy', 'Sonoma', None]),
+            'country': rng.choice(['France', 'USA']),
+        }) for i in range(1, 1501))
+
+    def brute_force(self, query, limit, after=None):
+        terms = [(t, self.index._idf(len(self.index._postings[t])))
+                 for t in dict.fromkeys(tokenize(query)) if t in self.index._postings]
+        scored = []
+        for key, doc in self.index._doc_of.items():
+            score = self.index._score(self.index._tokens[doc], terms)
+            if score > 0 and (after is None or (-score, key) > (-after[0], after[1])):
+                scored.append((key, score))
+        scored.sort(key=lambda r: (-r[1], r[0]))
+        return scored[:limit]
+
+    def test_tokenize(self):
+        """Test tokens are lowercased and accent-folded"""
+        assert tokenize('Château Rosé, Côtes-du-Rhône') == ['chateau', 'rose', 'cotes', 'du', 'rhone']
+
+    def test_matches_exhaustive_ranking(self):
+        """Test early-terminated results equal a full BM25 ranking, ties by key"""
+        for query in ['chablis', 'valley', 'france reserve', 'grand cru napa', 'usa brut']:
+            for limit in (1, 10, 60):
+                assert self.index.search(query, limit) == self.brute_force(query, limit)
+
+    def test_pagination(self):
+        """Test after=(score, key) resumes exactly where the last page ended"""
+        first = self.index.search('burgundy old vine', 25)
+        second = self.index.search('burgundy old vine', 25, after=(first[-1][1], first[-1][0]))
+        assert first + second == self.brute_force('burgundy old vine', 50)
+
+    def test_incremental_updates(self):
+        """Test add() replaces documents and remove() drops them"""
+        self.index.add(7, {'name': 'Zinfandel Reserve', 'region': 'Lodi', 'country': 'USA'})
+        self.index.remove(8)
+        assert self.index.search('zinfandel')[0][0] == 7
+        assert 8 not in [key for key, _ in self.index.search('france usa', 2000)]
+        assert self.index.search('reserve usa', 40) == self.brute_force('reserve usa', 40)
+
+    def test_vectorized_path_agrees(self):
+        """Test the NumPy fallback returns the same ranking as the threshold algorithm"""
+        pytest.importorskip('numpy')
+        expected = self.index.search('grand cru burgundy', 30)
+        self.index.TA_BUDGET = 0
+        assert self.index.search('grand cru burgundy', 30) == expected
+
+    def test_follows_catalog_snapshot(self):
+        """Test a CatalogSearchIndex is built and patched through its snapshot"""
+        snapshot = CatalogSnapshot('wines', indexed=('type',))
+        index = CatalogSearchIndex(snapshot, ('name', 'region', 'country'))
+        snapshot._install(1, [{'id': 1, 'name': 'Petit Chablis', 'type': 'White', 'region': 'Chablis', 'country': 'France'}])
+        assert index.search('chablis')[0][0] == 1
+        snapshot.upsert({'id': 2, 'name': 'Chablis Premier Cru', 'type': 'White', 'region': 'Chablis', 'country': 'France'})
+        snapshot.delete(1)
+        assert [key for key, _ in index.search('chablis')] == [2]
+
+if __name__ == '__main__':
+    pytest.main([__file__])
@@ -0,0 +1,141 @@
+import pytest
+import sys
+import os
+import json
+from decimal import Decimal
+
+# Add the parent directory to the path so we can import our modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from flask import Flask
+import db.connection as connection
+from db.connection import stream_query
+from db.pool import ConnectionPool
+from db.replicas import ReplicaRouter
+from routes.demo_routes import demo_bp
+from utils.streaming import ndjson_response, json_list_response, stream_response
+
+class TestStreamingResponses:
+    def setup_method(self):
+        """Setup an app and a lazily generated row source"""
+        self.app = Flask(__name__)
+        self.produced = 0
+
+    def rows(self, count):
+        for i in range(count):
+            self.produced += 1
+            yield {'id': i, 'name': f'Wine {i}', 'price': Decimal('12.50')}
+
+    def test_json_list_matches_buffered_shape(self):
+        """Test the chunked JSON body parses to {'wines': [...], 'count': n}"""
+        with self.app.test_request_context():
+            response = json_list_response(self.rows(1203), 'wines')
+            body = b''.join(response.iter_encoded())
+        data = json.loads(body)
+        assert data['count'] == 1203
+        assert len(data['wines']) == 1203
+        assert data['wines'][5]['price'] == '12.50'
+
+    def test_empty_json_list(self):
+        """Test an empty result still produces valid JSON"""
+        with self.app.test_request_context():
+            body = b''.join(json_list_response(iter([]), 'wines').iter_encoded())
+        assert json.loads(body) == {'wines': [], 'count': 0}
+
+    def test_ndjson_is_lazy(self):
+        """Test rows are pulled from the source only as the body is consumed"""
+        with self.app.test_request_context():
+            response = ndjson_response(self.rows(2000), batch_size=500)
+            first = next(response.iter_encoded())
+            assert self.produced <= 501
+            lines = first.decode().splitlines()
+        assert len(lines) == 500
+        assert json.loads(lines[0])['name'] == 'Wine 0'
+
+class FakeStreamingCursor:
+    """Unbuffered cursor over ``total`` rows that counts what was fetched"""
+    def __init__(self, conn):
+        self.conn = conn
+        self.position = 0
+        self.closed = False
+
+    def execute(self, sql, params=None):
+        self.conn.executed.append(sql)
+
+    def fetchmany(self, size):
+        end = min(self.position + size, self.conn.total)
+        chunk = [{'id': i} for i in range(self.position, end)]
+        self.position = end
+        self.conn.fetched = end
+        return chunk
+
+    def close(self):
+        self.closed = True
+
+class FakeConnection:
+    def __init__(self, total):
+        self.total = total
+        self.executed = []
+        self.fetched = 0
+        self.open = True
+
+    def cursor(self, cursor_class=None):
+        return FakeStreamingCursor(self)
+
+    def close(self):
+        self.open = False
+
+class TestStreamQuery:
+    def setup_method(self):
+        """Route stream_query to a pool of fake connections over 2500 rows"""
+        self.created = []
+        connection._pool = ConnectionPool(self.connect, min_size=0, max_size=2)
+        connection._router = ReplicaRouter([])
+        self.app = Flask(__name__)
+        self.app.register_blueprint(demo_bp, url_prefix='/api')
+
+    def teardown_method(self):
+        connection._pool = None
+        connection._router = None
+
+    def connect(self):
+        conn = FakeConnection(2500)
+        self.created.append(conn)
+        return conn
+
+    def test_rows_are_pulled_in_chunks(self):
+        """Test the query runs up front and rows are fetched as consumed"""
+        rows = stream_query("SELECT * FROM wines", chunk_size=1000)
+        conn = self.created[0]
+        assert conn.executed == ["SELECT * FROM wines"] and conn.fetched == 0
+        assert next(rows) == {'id': 0}
+        assert conn.fetched == 1000
+        assert sum(1 for _ in rows) == 2499
+        assert connection._pool.idle_count == 1
+
+    def test_abandoned_stream_discards_connection(self):
+        """Test a half-read unbuffered result is not handed back to the pool"""
+        rows = stream_query("SELECT * FROM wines", chunk_size=1000)
+        next(rows)
+        rows.close()
+        assert connection._pool.idle_count == 0
+        assert not self.created[0].open
+
+    def test_stream_response_body(self):
+        with self.app.test_request_context():
+            response = stream_response(stream_query("SELECT * FROM wines"), 'data', 'json')
+            body = b''.join(response.iter_encoded())
+        assert json.loads(body)['count'] == 2500
+
+    def test_demo_rejects_unknown_stream_format(self):
+        """Test ?stream= is validated before anything is buffered"""
+        client = self.app.test_client()
+        assert client.get('/api/queries/all-wines?stream=xml').status_code == 400
+        assert client.get('/api/queries/orders?stream=ndjson').status_code == 400
+        assert self.created == []
+        response = client.get('/api/queries/all-wines?stream=ndjson')
+        assert response.status_code == 200
+        assert len(response.get_data().splitlines()) == 2500
+
+if __name__ == '__main__':
+    pytest.main([__file__])
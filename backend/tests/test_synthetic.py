@@ -0,0 +1,67 @@
+import pytest
+import sys
+import os
+
+# Add the parent directory to the path so we can import our modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils import synthetic
+from models.wine_model import WineModel
+from models.coffee_model import CoffeeModel
+from generate_dataset import partitions, batches
+
+class TestSynthetic:
+    def setup_method(self):
+        """Set up test fixtures"""
+        self.seed = 7
+
+    def test_rows_depend_only_on_seed_and_id(self):
+        assert synthetic.wine_row(self.seed, 42) == synthetic.wine_row(self.seed, 42)
+        assert synthetic.wine_row(self.seed, 42) != synthetic.wine_row(self.seed + 1, 42)
+        assert synthetic.coffee_row(self.seed, 3)['id'] == 3
+
+    def test_products_pass_bulk_validation(self):
+        for i in range(1, 200):
+            assert WineModel._validate_bulk_row(synthetic.wine_row(self.seed, i)) is None
+            assert CoffeeModel._validate_bulk_row(synthetic.coffee_row(self.seed, i)) is None
+
+    def test_review_ids_continue_across_partitions(self):
+        """Splitting products differently gives the same reviews"""
+        whole = list(synthetic.review_rows(self.seed, 'wines', 1, 100, 1, 50, 3))
+        first = list(synthetic.review_rows(self.seed, 'wines', 1, 40, 1, 50, 3))
+        rest = list(synthetic.review_rows(self.seed, 'wines', 41, 60, len(first) + 1, 50, 3))
+        assert first + rest == whole
+        assert [r['id'] for r in whole] == list(range(1, len(whole) + 1))
+        assert all(1 <= r['rating'] <= 5 and r['coffee_id'] is None for r in whole)
+
+    def test_pairings_unique(self):
+        wines, coffees = 6, 4
+        pairs = {(p['wine_id'], p['coffee_id'])
+                 for p in (synthetic.pairing_row(self.seed, i, wines, coffees) for i in range(1, wines * coffees + 1))}
+        assert len(pairs) == wines * coffees
+
+    def test_order_total_matches_items(self):
+        for order_id in range(1, 50):
+            order, wine_items, coffee_items = synthetic.order_rows(self.seed, order_id, 10, 100, 100)
+            items = wine_items + coffee_items
+            assert items
+            assert order['total_amount'] == sum(item['subtotal'] for item in items)
+            for item in wine_items:
+                price = synthetic.wine_row(self.seed, item['wine_id'])['price']
+                assert item['subtotal'] == item['quantity'] * price
+
+    def test_partitions(self):
+        assert partitions(10, 4) == [(1, 4), (5, 4), (9, 2)]
+        assert partitions(0, 4) == []
+
+    def test_orders_batched_with_their_items(self):
+        settings = {'seed': self.seed, 'wines': 50, 'coffees': 50, 'customers': 5,
+                    'reviews_per_product': 3, 'batch_size': 3}
+        for batch in batches(settings, ('orders', 1, 10, None)):
+            order_ids = {order['id'] for order in batch['orders']}
+            assert len(order_ids) <= 3
+            for table in ('order_wines', 'order_coffees'):
+                assert all(item['order_id'] in order_ids for item in batch.get(table, []))
+
+if __name__ == '__main__':
+    pytest.main([__file__])
@@ -9,7 +9,7 @@ class Analytics:
     @staticmethod
     def get_overall_statistics():
         """Get overall statistics for the platform"""
-        conn = get_db_connection()
+        conn = get_db_connection(readonly=True)
         try:
             with conn.cursor() as cursor:
                 # Count total items
@@ -51,7 +51,7 @@ class Analytics:
     @staticmethod
     def get_popular_wine_types():
         """Get most popular wine types based on reviews"""
-        conn = get_db_connection()
+        conn = get_db_connection(readonly=True)
         try:
             with conn.cursor() as cursor:
                 sql = """SELECT w.type, COUNT(r.id) as review_count, AVG(r.rating) as avg_rating
@@ -68,7 +68,7 @@ class Analytics:
     @staticmethod
     def get_popular_coffee_types():
         """Get most popular coffee types based on reviews"""
-        conn = get_db_connection()
+        conn = get_db_connection(readonly=True)
         try:
             with conn.cursor() as cursor:
                 sql = """SELECT c.type, COUNT(r.id) as review_count, AVG(r.rating) as avg_rating
@@ -85,7 +85,7 @@ class Analytics:
     @staticmethod
     def get_popular_wine_regions():
         """Get most popular wine regions"""
-        conn = get_db_connection()
+        conn = get_db_connection(readonly=True)
         try:
             with conn.cursor() as cursor:
                 sql = """SELECT w.region, COUNT(r.id) as review_count, AVG(r.rating) as avg_rating
@@ -104,7 +104,7 @@ class Analytics:
     @staticmethod
     def get_popular_coffee_origins():
         """Get most popular coffee origins"""
-        conn = get_db_connection()
+        conn = get_db_connection(readonly=True)
         try:
             with conn.cursor() as cursor:
                 sql = """SELECT c.origin, COUNT(r.id) as review_count, AVG(r.rating) as avg_rating
@@ -123,7 +123,7 @@ class Analytics:
     @staticmethod
     def get_flavor_preferences():
         """Get popular flavor preferences"""
-        conn = get_db_connection()
+        conn = get_db_connection(readonly=True)
         try:
             with conn.cursor() as cursor:
                 # Wine flavor preferences
@@ -178,7 +178,7 @@ class Analytics:
     @staticmethod
     def get_price_analysis():
         """Get price analysis for wines and coffees"""
-        conn = get_db_connection()
+        conn = get_db_connection(readonly=True)
         try:
             with conn.cursor() as cursor:
                 # Wine price analysis
@@ -242,7 +242,7 @@ class Analytics:
     @staticmethod
     def get_user_activity_stats():
         """Get user activity statistics"""
-        conn = get_db_connection()
+        conn = get_db_connection(readonly=True)
         try:
             with conn.cursor() as cursor:
                 # Most active users
@@ -266,12 +266,17 @@ class Analytics:
                                  WHERE created_at >= DATE_SUB(NOW(), INTERVAL 30 DAY)""")
                 recent_users = cursor.fetchone()['recent_users']
                 
-                # Rating distribution
-                cursor.execute("""SELECT rating, COUNT(*) as count
-                                 FROM reviews
-                                 GROUP BY rating
-                                 ORDER BY rating""")
-                rating_distribution = cursor.fetchall()
+                # Rating distribution, from the per-product star histograms
+                # (every review counts towards exactly one wine or coffee)
+                cursor.execute("""SELECT SUM(rating_1) as rating_1, SUM(rating_2) as rating_2,
+                                         SUM(rating_3) as rating_3, SUM(rating_4) as rating_4,
+                                         SUM(rating_5) as rating_5
+                                 FROM (SELECT rating_1, rating_2, rating_3, rating_4, rating_5 FROM wines
+                                       UNION ALL
+                                       SELECT rating_1, rating_2, rating_3, rating_4, rating_5 FROM coffees) p""")
+                histogram = cursor.fetchone()
+                rating_distribution = [{'rating': star, 'count': int(histogram[f'rating_{star}'])}
+                                       for star in range(1, 6) if histogram[f'rating_{star}']]
                 
                 return {
                     'most_active_users': most_active_users,
@@ -285,7 +290,7 @@ class Analytics:
     @staticmethod
     def get_pairing_analytics():
         """Get pairing analytics"""
-        conn = get_db_connection()
+        conn = get_db_connection(readonly=True)
         try:
             with conn.cursor() as cursor:
                 # Best pairing combinations
@@ -343,7 +348,7 @@ class Analytics:
     @staticmethod
     def get_trending_items():
         """Get trending wines and coffees based on recent reviews"""
-        conn = get_db_connection()
+        conn = get_db_connection(readonly=True)
         try:
             with conn.cursor() as cursor:
                 # Trending wines (recent reviews with high ratings)
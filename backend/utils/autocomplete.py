@@ -0,0 +1,292 @@
+import heapq
+import threading
+from collections import Counter
+from utils.search_index import tokenize
+
+def _trigrams(word):
+    padded = f"  {word} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+def edit_distance(a, b, limit):
+    """Optimal string alignment distance (adjacent swaps cost 1), or limit + 1 once exceeded"""
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    previous2 = None
+    previous = list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        current = [i] + [0] * len(b)
+        for j in range(1, len(b) + 1):
+            cost = 0 if a[i - 1] == b[j - 1] else 1
+            current[j] = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + cost)
+            if (previous2 is not None and i > 1 and j > 1
+                    and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]):
+                current[j] = min(current[j], previous2[j - 2] + 1)
+        if min(current) > limit:
+            return limit + 1
+        previous2, previous = previous, current
+    return previous[-1]
+
+def allowed_edits(token):
+    """Typos tolerated for a token of this length"""
+    if len(token) <= 3:
+        return 0
+    return 1 if len(token) <= 6 else 2
+
+class _Node:
+    __slots__ = ('children', 'word', 'top')
+
+    def __init__(self):
+        self.children = {}
+        self.word = None
+        self.top = None
+
+class AutocompleteIndex:
+    """Suggestions for partially typed product names, regions and origins.
+
+    Every distinct (kind, field, text) is one suggestion, ranked by how many
+    catalog rows carry it. Words of all suggestions go into a character
+    trie whose nodes cache their best MAX_LIMIT suggestions (per kind filter), so a prefix
+    lookup is a walk down the trie plus a cached list; only the nodes on a
+    changed word's path are recomputed after a write. Tokens that match
+    nothing are corrected against the vocabulary through a trigram index
+    and an edit-distance check ("chabils" -> "chablis").
+    """
+
+    MAX_LIMIT = 20
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._root = _Node()
+        self._suggestions = {}   # id -> [kind, field, text, tokens, count]
+        self._ids = {}           # (kind, field, folded text) -> id
+        self._postings = {}      # word -> set of suggestion ids
+        self._trigrams = {}      # trigram -> set of words
+        self._next_id = 0
+
+    # -- maintenance -------------------------------------------------------
+
+    def _path(self, word, create=False):
+        node = self._root
+        path = [node]
+        for ch in word:
+            child = node.children.get(ch)
+            if child is None:
+                if not create:
+                    return None
+                child = node.children[ch] = _Node()
+            node = child
+            path.append(node)
+        return path
+
+    def _invalidate(self, word):
+        for node in self._path(word) or ():
+            node.top = None
+
+    def add(self, kind, field, text):
+        """Count one more catalog row carrying this text"""
+        tokens = tuple(tokenize(text))
+        if not tokens:
+            return
+        key = (kind, field, ' '.join(tokens))
+        with self._lock:
+            suggestion_id = self._ids.get(key)
+            if suggestion_id is None:
+                suggestion_id = self._ids[key] = self._next_id
+                self._next_id += 1
+                self._suggestions[suggestion_id] = [kind, field, text, tokens, 0]
+                for word in set(tokens):
+                    if word not in self._postings:
+                        self._postings[word] = set()
+                        self._path(word, create=True)[-1].word = word
+                        for trigram in _trigrams(word):
+                            self._trigrams.setdefault(trigram, set()).add(word)
+                    self._postings[word].add(suggestion_id)
+            self._suggestions[suggestion_id][4] += 1
+            for word in set(tokens):
+                self._invalidate(word)
+
+    def discard(self, kind, field, text):
+        """Count one fewer row carrying this text, dropping it at zero"""
+        tokens = tuple(tokenize(text))
+        key = (kind, field, ' '.join(tokens))
+        with self._lock:
+            suggestion_id = self._ids.get(key)
+            if suggestion_id is None:
+                return
+            suggestion = self._suggestions[suggestion_id]
+            suggestion[4] -= 1
+            if suggestion[4] <= 0:
+                del self._suggestions[suggestion_id]
+                del self._ids[key]
+                for word in set(tokens):
+                    self._postings[word].discard(suggestion_id)
+                    # Unused words stay in the trie with empty postings
+            for word in set(tokens):
+                self._invalidate(word)
+
+    # -- lookups -------------------------------------------------------------
+
+    def _rank(self, suggestion_id):
+        kind, field, text, tokens, count = self._suggestions[suggestion_id]
+        return (-count, ' '.join(tokens), suggestion_id)
+
+    def _top(self, node, kinds):
+        """Best MAX_LIMIT suggestions (of the given kinds) under a trie node"""
+        if node.top is None:
+            node.top = {}
+        top = node.top.get(kinds)
+        if top is None:
+            candidates = set()
+            if node.word is not None:
+                candidates.update(self._rank(i) for i in self._postings[node.word]
+                                  if kinds is None or self._suggestions[i][0] in kinds)
+            for child in node.children.values():
+                candidates.update(self._top(child, kinds))
+            top = node.top[kinds] = heapq.nsmallest(self.MAX_LIMIT, candidates)
+        return top
+
+    def _words_under(self, node, most):
+        """Vocabulary words under a trie node, or None if there are more than ``most``"""
+        words = []
+        stack = [node]
+        while stack:
+            node = stack.pop()
+            if node.word is not None:
+                words.append(node.word)
+                if len(words) > most:
+                    return None
+            stack.extend(node.children.values())
+        return words
+
+    def _complete(self, full, partial, kinds, limit):
+        """Suggestion ids containing every full token and a word starting with partial"""
+        if not full:
+            path = self._path(partial)
+            if path is None:
+                return []
+            return [i for _, _, i in self._top(path[-1], kinds)[:limit]]
+
+        postings = sorted((self._postings.get(word, set()) for word in full), key=len)
+        candidates = postings[0].intersection(*postings[1:])
+        if partial:
+            path = self._path(partial)
+            if path is None:
+                return []
+            words = self._words_under(path[-1], 16)
+            if words is not None:
+                # Few completions: intersect with their postings too
+                candidates = candidates.intersection(set().union(*(self._postings[w] for w in words)))
+            else:
+                candidates = [i for i in candidates
+                              if any(token.startswith(partial) for token in self._suggestions[i][3])]
+
+        matches = []
+        for i in candidates:
+            if kinds is not None and self._suggestions[i][0] not in kinds:
+                continue
+            matches.append(self._rank(i))
+        return [i for _, _, i in heapq.nsmallest(limit, matches)]
+
+    def _corrections(self, token, as_prefix):
+        """Vocabulary words within allowed_edits() of token, closest and most used first"""
+        edits = allowed_edits(token)
+        if edits == 0:
+            return []
+        overlap = Counter()
+        for trigram in _trigrams(token):
+            overlap.update(self._trigrams.get(trigram, ()))
+        corrections = []
+        for word, shared in overlap.most_common(200):
+            if not self._postings[word]:
+                continue
+            correction = word
+            distance = edit_distance(token, word, edits)
+            if as_prefix and len(word) > len(token):
+                # A partly typed word may be a typo of the word's beginning
+                prefix_distance = edit_distance(token, word[:len(token)], edits)
+                if prefix_distance < distance:
+                    correction, distance = word[:len(token)], prefix_distance
+            if distance <= edits:
+                corrections.append((distance, -len(self._postings[word]), correction))
+        corrections.sort()
+        return list(dict.fromkeys(correction for _, _, correction in corrections))[:3]
+
+    def suggest(self, query, limit=10, kinds=None):
+        """Up to ``limit`` suggestions for a partially typed query.
+
+        Returns (suggestions, corrected_query); corrected_query is None
+        unless a typo correction was needed to find anything.
+        """
+        limit = max(1, min(limit, self.MAX_LIMIT))
+        kinds = frozenset(kinds) if kinds is not None else None
+        tokens = tokenize(query)
+        if not tokens:
+            return [], None
+        # A trailing space means the last word is complete
+        if query[-1:].isspace():
+            full, partial = tokens, ''
+        else:
+            full, partial = tokens[:-1], tokens[-1]
+
+        with self._lock:
+            ids = self._complete(full, partial, kinds, limit)
+            corrected = None
+            if not ids:
+                variants = [(full, partial)]
+                for position, token in enumerate(full):
+                    if token not in self._postings or not self._postings[token]:
+                        fixes = self._corrections(token, as_prefix=False)
+                        variants = [(f[:position] + [fix] + f[position + 1:], p)
+                                    for f, p in variants for fix in fixes]
+                if partial and self._path(partial) is None:
+                    fixes = self._corrections(partial, as_prefix=True)
+                    variants = [(f, fix) for f, _ in variants for fix in fixes]
+                for variant_full, variant_partial in variants[:5]:
+                    if (variant_full, variant_partial) == (full, partial):
+                        continue
+                    ids = self._complete(variant_full, variant_partial, kinds, limit)
+                    if ids:
+                        corrected = ' '.join(variant_full + ([variant_partial] if variant_partial else []))
+                        break
+
+            results = []
+            for i in ids:
+                kind, field, text, tokens, count = self._suggestions[i]
+                results.append({'text': text, 'kind': kind, 'field': field, 'count': count})
+            return results, corrected
+
+class SuggestionSource:
+    """Feeds some text columns of a CatalogSnapshot into an AutocompleteIndex"""
+
+    def __init__(self, index, snapshot, kind, fields):
+        self.index = index
+        self.snapshot = snapshot
+        self.kind = kind
+        self.fields = fields
+        self._rows = {}  # row id -> {field: text} currently counted
+        snapshot.subscribe(self)
+
+    def _texts(self, row):
+        return {field: row.get(field) for field in self.fields if row.get(field)}
+
+    def _forget(self, row_id):
+        for field, text in self._rows.pop(row_id, {}).items():
+            self.index.discard(self.kind, field, text)
+
+    def reset(self, rows):
+        with self.index._lock:
+            for row_id in list(self._rows):
+                self._forget(row_id)
+            for row in rows:
+                self.upsert(row)
+
+    def upsert(self, row):
+        with self.index._lock:
+            self._forget(row['id'])
+            texts = self._rows[row['id']] = self._texts(row)
+            for field, text in texts.items():
+                self.index.add(self.kind, field, text)
+
+    def delete(self, row_id):
+        with self.index._lock:
+            self._forget(row_id)
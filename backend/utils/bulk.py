@@ -0,0 +1,103 @@
+from decimal import Decimal, InvalidOperation
+import pymysql
+from config import Config
+from db.connection import get_pool
+
+def validate_row(row, required=(), enums=None, integers=(), decimals=()):
+    """First problem with one bulk row, or None if it can be written"""
+    if not isinstance(row, dict):
+        return 'Row must be an object'
+    for field in required:
+        if row.get(field) in (None, ''):
+            return f'Missing required field: {field}'
+    for field, allowed in (enums or {}).items():
+        if row.get(field) is not None and row[field] not in allowed:
+            return f"{field} must be one of: {', '.join(allowed)}"
+    for field in integers:
+        value = row.get(field)
+        if value is not None and (isinstance(value, bool) or not isinstance(value, int)):
+            return f'{field} must be an integer'
+    for field in decimals:
+        value = row.get(field)
+        if value is None:
+            continue
+        try:
+            if isinstance(value, bool):
+                raise InvalidOperation
+            Decimal(str(value))
+        except InvalidOperation:
+            return f'{field} must be a number'
+    return None
+
+def upsert_sql(table, columns, count):
+    """Multi-row INSERT ... ON DUPLICATE KEY UPDATE for ``count`` rows"""
+    row = '(' + ', '.join(['%s'] * len(columns)) + ')'
+    updates = ', '.join(f"{column} = VALUES({column})" for column in columns if column != 'id')
+    return (f"INSERT INTO {table} ({', '.join(columns)}) VALUES {', '.join([row] * count)} "
+            f"ON DUPLICATE KEY UPDATE {updates}")
+
+def write_chunk(cursor, table, columns, chunk, errors):
+    """Upsert (index, values) pairs with one statement, replaying them one by
+    one if it fails; appends failures to ``errors`` and returns rows written.
+    The caller commits."""
+    try:
+        cursor.execute(upsert_sql(table, columns, len(chunk)),
+                       [value for _, values in chunk for value in values])
+        return len(chunk)
+    except pymysql.MySQLError:
+        written = 0
+        for index, values in chunk:
+            try:
+                cursor.execute(upsert_sql(table, columns, 1), values)
+                written += 1
+            except pymysql.MySQLError as e:
+                errors.append({'index': index, 'error': str(e)})
+        return written
+
+def bulk_upsert(table, columns, rows, validate, chunk_size=None, after_chunk=None):
+    """Insert or update many rows with one multi-row statement per chunk.
+
+    Rows with an id that exists are updated, the rest are inserted. Each
+    chunk is its own transaction on a connection borrowed outside the
+    request scope, so a large load commits as it goes instead of holding
+    one huge transaction. If a chunk's statement fails it is replayed row by
+    row in the same transaction: MySQL only undoes the failing statement, so
+    the good rows still commit together and each bad one is reported.
+
+    Returns a summary with per-row errors as {'index', 'error'}, where index
+    is the row's position in ``rows``.
+    """
+    chunk_size = max(1, chunk_size or Config.BULK_CHUNK_SIZE)
+    errors = []
+    valid = []
+    for index, row in enumerate(rows):
+        error = validate(row)
+        if error:
+            errors.append({'index': index, 'error': error})
+        else:
+            valid.append((index, [row.get(column) for column in columns]))
+
+    written = chunks = 0
+    conn = get_pool().get_connection()
+    try:
+        with conn.cursor() as cursor:
+            for start in range(0, len(valid), chunk_size):
+                written += write_chunk(cursor, table, columns, valid[start:start + chunk_size], errors)
+                conn.commit()
+                chunks += 1
+                if after_chunk:
+                    after_chunk()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
+
+    errors.sort(key=lambda error: error['index'])
+    return {
+        'received': len(rows),
+        'written': written,
+        'failed': len(errors),
+        'chunks': chunks,
+        'errors': errors
+    }
@@ -0,0 +1,387 @@
+import threading
+import time
+from bisect import bisect_right
+from decimal import Decimal, InvalidOperation
+from flask import g, has_app_context
+from config import Config
+from db.connection import get_pool, on_commit
+from models.catalog_version_model import CatalogVersionModel
+from utils.columnar import ColumnarCatalog
+from utils.facets import count_rows, format_facets
+
+def _fold(value):
+    """Compare strings the way MySQL's case-insensitive collation does (roughly)"""
+    return value.casefold() if isinstance(value, str) else value
+
+def _number(value):
+    if isinstance(value, (int, float, Decimal)):
+        return Decimal(str(value))
+    return Decimal(str(value).strip())
+
+class CatalogSnapshot:
+    """In-memory copy of one catalog table, indexed by id and lookup columns.
+
+    Reads are answered from memory. Writes made through the models are
+    patched in once their transaction commits (see sync()); writes made
+    anywhere else (populate scripts, other processes) are caught by checking
+    the table's catalog_versions counter at most every
+    CATALOG_SNAPSHOT_MAX_STALENESS seconds and reloading whenever it moved by
+    more than this process's own writes account for. A version read for an
+    ETag (see require_version()) makes the next read catch up immediately,
+    so a body is never older than the validators it is sent with.
+    """
+
+    def __init__(self, table, indexed, numeric=(), categorical=(), columns=None):
+        self.table = table
+        # Columns to copy (all when None); columns that change without a
+        # catalog version bump, like the rating aggregates, must be left out
+        self._select = ', '.join(columns) if columns else '*'
+        self.indexed = indexed
+        self.numeric = numeric
+        self.categorical = categorical
+        self._rows = {}
+        self._indexes = {column: {} for column in indexed}
+        self._ordered = None
+        self._columnar = None
+        self._listeners = []
+        self._version = None
+        self._own_writes = 0
+        self._checked_at = 0.0
+        self._failed_at = None
+        self._required = 0
+        self._lock = threading.RLock()
+        self._refresh_lock = threading.Lock()
+        CatalogVersionModel.watch(table, self.require_version)
+
+    @property
+    def loaded(self):
+        return self._version is not None
+
+    # -- loading and freshness -------------------------------------------
+
+    def _fetch(self):
+        """Read the version counter and every row in one consistent snapshot"""
+        conn = get_pool().get_connection()
+        try:
+            with conn.cursor() as cursor:
+                cursor.execute("START TRANSACTION WITH CONSISTENT SNAPSHOT")
+                cursor.execute("SELECT version FROM catalog_versions WHERE table_name = %s",
+                               (self.table,))
+                row = cursor.fetchone()
+                if row is None:
+                    raise LookupError(f"No catalog_versions row for {self.table}")
+                cursor.execute(f"SELECT {self._select} FROM {self.table}")
+                rows = cursor.fetchall()
+            conn.commit()
+            return row['version'], rows
+        finally:
+            conn.close()
+
+    def _read_version(self):
+        conn = get_pool().get_connection()
+        try:
+            with conn.cursor() as cursor:
+                cursor.execute("SELECT version FROM catalog_versions WHERE table_name = %s",
+                               (self.table,))
+                row = cursor.fetchone()
+            conn.commit()
+            return row['version'] if row else None
+        finally:
+            conn.close()
+
+    def _install(self, version, rows):
+        with self._lock:
+            self._rows = {}
+            self._indexes = {column: {} for column in self.indexed}
+            for row in rows:
+                self._add(row)
+            self._ordered = None
+            self._columnar = None
+            self._version = version
+            self._own_writes = 0
+            self._checked_at = time.monotonic()
+            for listener in self._listeners:
+                listener.reset(rows)
+
+    def _refresh(self):
+        if self.loaded:
+            version = self._read_version()
+            with self._lock:
+                if version == self._version + self._own_writes:
+                    self._version, self._own_writes = version, 0
+                    self._checked_at = time.monotonic()
+                    return
+        self._install(*self._fetch())
+
+    def require_version(self, version):
+        """Note a version of the table about to label a response (an ETag)"""
+        with self._lock:
+            self._required = max(self._required, version)
+
+    def _behind(self):
+        """True if a response may be labelled newer than the snapshot's data"""
+        with self._lock:
+            return self.loaded and self._required > self._version + self._own_writes
+
+    def ready(self):
+        """Make sure the snapshot is within its staleness bound.
+
+        Returns False when the snapshot is disabled or cannot be loaded, in
+        which case callers query MySQL directly.
+        """
+        if not Config.CATALOG_SNAPSHOT_ENABLED:
+            return False
+        now = time.monotonic()
+        behind = self._behind()
+        if self.loaded and not behind and now - self._checked_at < Config.CATALOG_SNAPSHOT_MAX_STALENESS:
+            return True
+        if self._failed_at is not None and now - self._failed_at < Config.CATALOG_SNAPSHOT_MAX_STALENESS:
+            # Don't retry a failing load on every read
+            return False
+
+        if self.loaded and not behind:
+            # Only one thread checks; the rest keep serving the current copy
+            if not self._refresh_lock.acquire(blocking=False):
+                return True
+        else:
+            self._refresh_lock.acquire()
+        try:
+            if self._behind() or not (self.loaded and time.monotonic() - self._checked_at < Config.CATALOG_SNAPSHOT_MAX_STALENESS):
+                self._refresh()
+            self._failed_at = None
+            return True
+        except Exception as e:
+            print(f"Catalog snapshot refresh failed for {self.table}: {e}")
+            self._failed_at = time.monotonic()
+            return False
+        finally:
+            self._refresh_lock.release()
+
+    def subscribe(self, listener):
+        """Keep a derived structure in step with the snapshot.
+
+        ``listener`` gets reset(rows) on every (re)load and upsert(row) /
+        delete(row_id) for each patched write, under the snapshot lock.
+        """
+        with self._lock:
+            self._listeners.append(listener)
+            if self.loaded:
+                listener.reset(list(self._rows.values()))
+
+    # -- write-through patching ------------------------------------------
+
+    def _add(self, row):
+        self._rows[row['id']] = row
+        for column, index in self._indexes.items():
+            index.setdefault(row.get(column), set()).add(row['id'])
+
+    def _remove(self, row_id):
+        row = self._rows.pop(row_id, None)
+        if row is None:
+            return
+        for column, index in self._indexes.items():
+            ids = index.get(row.get(column))
+            if ids is not None:
+                ids.discard(row_id)
+                if not ids:
+                    del index[row.get(column)]
+
+    def upsert(self, row):
+        with self._lock:
+            if not self.loaded:
+                return
+            self._remove(row['id'])
+            self._add(row)
+            self._ordered = None
+            self._columnar = None
+            self._own_writes += 1
+            for listener in self._listeners:
+                listener.upsert(row)
+
+    def delete(self, row_id):
+        with self._lock:
+            if not self.loaded:
+                return
+            self._remove(row_id)
+            self._ordered = None
+            self._columnar = None
+            self._own_writes += 1
+            for listener in self._listeners:
+                listener.delete(row_id)
+
+    def invalidate(self):
+        """Check the version counter on the next read, e.g. after a bulk write
+        that is cheaper to pick up with one reload than row by row"""
+        with self._lock:
+            self._checked_at = 0.0
+
+    def _pending(self):
+        """This request's written-but-uncommitted rows, {id: row or None once
+        deleted}, or None outside a request that has written"""
+        if not has_app_context() or g.get('_db_conn') is None:
+            return None
+        return g.setdefault('_snapshot_pending', {}).setdefault(self.table, {})
+
+    def sync(self, cursor, row_id):
+        """Patch the snapshot with row_id's current state once the write commits.
+
+        Called by the models after a write, on the same connection, so the
+        row read back is the one about to be committed (None once deleted).
+        Until the request commits, get() serves that row to the request
+        itself, so a route can read back what it just wrote.
+        """
+        pending = self._pending()
+        if not self.loaded and pending is None:
+            return
+        cursor.execute(f"SELECT {self._select} FROM {self.table} WHERE id = %s", (row_id,))
+        row = cursor.fetchone()
+        if pending is not None:
+            pending[row_id] = row
+        if row is None:
+            on_commit(lambda: self.delete(row_id))
+        else:
+            on_commit(lambda: self.upsert(row))
+
+    # -- reads -------------------------------------------------------------
+
+    @staticmethod
+    def _project(row, fields):
+        if fields:
+            return {field: row.get(field) for field in fields}
+        return dict(row)
+
+    def _sorted(self):
+        """Rows in ORDER BY name, id order, rebuilt lazily after writes"""
+        with self._lock:
+            if self._ordered is None:
+                self._ordered = sorted(self._rows.values(),
+                                       key=lambda r: (_fold(r.get('name')) or '', r['id']))
+            return self._ordered
+
+    def _columns(self):
+        """Column arrays for vectorised filtering (None without NumPy)"""
+        if not ColumnarCatalog.available():
+            return None
+        with self._lock:
+            if self._columnar is None:
+                self._columnar = ColumnarCatalog(self._sorted(), self.numeric, self.categorical)
+            return self._columnar
+
+    def get(self, row_id, fields=None):
+        pending = self._pending()
+        if pending and row_id in pending:
+            row = pending[row_id]
+        else:
+            row = self._rows.get(row_id)
+        return self._project(row, fields) if row is not None else None
+
+    def all(self, fields=None):
+        return [self._project(row, fields) for row in self._sorted()]
+
+    def distinct(self, column):
+        """Sorted distinct non-NULL values of an indexed column"""
+        with self._lock:
+            values = [value for value in self._indexes[column] if value is not None]
+        return sorted(values, key=_fold)
+
+    def _ids_equal(self, column, values):
+        wanted = {_fold(v) for v in values}
+        if column in self._indexes:
+            ids = set()
+            for value, value_ids in self._indexes[column].items():
+                if _fold(value) in wanted:
+                    ids |= value_ids
+            return ids
+        return {row_id for row_id, row in self._rows.items() if _fold(row.get(column)) in wanted}
+
+    def _ids_containing(self, column, text):
+        text = _fold(text)
+        if column in self._indexes:
+            ids = set()
+            for value, value_ids in self._indexes[column].items():
+                if isinstance(value, str) and text in _fold(value):
+                    ids |= value_ids
+            return ids
+        return {row_id for row_id, row in self._rows.items()
+                if isinstance(row.get(column), str) and text in _fold(row[column])}
+
+    def search(self, equals=None, contains=None, ranges=None, fields=None):
+        """Rows matching every condition, in ORDER BY name, id order.
+
+        ``equals`` maps a column to a value (or list of values), ``contains``
+        to a substring (SQL LIKE '%x%') and ``ranges`` to an inclusive
+        (low, high) pair where either end may be None. Returns None when a
+        condition cannot be evaluated in memory exactly as MySQL would (e.g.
+        a non-numeric range bound) so the caller can fall back to SQL.
+        """
+        columnar = self._columns()
+        if columnar is not None:
+            rows = columnar.search(equals, contains, ranges)
+            if rows is not None:
+                return [self._project(row, fields) for row in rows]
+
+        bounds = {}
+        for column, (low, high) in (ranges or {}).items():
+            if low is None and high is None:
+                continue
+            try:
+                bounds[column] = (None if low is None else _number(low),
+                                  None if high is None else _number(high))
+            except (InvalidOperation, ValueError):
+                return None
+
+        with self._lock:
+            candidates = None
+            for column, value in (equals or {}).items():
+                values = value if isinstance(value, (list, tuple, set)) else [value]
+                ids = self._ids_equal(column, values)
+                candidates = ids if candidates is None else candidates & ids
+            for column, text in (contains or {}).items():
+                ids = self._ids_containing(column, text)
+                candidates = ids if candidates is None else candidates & ids
+            ordered = self._sorted()
+
+        results = []
+        for row in ordered:
+            if candidates is not None and row['id'] not in candidates:
+                continue
+            matched = True
+            for column, (low, high) in bounds.items():
+                value = row.get(column)
+                if value is None or (low is not None and value < low) or (high is not None and value > high):
+                    matched = False
+                    break
+            if matched:
+                results.append(self._project(row, fields))
+        return results
+
+    def facet_search(self, equals=None, contains=None, ranges=None, facets=(), buckets=None,
+                     after=None, limit=None, fields=None):
+        """One page of search() results plus facet counts over every match.
+
+        ``facets`` are columns to count values of and ``buckets`` maps numeric
+        columns to bucket edges (see utils/facets.py). The page holds up to
+        ``limit`` rows after the (name, id) ``after`` cursor. Returns
+        (rows, facets), or None when search() would fall back to SQL.
+        """
+        buckets = buckets or {}
+        columnar = self._columns()
+        mask = None
+        if columnar is not None and set(facets) <= set(columnar.categorical) \
+                and set(buckets) <= set(columnar.numeric):
+            mask = columnar.mask(equals, contains, ranges)
+        if mask is not None:
+            matched = columnar.select(mask)
+            counts = format_facets(*columnar.facets(mask, facets, buckets), buckets)
+        else:
+            matched = self.search(equals, contains, ranges)
+            if matched is None:
+                return None
+            counts = count_rows(matched, facets, buckets)
+
+        start = 0
+        if after:
+            start = bisect_right(matched, (_fold(after[0]) or '', after[1]),
+                                 key=lambda r: (_fold(r.get('name')) or '', r['id']))
+        end = len(matched) if limit is None else start + limit
+        return [self._project(row, fields) for row in matched[start:end]], counts
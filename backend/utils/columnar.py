@@ -0,0 +1,114 @@
+from decimal import Decimal, InvalidOperation
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - optional speedup
+    np = None
+
+def _fold(value):
+    return value.casefold() if isinstance(value, str) else value
+
+class ColumnarCatalog:
+    """Column arrays over a catalog snapshot so filters become boolean masks.
+
+    Numeric columns are float64 arrays (NaN for NULL); categorical columns
+    are dictionary-encoded into int32 codes (-1 for NULL), so an equality or
+    LIKE filter is resolved once against the small dictionary and then
+    applied to every row with a single np.isin(). Rows are kept in the
+    snapshot's ORDER BY name, id order so results need no re-sorting.
+    """
+
+    def __init__(self, rows, numeric, categorical):
+        self.rows = rows
+        self.numeric = {}
+        self.categorical = {}
+
+        for column in numeric:
+            values = [row.get(column) for row in rows]
+            self.numeric[column] = np.array(
+                [np.nan if v is None else float(v) for v in values], dtype=np.float64)
+
+        for column in categorical:
+            dictionary = {}
+            codes = np.empty(len(rows), dtype=np.int32)
+            for i, row in enumerate(rows):
+                value = row.get(column)
+                codes[i] = -1 if value is None else dictionary.setdefault(value, len(dictionary))
+            self.categorical[column] = (codes, list(dictionary))
+
+    @staticmethod
+    def available():
+        return np is not None
+
+    def _match_codes(self, column, predicate):
+        codes, dictionary = self.categorical[column]
+        wanted = [code for code, value in enumerate(dictionary) if predicate(value)]
+        return np.isin(codes, wanted)
+
+    def mask(self, equals=None, contains=None, ranges=None):
+        """Boolean row mask for the filters, or None if one can't be vectorised"""
+        mask = np.ones(len(self.rows), dtype=bool)
+
+        for column, value in (equals or {}).items():
+            values = value if isinstance(value, (list, tuple, set)) else [value]
+            if column in self.categorical:
+                wanted = {_fold(v) for v in values}
+                mask &= self._match_codes(column, lambda v: _fold(v) in wanted)
+            elif column in self.numeric:
+                try:
+                    numbers = [float(Decimal(str(v).strip())) for v in values]
+                except (InvalidOperation, ValueError):
+                    return None
+                mask &= np.isin(self.numeric[column], numbers)
+            else:
+                return None
+
+        for column, text in (contains or {}).items():
+            if column not in self.categorical:
+                return None
+            text = _fold(text)
+            mask &= self._match_codes(column, lambda v: isinstance(v, str) and text in _fold(v))
+
+        for column, (low, high) in (ranges or {}).items():
+            if column not in self.numeric:
+                return None
+            values = self.numeric[column]
+            try:
+                if low is not None:
+                    mask &= values >= float(Decimal(str(low).strip()))
+                if high is not None:
+                    mask &= values <= float(Decimal(str(high).strip()))
+            except (InvalidOperation, ValueError):
+                return None
+
+        # NaN (NULL) compares False against any bound, as in SQL
+        return mask
+
+    def facets(self, mask, columns, buckets):
+        """Per-value counts of categorical columns and per-bucket counts of
+        numeric ones over the masked rows, each a single np.bincount"""
+        value_counts = {}
+        for column in columns:
+            codes, dictionary = self.categorical[column]
+            codes = codes[mask]
+            counts = np.bincount(codes[codes >= 0], minlength=len(dictionary))
+            value_counts[column] = {dictionary[code]: int(count)
+                                    for code, count in enumerate(counts) if count}
+        bucket_counts = {}
+        for column, edges in buckets.items():
+            values = self.numeric[column][mask]
+            values = values[~np.isnan(values)]
+            counts = np.bincount(np.searchsorted(edges, values, side='right'), minlength=len(edges) + 1)
+            bucket_counts[column] = {index: int(count) for index, count in enumerate(counts) if count}
+        return value_counts, bucket_counts
+
+    def search(self, equals=None, contains=None, ranges=None):
+        """Matching rows in catalog order, or None to fall back to a slower path"""
+        mask = self.mask(equals, contains, ranges)
+        if mask is None:
+            return None
+        return self.select(mask)
+
+    def select(self, mask):
+        """Rows where mask is set, in catalog order"""
+        return [self.rows[i] for i in np.flatnonzero(mask)]
@@ -0,0 +1,115 @@
+import gzip
+import zlib
+from collections import OrderedDict
+from threading import Lock
+from flask import request
+
+COMPRESSIBLE_TYPES = ('application/json', 'application/x-ndjson', 'text/html',
+                      'text/plain', 'text/css', 'application/javascript')
+
+def _gzip(data, level):
+    return gzip.compress(data, compresslevel=level, mtime=0)
+
+def _deflate(data, level):
+    return zlib.compress(data, level)
+
+# In order of preference when the client weighs them equally
+ENCODERS = OrderedDict([('gzip', _gzip), ('deflate', _deflate)])
+
+class CompressionCache:
+    """LRU of compressed bodies bounded by their total size in bytes"""
+
+    def __init__(self, max_bytes):
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._size = 0
+        self._lock = Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        with self._lock:
+            body = self._entries.get(key)
+            if body is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return body
+
+    def put(self, key, body):
+        if len(body) > self.max_bytes:
+            return
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._size -= len(old)
+            self._entries[key] = body
+            self._size += len(body)
+            while self._size > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._size -= len(evicted)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+
+def choose_encoding(accept_encodings):
+    """Pick the best supported encoding from an Accept-Encoding header"""
+    best, best_quality = None, 0
+    for encoding in ENCODERS:
+        quality = accept_encodings.quality(encoding)
+        if quality > best_quality:
+            best, best_quality = encoding, quality
+    return best
+
+def _should_compress(response, min_size):
+    if response.status_code != 200 or request.method == 'HEAD':
+        return False
+    if response.direct_passthrough or response.is_streamed:
+        return False
+    if 'Content-Encoding' in response.headers:
+        return False
+    if response.mimetype not in COMPRESSIBLE_TYPES:
+        return False
+    return response.content_length is not None and response.content_length >= min_size
+
+def init_app(app):
+    """Compress responses according to Accept-Encoding for every blueprint.
+
+    Bodies smaller than COMPRESS_MIN_SIZE are sent as-is. Responses carrying
+    an ETag are stable for that validator, so their compressed body is kept
+    in a cache keyed by (path, ETag, encoding) and reused until the catalog
+    version behind the ETag moves on.
+    """
+    min_size = app.config.get('COMPRESS_MIN_SIZE', 1024)
+    level = app.config.get('COMPRESS_LEVEL', 6)
+    cache = CompressionCache(app.config.get('COMPRESS_CACHE_MAX_BYTES', 32 * 1024 * 1024))
+    app.extensions['compression_cache'] = cache
+
+    @app.after_request
+    def compress_response(response):
+        if response.mimetype in COMPRESSIBLE_TYPES:
+            response.vary.add('Accept-Encoding')
+        if not _should_compress(response, min_size):
+            return response
+
+        encoding = choose_encoding(request.accept_encodings)
+        if encoding is None:
+            return response
+
+        etag, weak = response.get_etag()
+        key = (request.full_path, etag, encoding) if etag else None
+        body = cache.get(key) if key else None
+        if body is None:
+            body = ENCODERS[encoding](response.get_data(), level)
+            if key:
+                cache.put(key, body)
+
+        response.set_data(body)
+        response.headers['Content-Encoding'] = encoding
+        if etag and not weak:
+            # A strong validator must differ between representations
+            response.set_etag(f"{etag}-{encoding}")
+        return response
@@ -0,0 +1,90 @@
+from bisect import bisect_right
+from collections import Counter
+
+# Bucket edges for numeric facets. A value v falls in bucket
+# bisect_right(edges, v), the same index MySQL's INTERVAL(v, e0, e1, ...)
+# returns, so the in-memory and SQL paths agree on every boundary.
+PRICE_EDGES = (10, 20, 30, 50, 100, 200)
+VINTAGE_EDGES = (1970, 1980, 1990, 2000, 2010, 2020)
+
+def bucket_label(edges, index):
+    """Label of bucket ``index``: '<10', '10-20', ..., '200+' (lower bound inclusive)"""
+    if index == 0:
+        return f"<{edges[0]}"
+    if index == len(edges):
+        return f"{edges[-1]}+"
+    return f"{edges[index - 1]}-{edges[index]}"
+
+def _bucket_entry(edges, index, count):
+    return {
+        'value': bucket_label(edges, index),
+        'min': edges[index - 1] if index > 0 else None,
+        'max': edges[index] if index < len(edges) else None,
+        'count': count
+    }
+
+def format_facets(value_counts, bucket_counts, buckets):
+    """Shape raw counts for the API.
+
+    ``value_counts`` maps a column to {value: count} and is listed most
+    common first; ``bucket_counts`` maps a column to {bucket index: count}
+    and is listed in bucket order. Empty values and buckets are left out.
+    """
+    facets = {}
+    for column, counts in value_counts.items():
+        facets[column] = [{'value': value, 'count': count}
+                          for value, count in sorted(counts.items(), key=lambda vc: (-vc[1], str(vc[0])))
+                          if count]
+    for column, counts in bucket_counts.items():
+        edges = buckets[column]
+        facets[column] = [_bucket_entry(edges, index, counts[index])
+                          for index in sorted(counts) if counts[index]]
+    return facets
+
+def count_rows(rows, columns, buckets):
+    """Facet counts over rows in one pass (pure Python path)"""
+    value_counts = {column: Counter() for column in columns}
+    bucket_counts = {column: Counter() for column in buckets}
+    for row in rows:
+        for column in columns:
+            value = row.get(column)
+            if value is not None:
+                value_counts[column][value] += 1
+        for column, edges in buckets.items():
+            value = row.get(column)
+            if value is not None:
+                bucket_counts[column][bisect_right(edges, value)] += 1
+    return format_facets(value_counts, bucket_counts, buckets)
+
+def facet_sql(table, columns, buckets, where):
+    """One GROUP BY query returning a count per combination of facet values.
+
+    Summing its rows per column (count_grouped) gives every facet at once,
+    with a single scan of the filtered rows instead of one query per facet.
+    Returns (sql, params) where params are the bucket edges; the caller
+    appends the parameters of ``where``.
+    """
+    select = list(columns)
+    params = []
+    for column, edges in buckets.items():
+        select.append(f"INTERVAL({column}, {', '.join(['%s'] * len(edges))}) AS {column}_bucket")
+        params.extend(edges)
+    group_by = ', '.join(str(i) for i in range(1, len(select) + 1))
+    sql = (f"SELECT {', '.join(select)}, COUNT(*) AS facet_count FROM {table} "
+           f"WHERE 1=1{where} GROUP BY {group_by}")
+    return sql, params
+
+def count_grouped(grouped, columns, buckets):
+    """Fold facet_sql() rows into per-facet counts"""
+    value_counts = {column: Counter() for column in columns}
+    bucket_counts = {column: Counter() for column in buckets}
+    for row in grouped:
+        count = row['facet_count']
+        for column in columns:
+            if row[column] is not None:
+                value_counts[column][row[column]] += count
+        for column in buckets:
+            index = row[f"{column}_bucket"]
+            if index is not None and index >= 0:  # INTERVAL(NULL, ...) is -1
+                bucket_counts[column][index] += count
+    return format_facets(value_counts, bucket_counts, buckets)
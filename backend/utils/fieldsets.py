@@ -0,0 +1,35 @@
+class InvalidFields(ValueError):
+    """Raised when ?fields= names a column that is not exposed"""
+
+def parse_fields(value, allowed, required=('id',)):
+    """Parse a comma-separated ?fields= value against a whitelist.
+
+    Returns None when no fields were requested (select everything), otherwise
+    the requested field names in order with the ``required`` ones (the id and
+    any pagination sort keys) added in front if missing.
+    """
+    if not value:
+        return None
+
+    fields = [f.strip() for f in value.split(',') if f.strip()]
+    unknown = [f for f in fields if f not in allowed]
+    if unknown:
+        raise InvalidFields(f"Unknown fields: {', '.join(unknown)}. "
+                            f"Allowed: {', '.join(allowed)}")
+
+    for field in reversed(required):
+        if field not in fields:
+            fields.insert(0, field)
+    return list(dict.fromkeys(fields))
+
+def select_list(fields, columns):
+    """Build a SELECT list for whitelisted fields.
+
+    ``columns`` maps each public field name to its SQL expression, so only
+    names that passed parse_fields() are ever interpolated into SQL.
+    """
+    parts = []
+    for field in fields:
+        expression = columns[field]
+        parts.append(expression if expression == field else f"{expression} AS {field}")
+    return ', '.join(parts)
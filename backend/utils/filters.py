@@ -0,0 +1,48 @@
+import math
+from config import Config
+
+class InvalidIds(ValueError):
+    """Raised when a multi-get id list is malformed or too long"""
+
+class InvalidFilter(ValueError):
+    """Raised when a numeric search filter (?min_price=, ...) is not a number"""
+
+def parse_values(value):
+    """Split a comma-separated query parameter ("white,rose") into its values"""
+    return [v.strip() for v in value.split(',') if v.strip()]
+
+def parse_number(value, name, kind=float):
+    """Parse a numeric query parameter as ``kind`` (float or int)"""
+    try:
+        number = kind(value)
+    except ValueError as e:
+        raise InvalidFilter(f"{name} must be {'an integer' if kind is int else 'a number'}") from e
+    if not math.isfinite(number):
+        raise InvalidFilter(f'{name} must be a number')
+    return number
+
+def equals_sql(column, value):
+    """WHERE condition for one value or, given a list, any of its values.
+
+    Returns (sql, params): " AND column = %s" or " AND column IN (%s, ...)"
+    so a list binds one placeholder per value instead of a single = %s.
+    """
+    values = list(value) if isinstance(value, (list, tuple, set)) else [value]
+    if len(values) == 1:
+        return f" AND {column} = %s", values
+    return f" AND {column} IN ({', '.join(['%s'] * len(values))})", values
+
+def parse_ids(value, limit=None):
+    """Ids for a multi-get from "1,2,3" or a JSON list, de-duplicated in order"""
+    limit = limit or Config.MAX_BATCH_SIZE
+    if isinstance(value, str):
+        value = parse_values(value)
+    if not isinstance(value, list) or not value or any(isinstance(v, (bool, float)) for v in value):
+        raise InvalidIds('ids must be a non-empty list of integers')
+    try:
+        ids = list(dict.fromkeys(int(v) for v in value))
+    except (TypeError, ValueError) as e:
+        raise InvalidIds('ids must be a non-empty list of integers') from e
+    if len(ids) > limit:
+        raise InvalidIds(f'At most {limit} ids per request')
+    return ids
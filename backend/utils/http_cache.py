@@ -0,0 +1,52 @@
+from functools import wraps
+from flask import make_response, request
+from models.catalog_version_model import CatalogVersionModel
+
+def _validators(tables):
+    """Build the (etag, last_modified) pair for the current table versions"""
+    versions = CatalogVersionModel.get_versions(tables)
+    if any(table not in versions for table in tables):
+        return None, None
+    etag = '-'.join(f"{table}.{versions[table]['version']}" for table in tables)
+    last_modified = max(versions[table]['updated_at'] for table in tables)
+    return etag, last_modified
+
+def _not_modified(etag, last_modified):
+    if request.if_none_match:
+        return request.if_none_match.contains_weak(etag)
+    if request.if_modified_since and last_modified:
+        return last_modified.replace(microsecond=0) <= request.if_modified_since.replace(tzinfo=None)
+    return False
+
+def conditional(*tables):
+    """Answer GETs with ETag/Last-Modified derived from catalog_versions.
+
+    The response depends only on the listed tables, so when the client's
+    If-None-Match / If-Modified-Since still matches their versions a 304 is
+    returned without running the view (and its query) at all. Caching is
+    best-effort: if the versions cannot be read the view runs normally.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            try:
+                etag, last_modified = _validators(tables)
+            except Exception as e:
+                print(f"Catalog version lookup failed: {e}")
+                etag = last_modified = None
+
+            if etag and _not_modified(etag, last_modified):
+                response = make_response('', 304)
+            else:
+                response = make_response(view(*args, **kwargs))
+                if not etag or response.status_code != 200:
+                    return response
+
+            # Weak: the body is only semantically equivalent across encodings
+            response.set_etag(etag, weak=True)
+            if last_modified:
+                response.last_modified = last_modified
+            response.cache_control.no_cache = True
+            return response
+        return wrapper
+    return decorator
@@ -0,0 +1,135 @@
+import threading
+from bisect import bisect_left, insort
+
+def bayesian_score(rating_sum, rating_count, prior_mean, prior_weight):
+    """Average rating after adding ``prior_weight`` reviews at ``prior_mean``.
+
+    Few reviews pull a product towards the mean; many let its own average
+    through, so 4.8 from 200 reviews outranks 5.0 from one.
+    """
+    return (prior_mean * prior_weight + rating_sum) / (prior_weight + rating_count)
+
+class Leaderboard:
+    """Rated products of one kind ranked by Bayesian score, overall and per type.
+
+    Each board is a list of (-score, -review count, id) keys kept sorted, so
+    the top N is a slice and a rating change is a bisect, a delete and an
+    insert. The prior mean is fixed when the board is loaded (it drifts
+    slowly) and applies to every score until the next load.
+    """
+
+    def __init__(self, prior_weight):
+        self.prior_weight = prior_weight
+        self.prior_mean = 0.0
+        self._lock = threading.RLock()
+        self._products = {}  # id -> [type, rating_sum, rating_count]
+        self._boards = {None: []}
+
+    def _key(self, product_id, rating_sum, rating_count):
+        score = bayesian_score(rating_sum, rating_count, self.prior_mean, self.prior_weight)
+        return (-score, -rating_count, product_id)
+
+    def _boards_of(self, product_type):
+        yield self._boards[None]
+        if product_type is not None:
+            yield self._boards.setdefault(product_type, [])
+
+    def _unrank(self, product_id):
+        product_type, rating_sum, rating_count = self._products[product_id]
+        if rating_count <= 0:
+            return
+        key = self._key(product_id, rating_sum, rating_count)
+        for board in self._boards_of(product_type):
+            i = bisect_left(board, key)
+            if i < len(board) and board[i] == key:
+                del board[i]
+
+    def _rank(self, product_id):
+        product_type, rating_sum, rating_count = self._products[product_id]
+        if rating_count <= 0:
+            return
+        key = self._key(product_id, rating_sum, rating_count)
+        for board in self._boards_of(product_type):
+            insort(board, key)
+
+    def load(self, rows):
+        """Rebuild from rows with id, type, rating_sum and rating_count"""
+        with self._lock:
+            self._products = {row['id']: [row.get('type'), int(row['rating_sum']), int(row['rating_count'])]
+                              for row in rows}
+            total = sum(product[1] for product in self._products.values())
+            count = sum(product[2] for product in self._products.values())
+            self.prior_mean = total / count if count else 0.0
+            keyed = {None: []}
+            for product_id, (product_type, rating_sum, rating_count) in self._products.items():
+                if rating_count > 0:
+                    key = self._key(product_id, rating_sum, rating_count)
+                    keyed[None].append(key)
+                    if product_type is not None:
+                        keyed.setdefault(product_type, []).append(key)
+            for board in keyed.values():
+                board.sort()
+            self._boards = keyed
+
+    def apply(self, product_id, rating_sum, rating_count, product_type=None):
+        """Add a rating delta (as ReviewModel applies to the product row);
+        ``product_type`` is used if the product is not known yet"""
+        with self._lock:
+            if product_id not in self._products:
+                self._products[product_id] = [product_type, 0, 0]
+            self._unrank(product_id)
+            product = self._products[product_id]
+            product[1] += rating_sum
+            product[2] += rating_count
+            self._rank(product_id)
+
+    def set_type(self, product_id, product_type):
+        with self._lock:
+            product = self._products.get(product_id)
+            if product is None:
+                self._products[product_id] = [product_type, 0, 0]
+            elif product[0] != product_type:
+                self._unrank(product_id)
+                product[0] = product_type
+                self._rank(product_id)
+
+    def remove(self, product_id):
+        with self._lock:
+            if product_id in self._products:
+                self._unrank(product_id)
+                del self._products[product_id]
+
+    def product_ids(self):
+        with self._lock:
+            return set(self._products)
+
+    def top(self, limit, product_type=None):
+        """[(id, score, average rating, review count)] best first"""
+        with self._lock:
+            board = self._boards.get(product_type, [])
+            results = []
+            for negative_score, negative_count, product_id in board[:max(0, limit)]:
+                rating_sum = self._products[product_id][1]
+                results.append((product_id, -negative_score, rating_sum / -negative_count, -negative_count))
+            return results
+
+class LeaderboardSource:
+    """Keeps a Leaderboard's product types in step with a CatalogSnapshot"""
+
+    def __init__(self, leaderboard, snapshot):
+        self.leaderboard = leaderboard
+        snapshot.subscribe(self)
+
+    def reset(self, rows):
+        current = set()
+        for row in rows:
+            current.add(row['id'])
+            self.leaderboard.set_type(row['id'], row.get('type'))
+        for product_id in self.leaderboard.product_ids() - current:
+            self.leaderboard.remove(product_id)
+
+    def upsert(self, row):
+        self.leaderboard.set_type(row['id'], row.get('type'))
+
+    def delete(self, row_id):
+        self.leaderboard.remove(row_id)
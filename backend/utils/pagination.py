@@ -0,0 +1,66 @@
+import base64
+import json
+from datetime import datetime
+from decimal import Decimal
+from config import Config
+from utils.fieldsets import parse_fields
+
+class InvalidCursor(ValueError):
+    """Raised when a pagination cursor cannot be decoded"""
+
+def encode_cursor(values):
+    """Encode the sort-key values of the last row on a page as an opaque token"""
+    payload = json.dumps([str(v) if isinstance(v, (Decimal, datetime)) else v for v in values],
+                         separators=(',', ':'))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip('=')
+
+def decode_cursor(token, length):
+    """Decode a token produced by encode_cursor back into its sort-key values"""
+    try:
+        padded = token + '=' * (-len(token) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except (ValueError, TypeError) as e:
+        raise InvalidCursor('Invalid cursor') from e
+    if not isinstance(values, list) or len(values) != length:
+        raise InvalidCursor('Invalid cursor')
+    return values
+
+def get_page_size(args):
+    """Read ?page_size=, defaulting to DEFAULT_PAGE_SIZE and capped at MAX_PAGE_SIZE"""
+    page_size = args.get('page_size', Config.DEFAULT_PAGE_SIZE, type=int)
+    return max(1, min(page_size, Config.MAX_PAGE_SIZE))
+
+def is_paginated(args):
+    """Pagination is opt-in so existing clients keep getting full lists"""
+    return 'cursor' in args or 'page_size' in args
+
+def paginate(rows, page_size, sort_key):
+    """Trim a page fetched with page_size + 1 rows and build its next cursor.
+
+    Returns (rows, next_cursor); next_cursor is None on the last page.
+    """
+    if len(rows) <= page_size:
+        return rows, None
+    rows = rows[:page_size]
+    return rows, encode_cursor(sort_key(rows[-1]))
+
+def review_feed(args, columns, fetch):
+    """Response body for a review feed route: {'reviews', 'count'}, plus
+    'next_cursor' when paginated.
+
+    ``fetch(limit, fields, after=None)`` is a ReviewModel feed query bound to
+    its user or product, ``columns`` the feed's column map for ?fields=.
+    ?page_size= and/or ?cursor= switch to keyset pagination over
+    (created_at, id), newest first; otherwise ?limit= caps the full list.
+    Raises InvalidCursor or InvalidFields for bad query parameters.
+    """
+    paginated = is_paginated(args)
+    fields = parse_fields(args.get('fields'), tuple(columns), ('id', 'created_at') if paginated else ('id',))
+    if paginated:
+        page_size = get_page_size(args)
+        after = decode_cursor(args['cursor'], 2) if args.get('cursor') else None
+        reviews, next_cursor = paginate(fetch(page_size + 1, fields, after), page_size,
+                                        lambda r: (r['created_at'], r['id']))
+        return {'reviews': reviews, 'count': len(reviews), 'next_cursor': next_cursor}
+    reviews = fetch(args.get('limit', type=int), fields)
+    return {'reviews': reviews, 'count': len(reviews)}
@@ -0,0 +1,101 @@
+import json
+import sqlite3
+import threading
+import time
+import uuid
+
+class ReviewQueue:
+    """Durable FIFO of accepted reviews in a local SQLite file.
+
+    Entries move queued -> writing (claimed by take()) -> written or failed.
+    The file is opened in WAL mode with synchronous=FULL, so a review is on
+    disk before its 202 is sent. Delivery to MySQL is at least once: entries
+    a crashed worker had claimed are queued again by requeue_claimed(), and
+    take() hands out each review with its tracking id so the writer can
+    recognise one it already wrote.
+    """
+
+    def __init__(self, path):
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=FULL")
+        self._conn.execute("""CREATE TABLE IF NOT EXISTS queued_reviews (
+                                  seq INTEGER PRIMARY KEY AUTOINCREMENT,
+                                  tracking_id TEXT NOT NULL UNIQUE,
+                                  payload TEXT NOT NULL,
+                                  status TEXT NOT NULL DEFAULT 'queued',
+                                  error TEXT,
+                                  queued_at REAL NOT NULL,
+                                  finished_at REAL)""")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_queued_reviews_status ON queued_reviews(status, seq)")
+
+    def put(self, review):
+        """Queue one review (a JSON-serialisable dict) and return its tracking id"""
+        tracking_id = uuid.uuid4().hex
+        with self._lock:
+            self._conn.execute("INSERT INTO queued_reviews (tracking_id, payload, queued_at) VALUES (?, ?, ?)",
+                               (tracking_id, json.dumps(review), time.time()))
+        return tracking_id
+
+    def take(self, limit):
+        """Claim up to ``limit`` of the oldest queued reviews as [(seq, review)],
+        each review including its tracking_id"""
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                rows = self._conn.execute("""SELECT seq, tracking_id, payload FROM queued_reviews
+                                             WHERE status = 'queued' ORDER BY seq LIMIT ?""",
+                                          (limit,)).fetchall()
+                self._conn.executemany("UPDATE queued_reviews SET status = 'writing' WHERE seq = ?",
+                                       [(row['seq'],) for row in rows])
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+        return [(row['seq'], {**json.loads(row['payload']), 'tracking_id': row['tracking_id']}) for row in rows]
+
+    def finish(self, results):
+        """Record [(seq, error or None)] for claimed entries"""
+        now = time.time()
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            self._conn.executemany("""UPDATE queued_reviews
+                                      SET status = ?, error = ?, finished_at = ? WHERE seq = ?""",
+                                   [('failed' if error else 'written', error, now, seq) for seq, error in results])
+            self._conn.execute("COMMIT")
+
+    def release(self, seqs):
+        """Return claimed entries to the queue (their write did not happen)"""
+        with self._lock:
+            self._conn.executemany("UPDATE queued_reviews SET status = 'queued' WHERE seq = ? AND status = 'writing'",
+                                   [(seq,) for seq in seqs])
+
+    def requeue_claimed(self):
+        """Queue again every claimed entry; call before starting the one worker"""
+        with self._lock:
+            return self._conn.execute("UPDATE queued_reviews SET status = 'queued' WHERE status = 'writing'").rowcount
+
+    def status(self, tracking_id):
+        with self._lock:
+            row = self._conn.execute("""SELECT tracking_id, status, error, queued_at, finished_at
+                                        FROM queued_reviews WHERE tracking_id = ?""", (tracking_id,)).fetchone()
+        return dict(row) if row else None
+
+    def pending(self):
+        """Number of reviews not yet written or failed"""
+        with self._lock:
+            return self._conn.execute("""SELECT COUNT(*) FROM queued_reviews
+                                         WHERE status IN ('queued', 'writing')""").fetchone()[0]
+
+    def purge(self, older_than):
+        """Drop written/failed entries finished more than ``older_than`` seconds ago"""
+        with self._lock:
+            return self._conn.execute("""DELETE FROM queued_reviews
+                                         WHERE status IN ('written', 'failed') AND finished_at < ?""",
+                                      (time.time() - older_than,)).rowcount
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
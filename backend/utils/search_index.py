@@ -0,0 +1,324 @@
+import heapq
+import math
+import re
+import threading
+import unicodedata
+from array import array
+from bisect import bisect_left, bisect_right
+from collections import Counter
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - optional speedup
+    np = None
+
+_TOKEN = re.compile(r'[a-z0-9]+')
+
+def tokenize(text):
+    """Lowercase, accent-folded alphanumeric tokens ("Rosé" -> ["rose"])"""
+    if not text:
+        return []
+    text = str(text)
+    if not text.isascii():
+        text = unicodedata.normalize('NFKD', text)
+        text = ''.join(ch for ch in text if not unicodedata.combining(ch))
+    return _TOKEN.findall(text.lower())
+
+def _f32(value):
+    """Round a float the way it will be stored in an array('f')"""
+    return array('f', (value,))[0]
+
+class _Postings:
+    """One term's postings, ordered by impact (highest first), then by key.
+
+    Doc numbers and negated impacts live in parallel typed arrays (4 bytes
+    each per posting) rather than lists of tuples; negating keeps the impact
+    array ascending so postings can be placed with bisect.
+    """
+    __slots__ = ('docs', 'neg_impacts')
+
+    def __init__(self, docs=None, neg_impacts=None):
+        self.docs = docs if docs is not None else array('I')
+        self.neg_impacts = neg_impacts if neg_impacts is not None else array('f')
+
+    def add(self, doc, neg_impact, key, keys):
+        # Among equal impacts, postings stay in key order
+        lo = bisect_left(self.neg_impacts, neg_impact)
+        hi = bisect_right(self.neg_impacts, neg_impact, lo)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if keys[self.docs[mid]] < key:
+                lo = mid + 1
+            else:
+                hi = mid
+        self.docs.insert(lo, doc)
+        self.neg_impacts.insert(lo, neg_impact)
+
+    def __len__(self):
+        return len(self.docs)
+
+class InvertedIndex:
+    """In-memory BM25 index over small multi-field documents.
+
+    Each posting stores the BM25 term-frequency component ("impact") of a
+    term in a document, computed with the average document length frozen at
+    the last rebuild, so a query's score is just sum(idf * impact). Postings
+    are ordered by impact and then key, the same order results are returned
+    in, which lets search() use the threshold algorithm: lists are read from
+    the top and reading stops as soon as no unread document can rank above
+    the current last result, usually after a few dozen postings per term
+    even for very common terms.
+
+    Updates append a new document number and tombstone the old one; the
+    index is rebuilt once tombstones make up more than a quarter of it.
+    Keys must be mutually comparable (e.g. row ids).
+    """
+
+    K1 = 1.2
+    B = 0.75
+    # Documents the threshold algorithm may visit before switching to NumPy
+    TA_BUDGET = 1024
+
+    def __init__(self, field_weights):
+        self.field_weights = field_weights
+        self._lock = threading.RLock()
+        self._clear()
+
+    def _clear(self):
+        self._postings = {}
+        self._keys = []      # doc number -> key (kept for tombstones too)
+        self._tokens = []    # doc number -> tokens, or None once deleted
+        self._doc_of = {}    # key -> live doc number
+        self._dead = []      # tombstoned doc numbers
+        self._arrays = None  # (keys, dead) as NumPy arrays, built on demand
+        self._impacts = {}
+        self._avgdl = None
+
+    def __len__(self):
+        return len(self._doc_of)
+
+    def _tokenize(self, fields):
+        tokens = []
+        for field, text in fields.items():
+            tokens.extend(tokenize(text) * self.field_weights.get(field, 1))
+        return tuple(tokens)
+
+    def _impact(self, tf, length):
+        """BM25 term-frequency component, rounded to its stored float32 value.
+
+        Scores are sums of exactly these values, so the threshold computed
+        from the postings and a document's random-access score agree bit for
+        bit, and the NumPy path adds up the very same numbers.
+        """
+        impact = self._impacts.get((tf, length))
+        if impact is None:
+            norm = self.K1 * (1 - self.B + self.B * length / self._avgdl)
+            impact = self._impacts[(tf, length)] = _f32(tf * (self.K1 + 1) / (tf + norm))
+        return impact
+
+    def _idf(self, df):
+        return math.log(1 + (len(self._doc_of) - df + 0.5) / (df + 0.5))
+
+    def _build(self, documents):
+        """Index (key, tokens) pairs from scratch with one sort per term"""
+        self._clear()
+        documents = sorted(documents, key=lambda d: d[0])
+        if not documents:
+            return
+        self._avgdl = max(sum(len(tokens) for _, tokens in documents) / len(documents), 1)
+
+        entries = {}
+        for doc, (key, tokens) in enumerate(documents):
+            self._keys.append(key)
+            self._tokens.append(tokens)
+            self._doc_of[key] = doc
+            length = len(tokens)
+            for term, tf in Counter(tokens).items():
+                entries.setdefault(term, []).append((-self._impact(tf, length), doc))
+
+        for term, postings in entries.items():
+            # Doc numbers follow key order, so this sorts by (impact desc, key)
+            postings.sort()
+            self._postings[term] = _Postings(array('I', [doc for _, doc in postings]),
+                                             array('f', [neg for neg, _ in postings]))
+
+    def _insert(self, key, tokens):
+        doc = len(self._keys)
+        self._keys.append(key)
+        self._tokens.append(tokens)
+        self._doc_of[key] = doc
+        self._arrays = None
+        if self._avgdl is None:
+            self._avgdl = max(len(tokens), 1)
+        for term, tf in Counter(tokens).items():
+            postings = self._postings.get(term)
+            if postings is None:
+                postings = self._postings[term] = _Postings()
+            postings.add(doc, -self._impact(tf, len(tokens)), key, self._keys)
+
+    def _delete(self, key):
+        doc = self._doc_of.pop(key, None)
+        if doc is not None:
+            self._tokens[doc] = None
+            self._dead.append(doc)
+            self._arrays = None
+
+    def rebuild(self, documents):
+        """Replace the index contents with (key, fields) pairs"""
+        documents = [(key, self._tokenize(fields)) for key, fields in documents]
+        with self._lock:
+            self._build(documents)
+
+    def add(self, key, fields):
+        """Index a document, replacing any previous version with the same key"""
+        tokens = self._tokenize(fields)
+        with self._lock:
+            self._delete(key)
+            self._insert(key, tokens)
+            if len(self._keys) > 64 and len(self._doc_of) < len(self._keys) * 0.75:
+                self._build([(k, self._tokens[doc]) for k, doc in self._doc_of.items()])
+
+    def remove(self, key):
+        with self._lock:
+            self._delete(key)
+
+    def _score(self, tokens, terms):
+        score = 0.0
+        length = len(tokens)
+        for term, idf in terms:
+            tf = tokens.count(term)
+            if tf:
+                score += idf * self._impact(tf, length)
+        return score
+
+    def search(self, query, limit=10, accept=None, after=None):
+        """Top ``limit`` (key, score) pairs for a query, best first.
+
+        Results are ordered by (score DESC, key). ``accept`` optionally
+        filters keys, and ``after`` = (score, key) resumes after a previous
+        page's last result.
+        """
+        with self._lock:
+            terms = [(term, self._idf(len(self._postings[term])))
+                     for term in dict.fromkeys(tokenize(query)) if term in self._postings]
+            if not terms or limit <= 0:
+                return []
+            lists = [(self._postings[term], idf) for term, idf in terms]
+            depth = [0] * len(lists)
+            keys = self._keys
+            seen = set()
+            heap = []  # the best ``limit`` so far, worst on top
+            boundary = (-after[0], after[1]) if after else None
+
+            step = 16
+            while True:
+                threshold = 0.0
+                frontier_key = None
+                for i, (postings, idf) in enumerate(lists):
+                    start = depth[i]
+                    end = min(start + step, len(postings))
+                    for position in range(start, end):
+                        doc = postings.docs[position]
+                        if doc in seen:
+                            continue
+                        seen.add(doc)
+                        tokens = self._tokens[doc]
+                        if tokens is None:
+                            continue
+                        key = keys[doc]
+                        if accept is not None and not accept(key):
+                            continue
+                        score = self._score(tokens, terms)
+                        if boundary is not None and (-score, key) <= boundary:
+                            continue
+                        item = (score, _Reversed(key))
+                        if len(heap) < limit:
+                            heapq.heappush(heap, item)
+                        elif item > heap[0]:
+                            heapq.heapreplace(heap, item)
+                    depth[i] = end
+                    if end < len(postings):
+                        threshold += idf * -postings.neg_impacts[end]
+                        key = keys[postings.docs[end]]
+                        frontier_key = key if frontier_key is None else max(frontier_key, key)
+
+                if frontier_key is None:
+                    break  # every list read to the end
+                if len(heap) == limit:
+                    # An unread document scores at most the threshold, and can
+                    # only reach it with a key at or past every list's frontier
+                    worst_score, worst = heap[0]
+                    if worst_score > threshold or (worst_score == threshold and worst.key < frontier_key):
+                        break
+                if len(seen) > self.TA_BUDGET and accept is None and self._vectorizable():
+                    # Deep read (several common terms): score every posting at once
+                    return self._search_all(lists, limit, after)
+                step *= 2
+
+            return [(ranked.key, score) for score, ranked in sorted(heap, reverse=True)]
+
+    def _vectorizable(self):
+        return np is not None and all(isinstance(key, int) for key in self._keys[:1])
+
+    def _search_all(self, lists, limit, after):
+        """Exhaustive scoring of every posting with NumPy, same results as search()"""
+        if self._arrays is None:
+            self._arrays = (np.array(self._keys, dtype=np.int64), np.array(self._dead, dtype=np.int64))
+        keys, dead = self._arrays
+
+        docs = np.concatenate([np.frombuffer(postings.docs, dtype=np.uint32) for postings, _ in lists])
+        weights = np.concatenate([np.frombuffer(postings.neg_impacts, dtype=np.float32).astype(np.float64) * -idf
+                                  for postings, idf in lists])
+        scores = np.bincount(docs, weights=weights, minlength=len(keys))
+        scores[dead] = 0.0
+        if after:
+            scores[(scores > after[0]) | ((scores == after[0]) & (keys <= after[1]))] = 0.0
+
+        matched = np.flatnonzero(scores > 0)
+        if len(matched) > limit:
+            kth = np.partition(scores[matched], len(matched) - limit)[len(matched) - limit]
+            matched = matched[scores[matched] >= kth]
+        order = np.lexsort((keys[matched], -scores[matched]))[:limit]
+        return [(int(keys[doc]), float(scores[doc])) for doc in matched[order]]
+
+class CatalogSearchIndex(InvertedIndex):
+    """InvertedIndex over some text columns of a CatalogSnapshot, keyed by row id.
+
+    It subscribes to the snapshot, so it is built when the snapshot loads
+    and patched by the same write-through path as the snapshot itself.
+    Names are weighted double.
+    """
+
+    def __init__(self, snapshot, fields, field_weights=None):
+        super().__init__(field_weights or {'name': 2})
+        self.snapshot = snapshot
+        self.fields = fields
+        snapshot.subscribe(self)
+
+    def _fields(self, row):
+        return {field: row.get(field) for field in self.fields}
+
+    def reset(self, rows):
+        self.rebuild((row['id'], self._fields(row)) for row in rows)
+
+    def upsert(self, row):
+        self.add(row['id'], self._fields(row))
+
+    def delete(self, row_id):
+        self.remove(row_id)
+
+class _Reversed:
+    """Orders keys descending so that, among equal scores, the heap evicts the largest key"""
+    __slots__ = ('key',)
+
+    def __init__(self, key):
+        self.key = key
+
+    def __lt__(self, other):
+        return self.key > other.key
+
+    def __gt__(self, other):
+        return self.key < other.key
+
+    def __eq__(self, other):
+        return self.key == other.key
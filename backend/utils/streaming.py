@@ -0,0 +1,42 @@
+from flask import Response, current_app, stream_with_context
+
+STREAM_FORMATS = ('ndjson', 'json')
+
+def _batched(rows, batch_size):
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+def ndjson_response(rows, batch_size=500):
+    """Stream rows as newline-delimited JSON, one object per line"""
+    def generate():
+        dumps = current_app.json.dumps
+        for batch in _batched(rows, batch_size):
+            yield ''.join(dumps(row) + '\n' for row in batch)
+
+    return Response(stream_with_context(generate()), mimetype='application/x-ndjson')
+
+def json_list_response(rows, key, batch_size=500):
+    """Stream rows as {"<key>": [...], "count": n}, the shape of the buffered endpoints"""
+    def generate():
+        dumps = current_app.json.dumps
+        count = 0
+        yield '{"%s": [' % key
+        for batch in _batched(rows, batch_size):
+            prefix = ',' if count else ''
+            yield prefix + ','.join(dumps(row) for row in batch)
+            count += len(batch)
+        yield '], "count": %d}\n' % count
+
+    return Response(stream_with_context(generate()), mimetype='application/json')
+
+def stream_response(rows, key, stream_format):
+    """Build a streaming response in the requested format ('ndjson' or 'json')"""
+    if stream_format == 'ndjson':
+        return ndjson_response(rows)
+    return json_list_response(rows, key)
@@ -0,0 +1,286 @@
+"""Deterministic synthetic catalog, customer, review, pairing and order rows.
+
+The wine and coffee templates come from populate_database_1000.py. Every
+row is drawn from its own random stream seeded by (seed, table, id), so a
+row's content depends only on the seed and its id: any partition can be
+generated on its own, in any process and in any order, and a product's
+price can be recomputed when an order references it.
+"""
+import random
+from datetime import datetime, timedelta
+
+WINE_TYPES = ['red', 'white', 'rose', 'sparkling']
+WINE_REGIONS = {
+    'France': ['Bordeaux', 'Burgundy', 'Champagne', 'Rhône', 'Loire Valley', 'Alsace', 'Provence', 'Languedoc'],
+    'Italy': ['Tuscany', 'Piedmont', 'Veneto', 'Sicily', 'Puglia', 'Abruzzo', 'Campania', 'Lombardy'],
+    'Spain': ['Rioja', 'Ribera del Duero', 'Priorat', 'Rías Baixas', 'Catalonia', 'Valencia'],
+    'USA': ['Napa Valley', 'Sonoma', 'Oregon', 'Washington', 'California', 'Willamette Valley'],
+    'Australia': ['Barossa Valley', 'Hunter Valley', 'Margaret River', 'Yarra Valley', 'McLaren Vale'],
+    'Chile': ['Maipo Valley', 'Casablanca Valley', 'Colchagua Valley', 'Rapel Valley'],
+    'Argentina': ['Mendoza', 'Salta', 'Patagonia'],
+    'Germany': ['Mosel', 'Rheingau', 'Pfalz', 'Baden'],
+    'New Zealand': ['Marlborough', 'Central Otago', 'Hawke\'s Bay'],
+    'India': ['Nashik Valley', 'Nandi Hills', 'Hampi Hills', 'Akluj', 'Goa'],
+    'Portugal': ['Douro', 'Alentejo', 'Dão', 'Bairrada'],
+    'South Africa': ['Stellenbosch', 'Franschhoek', 'Paarl', 'Constantia']
+}
+WINE_COUNTRIES = list(WINE_REGIONS)
+
+WINE_NAMES_TEMPLATES = {
+    'red': ['Cabernet Sauvignon', 'Merlot', 'Pinot Noir', 'Shiraz', 'Syrah', 'Malbec', 'Tempranillo', 'Zinfandel', 'Sangiovese', 'Nebbiolo', 'Barbera', 'Grenache', 'Mourvèdre', 'Carignan', 'Cinsault'],
+    'white': ['Chardonnay', 'Sauvignon Blanc', 'Riesling', 'Pinot Grigio', 'Gewürztraminer', 'Viognier', 'Chenin Blanc', 'Semillon', 'Albariño', 'Vermentino', 'Muscat', 'Torrontés'],
+    'rose': ['Rosé', 'Provence Rosé', 'Pinot Noir Rosé', 'Grenache Rosé', 'Sangiovese Rosé'],
+    'sparkling': ['Champagne', 'Prosecco', 'Cava', 'Crémant', 'Sparkling', 'Brut', 'Méthode Champenoise']
+}
+WINE_PREFIXES = ['Château', 'Domaine', 'Estate', 'Vineyard', 'Reserve', 'Grand', 'Premier', 'Vintage', 'Classic', 'Special']
+
+ACIDITY_LEVELS = ['low', 'medium', 'high']
+SWEETNESS_LEVELS = ['dry', 'off-dry', 'semi-sweet', 'sweet']
+
+COFFEE_TYPES = ['arabica', 'robusta']
+COFFEE_ORIGINS = {
+    'Ethiopia': ['Yirgacheffe', 'Sidamo', 'Harrar', 'Guji', 'Limu', 'Lekempti', 'Oromia'],
+    'Colombia': ['Huila', 'Cauca', 'Antioquia', 'Caldas', 'Tolima', 'Nariño', 'Magdalena'],
+    'Brazil': ['Minas Gerais', 'Sul de Minas', 'Cerrado', 'Mogiana', 'Espírito Santo', 'Campos Gerais'],
+    'Guatemala': ['Antigua', 'Huehuetenango', 'Lake Atitlán', 'Cobán', 'Fraijanes', 'San Marcos'],
+    'Costa Rica': ['Tarrazu', 'Tres Rios', 'West Valley', 'Central Valley', 'Heredia', 'Brunca'],
+    'Kenya': ['Nyeri', 'Kiambu', 'Nyanza', 'Muranga', 'Mount Kenya', 'Embu'],
+    'India': ['Coorg', 'Chikmagalur', 'Nilgiris', 'Karnataka', 'Wayanad', 'Araku Valley', 'Meghalaya', 'Malabar'],
+    'Indonesia': ['Sumatra', 'Java', 'Sulawesi', 'Bali', 'Aceh', 'Flores', 'Papua', 'Kalimantan'],
+    'Honduras': ['Marcala', 'Copán', 'Ocotepeque'],
+    'Peru': ['Cajamarca', 'Cusco', 'Junín'],
+    'Mexico': ['Chiapas', 'Veracruz', 'Oaxaca'],
+    'Nicaragua': ['Jinotega', 'Matagalpa', 'Nueva Segovia'],
+    'El Salvador': ['Santa Ana', 'Ahuachapán', 'Chalatenango'],
+    'Panama': ['Boquete', 'Volcán', 'Renacimiento'],
+    'Hawaii': ['Kona', 'Ka\'u', 'Maui'],
+    'Jamaica': ['Blue Mountains', 'High Mountain'],
+    'Tanzania': ['Kilimanjaro', 'Arusha', 'Mbeya'],
+    'Yemen': ['Yemen', 'Mocha'],
+    'Vietnam': ['Dak Lak', 'Lam Dong', 'Gia Lai']
+}
+COFFEE_COUNTRIES = list(COFFEE_ORIGINS)
+COFFEE_ROAST_LEVELS = ['light', 'medium', 'medium-dark', 'dark']
+COFFEE_PREFIXES = ['Premium', 'Estate', 'Reserve', 'Special', 'Classic', 'Select', 'Finest', 'Grand', 'Supreme']
+COFFEE_SUFFIXES = ['AA', 'AAA', 'Premium', 'Special Reserve', 'Estate Grown', 'Single Origin', 'Peaberry', 'SHB']
+
+FIRST_NAMES = ['Aarav', 'Ananya', 'Rohan', 'Priya', 'Vikram', 'Meera', 'James', 'Sofia', 'Lucas', 'Emma',
+               'Mateo', 'Chloe', 'Kenji', 'Amara', 'Noah', 'Isla', 'Arjun', 'Lea', 'Omar', 'Zara']
+LAST_NAMES = ['Sharma', 'Iyer', 'Patel', 'Reddy', 'Kapoor', 'Smith', 'Garcia', 'Rossi', 'Müller', 'Dubois',
+              'Silva', 'Tanaka', 'Okafor', 'Nguyen', 'Khan', 'Costa', 'Brown', 'Novak', 'Haddad', 'Fernández']
+CITIES = ['Mumbai', 'Bengaluru', 'Delhi', 'Pune', 'Chennai', 'Hyderabad', 'Kolkata', 'Goa', 'Jaipur', 'Kochi']
+
+REVIEW_COMMENTS = {
+    1: ['Not for me at all.', 'Flat and disappointing.', 'Would not buy again.'],
+    2: ['Below expectations.', 'Thin, with an odd finish.', 'Overpriced for what it is.'],
+    3: ['Decent but unremarkable.', 'Fine for everyday drinking.', 'Okay, nothing special.'],
+    4: ['Really enjoyable.', 'Well balanced, would buy again.', 'Great value for the price.'],
+    5: ['Outstanding!', 'One of the best I have tried.', 'Exceptional, complex and long finish.']
+}
+PAIRING_NOTES = ['Complementary acidity', 'Shared chocolate notes', 'Contrasting body', 'Fruit-forward match',
+                 'Earthy harmony', 'Bright and refreshing together', 'Rich dessert pairing']
+
+# Independent random streams per table
+(WINE, COFFEE, CUSTOMER, WINE_REVIEW_COUNT, COFFEE_REVIEW_COUNT,
+ WINE_REVIEW, COFFEE_REVIEW, PAIRING, ORDER) = range(1, 10)
+
+START = datetime(2022, 1, 1)
+SPAN_SECONDS = 3 * 365 * 24 * 3600
+
+def row_random(rng, seed, stream, row_id):
+    """Reseed ``rng`` for one row; returns it"""
+    rng.seed((seed * 16 + stream) * 2 ** 32 + row_id)
+    return rng
+
+def _timestamp(rng):
+    return START + timedelta(seconds=rng.randrange(SPAN_SECONDS))
+
+def _skewed_id(rng, count):
+    """1..count, lower ids far more popular (a rough long tail)"""
+    return int(count * rng.random() ** 3) + 1
+
+def wine_row(seed, wine_id, rng=None):
+    """Wine ``wine_id``, following populate_database_1000.generate_wines"""
+    rng = row_random(rng or random.Random(), seed, WINE, wine_id)
+    country = rng.choice(WINE_COUNTRIES)
+    region = rng.choice(WINE_REGIONS[country])
+    wine_type = rng.choice(WINE_TYPES)
+    base_name = rng.choice(WINE_NAMES_TEMPLATES[wine_type])
+    if rng.random() > 0.5:
+        name = f"{rng.choice(WINE_PREFIXES)} {base_name}"
+    else:
+        name = f"{base_name} {rng.choice(['Reserve', 'Estate', 'Classic', ''])}".strip()
+    # Keep names distinct enough to page and search through at scale
+    name = f"{name} {region} #{wine_id}"
+
+    if wine_type == 'sparkling' or country in ['France', 'Italy']:
+        price = rng.randint(2000, 50000)
+    elif country in ['USA', 'Australia', 'Spain']:
+        price = rng.randint(1500, 25000)
+    else:
+        price = rng.randint(1000, 15000)
+
+    if wine_type == 'sparkling':
+        alcohol = round(rng.uniform(11.0, 13.0), 1)
+    elif wine_type == 'rose':
+        alcohol = round(rng.uniform(12.0, 13.5), 1)
+    elif wine_type == 'white':
+        alcohol = round(rng.uniform(12.0, 14.0), 1)
+    else:
+        alcohol = round(rng.uniform(13.0, 15.5), 1)
+
+    return {
+        'id': wine_id,
+        'name': name,
+        'type': wine_type,
+        'region': region,
+        'country': country,
+        'vintage': rng.randint(2015, 2022),
+        'price': price,
+        'alcohol_content': alcohol,
+        'acidity_level': rng.choice(ACIDITY_LEVELS),
+        'sweetness_level': rng.choice(SWEETNESS_LEVELS),
+        'created_at': _timestamp(rng)
+    }
+
+def coffee_row(seed, coffee_id, rng=None):
+    """Coffee ``coffee_id``, following populate_database_1000.generate_coffees"""
+    rng = row_random(rng or random.Random(), seed, COFFEE, coffee_id)
+    country = rng.choice(COFFEE_COUNTRIES)
+    origin = rng.choice(COFFEE_ORIGINS[country])
+    coffee_type = rng.choice(COFFEE_TYPES)
+    name = f"{country} {origin}"
+    if rng.random() > 0.3:
+        name = f"{rng.choice(COFFEE_PREFIXES)} {name}"
+    if rng.random() > 0.5:
+        name = f"{name} {rng.choice(COFFEE_SUFFIXES)}"
+    name = f"{name} #{coffee_id}"
+
+    if country in ['Hawaii', 'Jamaica', 'Panama', 'Yemen']:
+        price = rng.randint(5000, 15000)
+    elif country in ['Ethiopia', 'Kenya', 'Colombia', 'Costa Rica']:
+        price = rng.randint(2500, 8000)
+    elif coffee_type == 'robusta':
+        price = rng.randint(1500, 3000)
+    else:
+        price = rng.randint(2000, 6000)
+
+    description = rng.choice([
+        f"Premium {coffee_type} from {origin}, {country}",
+        f"Estate-grown {coffee_type} with balanced flavor profile",
+        f"Single-origin {coffee_type} featuring notes of chocolate and citrus",
+        f"Specialty {coffee_type} with complex flavor notes",
+        f"High-altitude {coffee_type} with bright acidity",
+        f"Artisan {coffee_type} from {origin} region"
+    ])
+    return {
+        'id': coffee_id,
+        'name': name,
+        'type': coffee_type,
+        'origin': origin,
+        'country': country,
+        'roast_level': rng.choice(COFFEE_ROAST_LEVELS),
+        'price': price,
+        'description': description,
+        'acidity_level': rng.choice(ACIDITY_LEVELS),
+        'created_at': _timestamp(rng)
+    }
+
+def customer_row(seed, customer_id, rng=None):
+    rng = row_random(rng or random.Random(), seed, CUSTOMER, customer_id)
+    first, last = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+    return {
+        'id': customer_id,
+        'name': f"{first} {last}",
+        'email': f"{first.lower()}.{customer_id}@example.com",
+        'phone': f"+91{rng.randrange(7000000000, 9999999999)}",
+        'address': f"{rng.randint(1, 999)} Main Road, {rng.choice(CITIES)}",
+        'created_at': _timestamp(rng)
+    }
+
+def review_count(seed, kind, product_id, mean, rng=None):
+    """Reviews a product gets: long-tailed, averaging about ``mean``, at most 50x it"""
+    stream = WINE_REVIEW_COUNT if kind == 'wines' else COFFEE_REVIEW_COUNT
+    rng = row_random(rng or random.Random(), seed, stream, product_id)
+    # Pareto(2) has mean 2; most products get a few reviews, a handful get hundreds
+    return min(round(mean / 2 * rng.paretovariate(2)), round(mean * 50))
+
+def review_rows(seed, kind, first_id, count, first_review_id, customers, mean):
+    """Reviews of products first_id..first_id + count - 1, numbered from first_review_id.
+
+    Each product has a hidden quality, so its ratings cluster the way real
+    ones do rather than averaging 3 everywhere.
+    """
+    stream = WINE_REVIEW if kind == 'wines' else COFFEE_REVIEW
+    column = 'wine_id' if kind == 'wines' else 'coffee_id'
+    other = 'coffee_id' if kind == 'wines' else 'wine_id'
+    counter = random.Random()
+    rng = random.Random()
+    review_id = first_review_id
+    for product_id in range(first_id, first_id + count):
+        reviews = review_count(seed, kind, product_id, mean, counter)
+        if not reviews:
+            continue
+        row_random(rng, seed, stream, product_id)
+        quality = min(4.8, max(1.5, rng.gauss(3.7, 0.6)))
+        for _ in range(reviews):
+            rating = min(5, max(1, round(rng.gauss(quality, 0.9))))
+            yield {
+                'id': review_id,
+                column: product_id,
+                other: None,
+                'customer_id': rng.randint(1, customers) if customers else None,
+                'rating': rating,
+                'comment': rng.choice(REVIEW_COMMENTS[rating]) if rng.random() < 0.7 else None,
+                'created_at': _timestamp(rng)
+            }
+            review_id += 1
+
+def pairing_row(seed, pairing_id, wines, coffees, rng=None):
+    """Pairing ``pairing_id`` (1-based). Pairings cycle through the wines and
+    each wine's coffees are consecutive from a per-wine offset, so (wine_id,
+    coffee_id) stays unique for up to wines * coffees pairings."""
+    rng = row_random(rng or random.Random(), seed, PAIRING, pairing_id)
+    wine_index, round_ = (pairing_id - 1) % wines, (pairing_id - 1) // wines
+    offset = (wine_index * 2654435761 + seed * 40503) % coffees
+    return {
+        'id': pairing_id,
+        'wine_id': wine_index + 1,
+        'coffee_id': (offset + round_) % coffees + 1,
+        'pairing_score': round(min(9.99, max(1.0, rng.gauss(6.5, 1.5))), 2),
+        'description': rng.choice(PAIRING_NOTES)
+    }
+
+def order_rows(seed, order_id, customers, wines, coffees, rng=None):
+    """Order ``order_id`` and its items: (order, order_wines rows, order_coffees rows).
+
+    Subtotals use the referenced products' generated prices and
+    total_amount is their sum, as the order total triggers would compute.
+    """
+    rng = row_random(rng or random.Random(), seed, ORDER, order_id)
+    products = random.Random()
+    lines = {'wines': {}, 'coffees': {}}
+    for _ in range(rng.choice([1, 1, 1, 2, 2, 3, 4])):
+        kind = 'wines' if rng.random() < 0.5 else 'coffees'
+        count = wines if kind == 'wines' else coffees
+        if not count:
+            continue
+        product_id = _skewed_id(rng, count)
+        lines[kind][product_id] = lines[kind].get(product_id, 0) + rng.randint(1, 3)
+
+    items = {}
+    total = 0
+    for kind, make, column in (('wines', wine_row, 'wine_id'), ('coffees', coffee_row, 'coffee_id')):
+        items[kind] = []
+        for product_id, quantity in sorted(lines[kind].items()):
+            subtotal = quantity * make(seed, product_id, products)['price']
+            total += subtotal
+            items[kind].append({'order_id': order_id, column: product_id,
+                                'quantity': quantity, 'subtotal': subtotal})
+    order = {
+        'id': order_id,
+        'customer_id': rng.randint(1, customers),
+        'order_date': _timestamp(rng),
+        'total_amount': total
+    }
+    return order, items['wines'], items['coffees']
@@ -1,11 +1,13 @@
 import React, { useState, useEffect } from 'react';
 import './Search.css';
+import { searchAPI } from '../services/api';
 
 const WineSearch = ({ onSearchResults, onBack }) => {
   const [searchTerm, setSearchTerm] = useState('');
   const [category, setCategory] = useState('all');
   const [wines, setWines] = useState([]);
   const [loading, setLoading] = useState(false);
+  const [suggestions, setSuggestions] = useState([]);
 
   useEffect(() => {
     fetchWines();
@@ -24,6 +26,24 @@ const WineSearch = ({ onSearchResults, onBack }) => {
     setLoading(false);
   };
 
+  // Suggestions come from the lightweight autocomplete endpoint, fetched
+  // once typing pauses rather than on every keystroke
+  useEffect(() => {
+    if (!searchTerm.trim()) {
+      setSuggestions([]);
+      return undefined;
+    }
+    const timer = setTimeout(async () => {
+      try {
+        const data = await searchAPI.autocomplete(searchTerm, 'wine');
+        setSuggestions(data.suggestions || []);
+      } catch (error) {
+        setSuggestions([]);
+      }
+    }, 150);
+    return () => clearTimeout(timer);
+  }, [searchTerm]);
+
   const handleSearch = (e) => {
     e.preventDefault();
     fetchWines();
@@ -109,7 +129,13 @@ const WineSearch = ({ onSearchResults, onBack }) => {
             placeholder="Search wines by name..."
             value={searchTerm}
             onChange={(e) => setSearchTerm(e.target.value)}
+            list="wine-suggestions"
           />
+          <datalist id="wine-suggestions">
+            {suggestions.map((s) => (
+              <option key={`${s.field}-${s.text}`} value={s.text} />
+            ))}
+          </datalist>
           <button type="submit" className="luxury-button">SEARCH</button>
         </form>
       </div>
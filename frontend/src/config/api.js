@@ -13,6 +13,8 @@ export const API_ENDPOINTS = {
   WINE_TYPES: `${API_BASE_URL}/api/wines/types`,
   WINE_REGIONS: `${API_BASE_URL}/api/wines/regions`,
   TOP_RATED_WINES: `${API_BASE_URL}/api/wines/top-rated`,
+  WINES_BATCH: `${API_BASE_URL}/api/wines/batch`,
+  WINE_FACETS: `${API_BASE_URL}/api/wines/facets`,
   
   // Coffees
   COFFEES: `${API_BASE_URL}/api/coffees`,
@@ -22,6 +24,12 @@ export const API_ENDPOINTS = {
   COFFEE_ORIGINS: `${API_BASE_URL}/api/coffees/origins`,
   ROAST_LEVELS: `${API_BASE_URL}/api/coffees/roast-levels`,
   TOP_RATED_COFFEES: `${API_BASE_URL}/api/coffees/top-rated`,
+  COFFEES_BATCH: `${API_BASE_URL}/api/coffees/batch`,
+  COFFEE_FACETS: `${API_BASE_URL}/api/coffees/facets`,
+  
+  // Search
+  SEARCH: `${API_BASE_URL}/api/search/`,
+  AUTOCOMPLETE: `${API_BASE_URL}/api/autocomplete/`,
   
   // Reviews
   REVIEWS: `${API_BASE_URL}/api/reviews`,
@@ -30,7 +30,18 @@ const apiCall = async (endpoint, options = {}) => {
 // Wine API
 export const wineAPI = {
   getAll: () => apiCall(API_ENDPOINTS.WINES),
+  // Keyset pagination: pass the previous response's next_cursor to continue
+  getPage: (cursor = null, pageSize = 50) => {
+    const params = new URLSearchParams({ page_size: pageSize });
+    if (cursor) params.append('cursor', cursor);
+    return apiCall(`${API_ENDPOINTS.WINES}?${params.toString()}`);
+  },
   getById: (id) => apiCall(API_ENDPOINTS.WINE_BY_ID(id)),
+  // Several products (with rating_info) in one request instead of one getById each
+  getMany: (ids) => apiCall(API_ENDPOINTS.WINES_BATCH, {
+    method: 'POST',
+    body: JSON.stringify({ ids }),
+  }),
   getReviews: (id) => apiCall(API_ENDPOINTS.WINE_REVIEWS(id)),
   getTypes: () => apiCall(API_ENDPOINTS.WINE_TYPES),
   getRegions: () => apiCall(API_ENDPOINTS.WINE_REGIONS),
@@ -55,12 +66,34 @@ export const wineAPI = {
     });
     return apiCall(`${API_ENDPOINTS.WINES}?${params.toString()}`);
   },
+  // One page of results plus filter counts for everything matching the filters
+  facets: (filters = {}, cursor = null, pageSize = 50) => {
+    const params = new URLSearchParams({ page_size: pageSize });
+    Object.entries(filters).forEach(([key, value]) => {
+      if (value !== null && value !== undefined && value !== '') {
+        params.append(key, value);
+      }
+    });
+    if (cursor) params.append('cursor', cursor);
+    return apiCall(`${API_ENDPOINTS.WINE_FACETS}?${params.toString()}`);
+  },
 };
 
 // Coffee API
 export const coffeeAPI = {
   getAll: () => apiCall(API_ENDPOINTS.COFFEES),
+  // Keyset pagination: pass the previous response's next_cursor to continue
+  getPage: (cursor = null, pageSize = 50) => {
+    const params = new URLSearchParams({ page_size: pageSize });
+    if (cursor) params.append('cursor', cursor);
+    return apiCall(`${API_ENDPOINTS.COFFEES}?${params.toString()}`);
+  },
   getById: (id) => apiCall(API_ENDPOINTS.COFFEE_BY_ID(id)),
+  // Several products (with rating_info) in one request instead of one getById each
+  getMany: (ids) => apiCall(API_ENDPOINTS.COFFEES_BATCH, {
+    method: 'POST',
+    body: JSON.stringify({ ids }),
+  }),
   getReviews: (id) => apiCall(API_ENDPOINTS.COFFEE_REVIEWS(id)),
   getTypes: () => apiCall(API_ENDPOINTS.COFFEE_TYPES),
   getOrigins: () => apiCall(API_ENDPOINTS.COFFEE_ORIGINS),
@@ -86,6 +119,28 @@ export const coffeeAPI = {
     });
     return apiCall(`${API_ENDPOINTS.COFFEES}?${params.toString()}`);
   },
+  // One page of results plus filter counts for everything matching the filters
+  facets: (filters = {}, cursor = null, pageSize = 50) => {
+    const params = new URLSearchParams({ page_size: pageSize });
+    Object.entries(filters).forEach(([key, value]) => {
+      if (value !== null && value !== undefined && value !== '') {
+        params.append(key, value);
+      }
+    });
+    if (cursor) params.append('cursor', cursor);
+    return apiCall(`${API_ENDPOINTS.COFFEE_FACETS}?${params.toString()}`);
+  },
+};
+
+// Search API
+export const searchAPI = {
+  autocomplete: (q, type = null, limit = 10) => {
+    const params = new URLSearchParams({ q, limit });
+    if (type) {
+      params.append('type', type);
+    }
+    return apiCall(`${API_ENDPOINTS.AUTOCOMPLETE}?${params.toString()}`);
+  },
 };
 
 // Demo/Query API
@@ -105,6 +160,7 @@ export const healthCheck = () => apiCall(API_ENDPOINTS.HEALTH);
 export default {
   wineAPI,
   coffeeAPI,
+  searchAPI,
   demoAPI,
   healthCheck,
 };